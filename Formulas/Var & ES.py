@@ -1,5 +1,7 @@
+import time
 import numpy as np
 import scipy.stats as stats
+from scipy.special import ndtri
 
 def calculate_var_es(returns, confidence_level=0.95):
     """
@@ -20,6 +22,186 @@ def calculate_var_es(returns, confidence_level=0.95):
 
     return var, es
 
+def tail_size(window, confidence_level):
+    """Number of tail observations k = floor((1 - confidence_level) * window), at least 1."""
+    return max(int(np.floor((1 - confidence_level) * window + 1e-9)), 1)
+
+def historical_var_es(returns, confidence_level=0.95):
+    """
+    Historical VaR and ES, selecting the tail with np.partition instead of a full sort.
+
+    VaR is the k-th smallest return and ES the mean of the k smallest, with k from tail_size.
+
+    Parameters:
+    returns (numpy array): Returns, (dates,) or (dates x portfolios)
+    confidence_level (float): Confidence level for VaR and ES calculation
+
+    Returns:
+    VaR and ES, floats or one per portfolio
+    """
+    returns = np.asarray(returns, dtype=float)
+    k = tail_size(returns.shape[0], confidence_level)
+    tail = np.partition(returns, k - 1, axis=0)[:k]
+    return tail[k - 1], tail.mean(axis=0)
+
+def insert_smallest(buffer, values):
+    """Insert one value per row into ascending (portfolios x k) buffers of the k smallest values so far."""
+    shifted = np.empty_like(buffer)
+    shifted[:, 0] = -np.inf
+    shifted[:, 1:] = buffer[:, :-1]
+    return np.minimum(buffer, np.maximum(shifted, values[:, None]))
+
+def rolling_smallest(returns, window, k):
+    """
+    k-th smallest value and sum of the k smallest values in every rolling window, for all portfolios.
+
+    Time is cut into blocks of `window` dates, so each window is a suffix of one block plus a
+    prefix of the next. The k smallest of every block suffix (backward pass) and of the
+    growing prefix of the next block (forward pass) are maintained by O(k) insertions, and
+    each window merges the two k-element buffers with np.partition. The cost is O(k) per
+    date and portfolio instead of a partition of the full window.
+
+    Parameters:
+    returns (numpy array): (dates x portfolios) returns
+    window (int): Window length in dates
+    k (int): Tail size
+
+    Returns:
+    numpy array, numpy array: (dates - window + 1) x portfolios k-th smallest values and tail sums
+    """
+    returns = np.asarray(returns, dtype=float)
+    dates, portfolios = returns.shape
+    if not 1 <= window <= dates:
+        raise ValueError(f"Window of {window} dates does not fit in {dates} dates of returns.")
+    n_windows = dates - window + 1
+    kth = np.empty((n_windows, portfolios))
+    tail_sum = np.empty((n_windows, portfolios))
+    suffix = np.empty((window, portfolios, k))
+    for block_start in range(0, n_windows, window):
+        block = returns[block_start:block_start + window]
+        following = returns[block_start + window:block_start + 2 * window]
+        # suffix[s] holds the k smallest of block[s:]
+        buffer = np.full((portfolios, k), np.inf)
+        for s in range(window - 1, -1, -1):
+            buffer = insert_smallest(buffer, block[s])
+            suffix[s] = buffer
+        # Window block_start + s is block[s:] followed by following[:s]
+        prefix = np.full((portfolios, k), np.inf)
+        for s in range(min(window, n_windows - block_start)):
+            if s > 0:
+                prefix = insert_smallest(prefix, following[s - 1])
+            tail = np.partition(np.concatenate([suffix[s], prefix], axis=1), k - 1, axis=1)[:, :k]
+            kth[block_start + s] = tail[:, k - 1]
+            tail_sum[block_start + s] = tail.sum(axis=1)
+    return kth, tail_sum
+
+def ewma_volatility(returns, lambda_=0.94, seed_window=250):
+    """
+    RiskMetrics EWMA volatility sigma_t^2 = lambda sigma_{t-1}^2 + (1 - lambda) r_{t-1}^2 for every
+    date and portfolio. The first seed_window returns are a pre-sample: their variance seeds
+    sigma^2 at date seed_window, so no volatility uses a return on or after its own date.
+
+    Returns:
+    numpy array: (dates + 1) x portfolios volatilities; row t uses returns before date t,
+                 so the last row is the forecast for the day after the data. The first
+                 seed_window rows are NaN.
+    """
+    returns = np.asarray(returns, dtype=float)
+    if not 1 <= seed_window <= returns.shape[0]:
+        raise ValueError(f"Seed window of {seed_window} dates does not fit in {returns.shape[0]} dates of returns.")
+    variance = np.full((returns.shape[0] + 1,) + returns.shape[1:], np.nan)
+    variance[seed_window] = np.var(returns[:seed_window], axis=0)
+    for t in range(seed_window, returns.shape[0]):
+        variance[t + 1] = lambda_ * variance[t] + (1 - lambda_) * returns[t]**2
+    return np.sqrt(variance)
+
+def cornish_fisher_var_es(mean, std, skewness, excess_kurtosis, confidence_level=0.95):
+    """
+    Cornish-Fisher VaR and ES from the first four moments (scalars or arrays).
+
+    The quantile is z + (z^2 - 1) S/6 + (z^3 - 3z) K/24 - (2z^3 - 5z) S^2/36 at z = Phi^-1(1 - c).
+    ES averages the same polynomial over the normal tail Z < z, using the truncated-normal
+    moments M_n = E[Z^n | Z < z] from M_n = (n - 1) M_{n-2} - z^(n-1) phi(z) / (1 - c).
+
+    Returns:
+    VaR and ES as returns (negative for losses)
+    """
+    alpha = 1 - confidence_level
+    z = ndtri(alpha)
+    S, K = skewness, excess_kurtosis
+    z_cf = z + (z**2 - 1) * S / 6 + (z**3 - 3 * z) * K / 24 - (2 * z**3 - 5 * z) * S**2 / 36
+    density = stats.norm.pdf(z) / alpha
+    M1 = -density
+    M2 = 1 - z * density
+    M3 = 2 * M1 - z**2 * density
+    es_cf = M1 + (M2 - 1) * S / 6 + (M3 - 3 * M1) * K / 24 - (2 * M3 - 5 * M1) * S**2 / 36
+    return mean + std * z_cf, mean + std * es_cf
+
+def rolling_var_es(returns, window=250, confidence_level=0.99, method='historical', lambda_=0.94):
+    """
+    Rolling VaR and ES for every portfolio of a (dates x portfolios) return matrix.
+
+    'historical' uses the empirical tail of each window. 'filtered' (filtered historical
+    simulation) divides every return by its EWMA volatility and rescales the tail of the
+    standardised window by the volatility forecast for the next day; since rescaling by a
+    positive constant keeps the order, this is the tail of the standardised returns times
+    the forecast. The first window of returns only seeds the EWMA, so the first `window`
+    rows of the filtered method are NaN. 'cornish-fisher' uses rolling mean, volatility,
+    skewness and excess kurtosis from cumulative sums of powers of the returns. Every
+    method is O(dates x portfolios) up to the tail size, with no sort of the windows.
+
+    Parameters:
+    returns (numpy array): (dates x portfolios) returns, or (dates,) for one portfolio
+    window (int): Window length in dates
+    confidence_level (float): Confidence level for VaR and ES calculation
+    method (str): 'historical', 'filtered' or 'cornish-fisher'
+    lambda_ (float): EWMA decay for the filtered method
+
+    Returns:
+    numpy array, numpy array: VaR and ES as returns, (dates - window + 1) x portfolios; row i
+                              uses the window ending at date i + window - 1
+    """
+    if method not in ('historical', 'filtered', 'cornish-fisher'):
+        raise ValueError("Invalid method. Use 'historical', 'filtered' or 'cornish-fisher'.")
+    returns = np.asarray(returns, dtype=float)
+    single = returns.ndim == 1
+    returns = returns.reshape(returns.shape[0], -1)
+    if not 1 <= window <= returns.shape[0]:
+        raise ValueError(f"Window of {window} dates does not fit in {returns.shape[0]} dates of returns.")
+    if method == 'filtered' and 2 * window > returns.shape[0]:
+        raise ValueError(f"The filtered method needs {2 * window} dates: one window seeds the volatility.")
+    k = tail_size(window, confidence_level)
+
+    if method == 'historical':
+        kth, tail_sum = rolling_smallest(returns, window, k)
+        var, es = kth, tail_sum / k
+    elif method == 'filtered':
+        volatility = ewma_volatility(returns, lambda_, window)
+        kth, tail_sum = rolling_smallest(returns[window:] / volatility[window:-1], window, k)
+        forecast = volatility[2 * window:]
+        var = np.full((returns.shape[0] - window + 1, returns.shape[1]), np.nan)
+        es = var.copy()
+        var[window:], es[window:] = forecast * kth, forecast * tail_sum / k
+    else:
+        # Rolling raw moments of the returns, centred on the overall mean to limit cancellation
+        centred = returns - returns.mean(axis=0)
+        sums = []
+        power = np.ones_like(centred)
+        cumulative = np.zeros((returns.shape[0] + 1, returns.shape[1]))
+        for _ in range(4):
+            power *= centred
+            np.cumsum(power, axis=0, out=cumulative[1:])
+            sums.append((cumulative[window:] - cumulative[:-window]) / window)
+        m1, m2, m3, m4 = sums
+        variance = np.maximum(m2 - m1**2, 1e-300)
+        third = m3 - 3 * m1 * m2 + 2 * m1**3
+        fourth = m4 - 4 * m1 * m3 + 6 * m1**2 * m2 - 3 * m1**4
+        var, es = cornish_fisher_var_es(m1 + returns.mean(axis=0), np.sqrt(variance), third / variance**1.5,
+                                        fourth / variance**2 - 3, confidence_level)
+    if single:
+        return var[:, 0], es[:, 0]
+    return var, es
+
 # Example usage
 historical_returns = np.random.normal(0, 0.01, 1000)  # Simulated daily returns
 confidence_level = 0.95
@@ -27,3 +209,26 @@ confidence_level = 0.95
 var, es = calculate_var_es(historical_returns, confidence_level)
 print(f"Value at Risk (VaR) at {confidence_level * 100}% confidence level: {var}")
 print(f"Expected Shortfall (ES) at {confidence_level * 100}% confidence level: {es}")
+var, es = historical_var_es(historical_returns, confidence_level)
+print(f"Historical VaR: {var}, ES: {es}")
+
+# Nightly run: 5,000 portfolios x 10 years of daily returns with fat tails and volatility clustering
+rng = np.random.default_rng(0)
+dates, portfolios, window = 2520, 5000, 250
+regime = np.exp(np.cumsum(0.05 * rng.standard_normal(dates)))[:, None]
+returns = 0.01 * regime / regime.mean() * rng.standard_t(5, (dates, portfolios)) / np.sqrt(5 / 3)
+
+# Check the rolling engine against a full partition of a few windows
+var_h, es_h = rolling_var_es(returns[:600, :50], window, 0.99)
+windows = np.lib.stride_tricks.sliding_window_view(returns[:600, :50], window, axis=0)
+check_var, check_es = historical_var_es(np.moveaxis(windows, -1, 0), 0.99)
+print(f"Rolling tail matches np.partition: {np.allclose(var_h, check_var) and np.allclose(es_h, check_es)}")
+
+for method in ('historical', 'filtered', 'cornish-fisher'):
+    start = time.perf_counter()
+    var, es = rolling_var_es(returns, window, 0.99, method)
+    # Rows without a forecast (the filtered method's seed window) are left out
+    scored = ~np.isnan(var[:-1])
+    breaches = np.mean((returns[window:] < var[:-1])[scored])
+    print(f"{method:>14}: {var.shape[0]} windows x {portfolios} portfolios in {time.perf_counter() - start:.2f} seconds, "
+          f"mean 99% VaR {np.nanmean(var):.4f}, ES {np.nanmean(es):.4f}, breach rate {breaches:.4f}")
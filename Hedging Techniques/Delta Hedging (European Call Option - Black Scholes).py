@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.stats import norm
 
 # Black-Scholes formula for call option price
 def bsformula(S, K, T, r, sig):
@@ -67,6 +68,8 @@ plt.ylabel('Frequency')
 plt.show()
 
 # Risk measures
-sortedval = np.sort(out[:, -1])
-VaR = sortedval[int(0.05 * n)]  # Value-at-Risk at 95%
-ES = np.mean(sortedval[:
+k = int(0.05 * n)
+tail = np.partition(out[:, -1], k)[:k + 1]  # The k + 1 worst outcomes, without a full sort
+VaR = tail[k]  # Value-at-Risk at 95%
+ES = np.mean(tail[:k])  # Expected Shortfall at 95%
+print(f"VaR (95%): {VaR}, ES (95%): {ES}")
@@ -1,7 +1,16 @@
+import importlib.util
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.stats import norm
 
+# Memoized pricing layer, loaded by path since the file name has spaces
+spec = importlib.util.spec_from_file_location('pricing_cache', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Option Pricing Models', 'Pricing Cache.py'))
+pricing_cache = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pricing_cache)
+quantum = {'S': 0.01, 'K': 0.01, 'T': 1 / 365, 'r': 1e-4, 'sigma': 1e-4}
+
 # Updated Black-Scholes functions
 def d1(S, K, T, r, sigma):
     return (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
@@ -12,10 +21,12 @@ def d2(S, K, T, r, sigma):
 def bs_call_price(S, K, T, r, sigma):
     return S * norm.cdf(d1(S, K, T, r, sigma)) - K * np.exp(-r * T) * norm.cdf(d2(S, K, T, r, sigma))
 
+@pricing_cache.memoize_pricer(quantum=quantum)
 def vega(S, K, T, r, sigma):
     return S * norm.pdf(d1(S, K, T, r, sigma)) * np.sqrt(T)
 
 # Gamma of a call option
+@pricing_cache.memoize_pricer(quantum=quantum)
 def gamma(S, K, T, r, sigma):
     return norm.pdf(d1(S, K, T, r, sigma)) / (S * sigma * np.sqrt(T))
 
@@ -24,11 +35,17 @@ class OptionPortfolio:
     def __init__(self, options):
         self.options = options
     
+    def contracts(self):
+        return (np.array([opt[name] for opt in self.options]) for name in ('K', 'T', 'sigma'))
+
+    # One batched cache lookup for the whole book; only unseen (S, K, T, r, sigma) are priced
     def portfolio_vega(self, S, r):
-        return sum([vega(S, opt['K'], opt['T'], r, opt['sigma']) for opt in self.options])
-    
+        K, T, sigma = self.contracts()
+        return vega(S, K, T, r, sigma).sum()
+
     def portfolio_gamma(self, S, r):
-        return sum([gamma(S, opt['K'], opt['T'], r, opt['sigma']) for opt in self.options])
+        K, T, sigma = self.contracts()
+        return gamma(S, K, T, r, sigma).sum()
     
     def rebalance_hedges(self, S, r, target_vega, target_gamma):
         # Placeholder for a more complex rebalancing strategy
@@ -52,3 +69,8 @@ r = 0.05  # Risk-free rate
 target_vega = 20  # Arbitrary target vega
 target_gamma = 0.1  # Arbitrary target gamma
 portfolio.rebalance_hedges(S, r, target_vega, target_gamma)
+
+# Rebalancing on ticks that barely move reuses the cached Greeks
+for spot in S + np.round(np.cumsum(0.01 * np.random.default_rng(0).standard_normal(1000)), 2):
+    portfolio.portfolio_vega(spot, r), portfolio.portfolio_gamma(spot, r)
+pricing_cache.cache_report()
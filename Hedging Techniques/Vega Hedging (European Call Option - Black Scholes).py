@@ -1,14 +1,25 @@
+import importlib.util
+import os
 import numpy as np
 from scipy.stats import norm, gaussian_kde
 import matplotlib.pyplot as plt
 
+# Memoized pricing layer, loaded by path since the file name has spaces
+spec = importlib.util.spec_from_file_location('pricing_cache', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Option Pricing Models', 'Pricing Cache.py'))
+pricing_cache = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pricing_cache)
+quantum = {'S': 0.01, 'K': 0.01, 'T': 1 / 365, 'r': 1e-4, 'sigma': 1e-4}
+
 # Black-Scholes formula for call option price
+@pricing_cache.memoize_pricer(quantum=quantum)
 def bsformula(S, K, T, r, sigma):
     d1 = (np.log(S / K) + (r + sigma**2 / 2) * T) / (sigma * np.sqrt(T))
     d2 = d1 - sigma * np.sqrt(T)
     return S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
 
 # Vega of a call option
+@pricing_cache.memoize_pricer(quantum=quantum)
 def vega(S, K, T, r, sigma):
     d1 = (np.log(S / K) + (r + sigma**2 / 2) * T) / (sigma * np.sqrt(T))
     return S * np.sqrt(T) * norm.pdf(d1)
@@ -16,8 +27,9 @@ def vega(S, K, T, r, sigma):
 # Simulate changes in volatility and adjust vega hedge
 def simulate_vega_hedge(S, K, T, r, initial_sigma, delta_sigma, steps):
     sigmas = np.linspace(initial_sigma - delta_sigma, initial_sigma + delta_sigma, steps)
-    vegas = [vega(S, K, T, r, sigma) for sigma in sigmas]
-    option_prices = [bsformula(S, K, T, r, sigma) for sigma in sigmas]
+    # One batched lookup per grid: overlapping grids only price the new volatilities
+    vegas = vega(S, K, T, r, sigmas)
+    option_prices = bsformula(S, K, T, r, sigmas)
 
     plt.figure(figsize=(14, 7))
 
@@ -47,3 +59,7 @@ delta_sigma = 0.1  # Range of volatility change to simulate
 steps = 50  # Number of steps in the simulation
 
 simulate_vega_hedge(S, K, T, r, initial_sigma, delta_sigma, steps)
+
+# A finer sweep over the same range only prices the new midpoints
+simulate_vega_hedge(S, K, T, r, initial_sigma, delta_sigma, 2 * steps - 1)
+pricing_cache.cache_report()
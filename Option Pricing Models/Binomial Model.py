@@ -1,50 +1,211 @@
-import math
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.special import gammaln, ndtr
 
-def binomial_option_pricing(S, K, T, r, sigma, N, option_type='call'):
+def black_scholes_price(S, K, T, r, sigma, q, sign):
+    """Black-Scholes price with dividend yield q; sign is +1 for calls and -1 for puts."""
+    sqrt_T = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / sqrt_T
+    d2 = d1 - sqrt_T
+    return sign * (S * np.exp(-q * T) * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+
+def peizer_pratt(z, n):
+    """Peizer-Pratt method 2 inversion of the normal cdf onto a binomial with n steps."""
+    return 0.5 + np.sign(z) * 0.5 * np.sqrt(1 - np.exp(-(z / (n + 1 / 3 + 0.1 / (n + 1)))**2 * (n + 1 / 6)))
+
+def binomial_option_pricing(S, K, T, r, sigma, N, option_type='call', exercise='european', q=0.0, width=8.0,
+                            method='crr', lattice='crr'):
     """
     Calculate the option price using the Binomial Option Pricing Model.
-    
+
+    K and T may be arrays: every strike/expiry combination becomes one column of the
+    tree, so a vector of strikes and a column vector of expiries price a whole 2-D chain
+    in one call. European options weight the terminal payoffs by their binomial
+    probabilities directly. American options are rolled back one vectorized slice per
+    time step, restricted to the nodes within `width` binomial standard deviations of
+    the forward distribution; nodes outside that band are reached with negligible
+    probability and are valued at intrinsic.
+
+    The plain tree converges at O(1/N) with odd-even oscillation. method='bbs' (binomial
+    Black-Scholes) replaces the last step with Black-Scholes values, which smooths the
+    payoff kink and removes the oscillation. method='bbsr' adds two-point Richardson
+    extrapolation of the BBS prices at N and N/2 steps. lattice='leisen-reimer' uses
+    the Leisen-Reimer parameterisation, which centres the strike between the terminal
+    nodes (step counts are rounded up to odd numbers); that already removes the
+    oscillation, so the last step stays in the lattice and 'bbsr' extrapolates the plain
+    Leisen-Reimer prices.
+
     Parameters:
     S (float): Current stock price
-    K (float): Strike price
-    T (float): Time to maturity in years
+    K (float or array): Strike price(s)
+    T (float or array): Time(s) to maturity in years
     r (float): Risk-free interest rate
     sigma (float): Volatility of the stock
     N (int): Number of steps in the binomial tree
     option_type (str): Type of the option - 'call' or 'put'
-    
+    exercise (str): Exercise style - 'european' or 'american'
+    q (float): Continuous dividend yield
+    width (float): Half-width of the rolled-back node band in standard deviations
+    method (str): 'crr' (plain tree), 'bbs' or 'bbsr'
+    lattice (str): 'crr' (Cox-Ross-Rubinstein) or 'leisen-reimer'
+
     Returns:
-    float: Option price
+    float or numpy.ndarray: Option price(s), shaped like np.broadcast(K, T)
     """
-    # Time interval
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    if exercise not in ('european', 'american'):
+        raise ValueError("Invalid exercise style. Use 'european' or 'american'.")
+    if method not in ('crr', 'bbs', 'bbsr'):
+        raise ValueError("Invalid method. Use 'crr', 'bbs' or 'bbsr'.")
+    if lattice not in ('crr', 'leisen-reimer'):
+        raise ValueError("Invalid lattice. Use 'crr' or 'leisen-reimer'.")
+
+    if lattice == 'leisen-reimer':
+        N += 1 - N % 2
+    if method == 'bbsr':
+        # Two-point Richardson extrapolation, assuming the error is O(1/N)
+        coarse_steps = N // 2 + (1 - N // 2 % 2 if lattice == 'leisen-reimer' else 0)
+        fine = binomial_option_pricing(S, K, T, r, sigma, N, option_type, exercise, q, width, 'bbs', lattice)
+        coarse = binomial_option_pricing(S, K, T, r, sigma, coarse_steps, option_type, exercise, q, width,
+                                         'bbs', lattice)
+        return (N * fine - coarse_steps * coarse) / (N - coarse_steps)
+
+    K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+    shape = K.shape
+    K = K.reshape(1, -1)
+    # Contracts with a common expiry share one tree
+    T = T.reshape(1, -1)[:, :1] if np.all(T == T.flat[0]) else T.reshape(1, -1)
+    sign = 1.0 if option_type == 'call' else -1.0
+
+    # Tree parameters, computed once outside the rollback
     dt = T / N
+    growth = np.exp((r - q) * dt)
+    if lattice == 'leisen-reimer':
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+        p = peizer_pratt(d1 - sigma * np.sqrt(T), N)
+        u = growth * peizer_pratt(d1, N) / p
+        d = (growth - p * u) / (1 - p)
+    else:
+        u = np.exp(sigma * np.sqrt(dt))
+        d = 1 / u
+        p = (growth - d) / (u - d)
+    disc = np.exp(-r * dt)
+    # BBS values the last step in closed form, so the tree itself has one step fewer
+    smooth = method == 'bbs' and lattice == 'crr'
+    n = N - 1 if smooth else N
+
+    def last_step(prices):
+        # Option values at step n: intrinsic, or Black-Scholes over the final dt for BBS
+        if smooth:
+            values = black_scholes_price(prices, K, dt, r, sigma, q, sign)
+            if exercise == 'american':
+                values = np.maximum(values, sign * (prices - K))
+            return values
+        return np.maximum(sign * (prices - K), 0)
+
+    # An American call on a stock without dividends is never exercised early
+    if exercise == 'european' or (option_type == 'call' and q <= 0):
+        # Step-n values weighted by binomial probabilities, in log space for large N
+        j = np.arange(n + 1).reshape(-1, 1)
+        asset_prices = S * u ** (n - j) * d ** j
+        log_weights = (gammaln(n + 1) - gammaln(j + 1) - gammaln(n - j + 1)
+                       + (n - j) * np.log(p) + j * np.log1p(-p) + n * np.log(disc))
+        prices = np.sum(np.exp(log_weights) * last_step(asset_prices), axis=0)
+        return prices.reshape(shape) if shape else float(prices[0])
 
-    # Up and down factors
-    u = math.exp(sigma * math.sqrt(dt))
-    d = 1 / u
+    # Asset price of node j (number of down moves) at step i is S u^i (d/u)^j
+    ratios = (d / u) ** np.arange(n + 1).reshape(-1, 1)
 
-    # Risk-neutral probability
-    p = (math.exp(r * dt) - d) / (u - d)
+    def node_prices(i, first, last):
+        # Asset prices of nodes first..last at step i
+        return S * u**i * ratios[first:last + 1]
 
-    # Initializing asset prices at maturity
-    asset_prices = [0] * (N + 1)
-    for i in range(N + 1):
-        asset_prices[i] = S * (u ** (N - i)) * (d ** i)
+    def intrinsic(i, first, last):
+        return np.maximum(sign * (node_prices(i, first, last) - K), 0)
 
-    # Initializing option values at maturity
-    option_values = [0] * (N + 1)
-    for i in range(N + 1):
-        if option_type == "call":
-            option_values[i] = max(asset_prices[i] - K, 0)
-        elif option_type == "put":
-            option_values[i] = max(K - asset_prices[i], 0)
+    # Band of nodes within `width` standard deviations of the number of down moves
+    steps = np.arange(n + 1)
+    center = steps * (1 - p).reshape(-1, 1)
+    spread = width * np.sqrt(steps * (p * (1 - p)).reshape(-1, 1))
+    band_lo = np.maximum(np.floor(center - spread).min(axis=0), 0).astype(int)
+    band_hi = np.minimum(np.ceil(center + spread).max(axis=0), steps).astype(int)
 
-    # Recursive step for the binomial tree
-    for i in range(N - 1, -1, -1):
-        for j in range(i + 1):
-            option_values[j] = (p * option_values[j] + (1 - p) * option_values[j + 1]) * math.exp(-r * dt)
+    # Backward induction with early exercise, one slice per time step
+    pu = disc * p
+    pd = disc * (1 - p)
+    option_values = np.empty((n + 1, K.shape[1]))
+    buffer = np.empty_like(option_values)
+    option_values[band_lo[n]:band_hi[n] + 1] = last_step(node_prices(n, band_lo[n], band_hi[n]))
+    for i in range(n - 1, -1, -1):
+        lo, hi = band_lo[i], band_hi[i]
+        prev_lo, prev_hi = band_lo[i + 1], band_hi[i + 1]
+        if lo < prev_lo:
+            option_values[lo:prev_lo] = intrinsic(i + 1, lo, prev_lo - 1)
+        if hi + 1 > prev_hi:
+            option_values[prev_hi + 1:hi + 2] = intrinsic(i + 1, prev_hi + 1, hi + 1)
 
-    return option_values[0]
+        values = option_values[lo:hi + 1]
+        scratch = buffer[:hi - lo + 1]
+        np.multiply(option_values[lo + 1:hi + 2], pd, out=scratch)
+        values *= pu
+        values += scratch
+        np.subtract(node_prices(i, lo, hi), K, out=scratch)
+        scratch *= sign
+        np.maximum(values, scratch, out=values)
+
+    prices = option_values[0]
+    return prices.reshape(shape) if shape else float(prices[0])
+
+def benchmark_binomial_convergence(S, K, T, r, sigma, option_type='put', exercise='american',
+                                   step_counts=(25, 50, 100, 200, 400, 800), reference_steps=20000, repeats=3):
+    """
+    Error against wall-clock time for each tree variant, plotted on log-log axes.
+
+    The reference price is the BBSR tree with `reference_steps` steps.
+
+    Parameters:
+    S, K, T, r, sigma (float): Option parameters as in binomial_option_pricing
+    option_type (str): Type of the option - 'call' or 'put'
+    exercise (str): Exercise style - 'european' or 'american'
+    step_counts (sequence): Numbers of steps to time for every variant
+    reference_steps (int): Number of steps of the reference tree
+    repeats (int): Timing repeats; the fastest is kept
+
+    Returns:
+    dict: Variant name -> list of (steps, seconds, absolute error)
+    """
+    variants = {
+        'CRR': ('crr', 'crr'),
+        'BBS': ('bbs', 'crr'),
+        'BBSR': ('bbsr', 'crr'),
+        'Leisen-Reimer': ('crr', 'leisen-reimer'),
+        'Leisen-Reimer + Richardson': ('bbsr', 'leisen-reimer'),
+    }
+    reference = binomial_option_pricing(S, K, T, r, sigma, reference_steps, option_type, exercise, method='bbsr')
+    results = {}
+    for name, (method, lattice) in variants.items():
+        results[name] = []
+        for N in step_counts:
+            seconds = np.inf
+            for _ in range(repeats):
+                start = time.perf_counter()
+                price = binomial_option_pricing(S, K, T, r, sigma, N, option_type, exercise,
+                                                method=method, lattice=lattice)
+                seconds = min(seconds, time.perf_counter() - start)
+            results[name].append((N, seconds, abs(price - reference)))
+
+    plt.figure(figsize=(8, 5))
+    for name, points in results.items():
+        _, seconds, errors = zip(*points)
+        plt.loglog(seconds, errors, marker='o', label=name)
+    plt.axhline(0.01, color='grey', linestyle='--', label='One cent')
+    plt.xlabel('Wall-clock time (seconds)')
+    plt.ylabel('Absolute pricing error')
+    plt.title(f'Binomial tree convergence ({exercise} {option_type}, reference {reference:.6f})')
+    plt.legend()
+    return results
 
 # Example usage
 S = 100  # Current stock price
@@ -59,3 +220,30 @@ put_price = binomial_option_pricing(S, K, T, r, sigma, N, 'put')
 
 print(f"Call Option Price: ", call_price)
 print(f"Put Option Price: ", put_price)
+
+# American put on the same tree
+american_put_price = binomial_option_pricing(S, K, T, r, sigma, N, 'put', 'american')
+print(f"American Put Option Price: ", american_put_price)
+
+# A 2-D chain: rows are expiries, columns are strikes
+strikes = np.arange(80, 125, 5)
+expiries = np.array([[0.25], [0.5], [1.0]])
+chain = binomial_option_pricing(S, strikes, expiries, r, sigma, N, 'put', 'american', q=0.02)
+print("American put chain (expiries x strikes):\n", chain)
+
+# Benchmark: N=2000 steps for a 500-strike chain
+strikes = np.linspace(50, 150, 500)
+for exercise in ('european', 'american'):
+    start = time.perf_counter()
+    binomial_option_pricing(S, strikes, T, r, sigma, 2000, 'put', exercise)
+    print(f"{exercise.title()} 500 strikes x 2000 steps: {time.perf_counter() - start:.3f} seconds")
+
+# Accelerated trees: BBSR reaches penny accuracy with a fraction of the steps
+for method, lattice in (('crr', 'crr'), ('bbsr', 'crr'), ('bbsr', 'leisen-reimer')):
+    price = binomial_option_pricing(S, K, T, r, sigma, N, 'put', 'american', method=method, lattice=lattice)
+    print(f"American put, {method.upper()} on {lattice} lattice, N={N}: {price}")
+
+convergence = benchmark_binomial_convergence(S, K, T, r, sigma)
+for name, points in convergence.items():
+    print(name + ": " + ", ".join(f"N={steps} {error:.1e} in {seconds * 1e3:.2f} ms" for steps, seconds, error in points))
+plt.show()
@@ -1,34 +1,224 @@
+import time
 import numpy as np
-import scipy.stats as si
+from scipy.special import ndtr
 
-def bjerksund_stensland_1993(S, K, T, r, sigma):
+# Gauss-Legendre nodes and weights on [-1, 1] for the bivariate normal integral
+GL_NODES, GL_WEIGHTS = np.polynomial.legendre.leggauss(20)
+
+def bivariate_normal_cdf(a, b, rho):
+    """
+    Vectorized bivariate standard normal cdf M(a, b; rho) for |rho| < 1.
+
+    Uses Genz's form of the Plackett integral, M = N(a)N(b) + 1/(2 pi) * integral over
+    theta from 0 to arcsin(rho) of exp(-(a^2 - 2ab sin(theta) + b^2) / (2 cos^2(theta))),
+    evaluated with 20-point Gauss-Legendre quadrature for all points at once.
+    """
+    a, b, rho = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (a, b, rho)))
+    half_angle = 0.5 * np.arcsin(rho)
+    sin_theta = np.sin(half_angle[..., None] * (GL_NODES + 1))
+    a_ = a[..., None]
+    b_ = b[..., None]
+    integrand = np.exp(-(a_ ** 2 - 2 * a_ * b_ * sin_theta + b_ ** 2) / (2 * (1 - sin_theta ** 2)))
+    return ndtr(a) * ndtr(b) + half_angle / (2 * np.pi) * (integrand @ GL_WEIGHTS)
+
+def black_scholes_carry(S, K, T, r, b, sigma, sign=1.0):
+    """Generalized Black-Scholes price with cost of carry b (sign +1 call, -1 put)."""
+    d1 = (np.log(S / K) + (b + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+    return sign * (S * np.exp((b - r) * T) * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+
+def phi(S, T, gamma, H, I, r, b, sigma):
+    """Bjerksund-Stensland phi function, vectorized over all inputs."""
+    lam = (-r + gamma * b + 0.5 * gamma * (gamma - 1) * sigma**2) * T
+    d = -(np.log(S / H) + (b + (gamma - 0.5) * sigma**2) * T) / (sigma * np.sqrt(T))
+    kappa = 2 * b / sigma**2 + (2 * gamma - 1)
+    return np.exp(lam) * S**gamma * (ndtr(d) - (I / S)**kappa * ndtr(d - 2 * np.log(I / S) / (sigma * np.sqrt(T))))
+
+def psi(S, T, gamma, H, I2, I1, t1, r, b, sigma):
+    """Bjerksund-Stensland (2002) psi function, vectorized over all inputs."""
+    drift = b + (gamma - 0.5) * sigma**2
+    vol_t1 = sigma * np.sqrt(t1)
+    vol_T = sigma * np.sqrt(T)
+    e1 = (np.log(S / I1) + drift * t1) / vol_t1
+    e2 = (np.log(I2**2 / (S * I1)) + drift * t1) / vol_t1
+    e3 = (np.log(S / I1) - drift * t1) / vol_t1
+    e4 = (np.log(I2**2 / (S * I1)) - drift * t1) / vol_t1
+    f1 = (np.log(S / H) + drift * T) / vol_T
+    f2 = (np.log(I2**2 / (S * H)) + drift * T) / vol_T
+    f3 = (np.log(I1**2 / (S * H)) + drift * T) / vol_T
+    f4 = (np.log(S * I1**2 / (H * I2**2)) + drift * T) / vol_T
+    rho = np.sqrt(t1 / T)
+    lam = -r + gamma * b + 0.5 * gamma * (gamma - 1) * sigma**2
+    kappa = 2 * b / sigma**2 + (2 * gamma - 1)
+    return np.exp(lam * T) * S**gamma * (bivariate_normal_cdf(-e1, -f1, rho)
+                                         - (I2 / S)**kappa * bivariate_normal_cdf(-e2, -f2, rho)
+                                         - (I1 / S)**kappa * bivariate_normal_cdf(-e3, -f3, -rho)
+                                         + (I1 / I2)**kappa * bivariate_normal_cdf(-e4, -f4, -rho))
+
+def bjerksund_stensland_inputs(S, K, T, r, sigma, b, option_type):
+    """
+    Broadcast inputs and map puts onto calls with the put-call transformation
+    P(S, K, T, r, b, sigma) = C(K, S, T, r - b, -b, sigma).
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    b = r if b is None else b
+    S, K, T, r, sigma, b = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, b)))
+    if option_type == 'put':
+        S, K, r, b = K, S, r - b, -b
+    return S, K, T, r, sigma, b
+
+def bjerksund_stensland_1993(S, K, T, r, sigma, b=None, option_type='call'):
+    """
+    Bjerksund and Stensland (1993) approximation for American options.
+
+    Vectorized over all inputs: branches are replaced by masks, so arrays of contracts
+    are priced in one call. Calls with b >= r are never exercised early and get the
+    European price; puts use the put-call transformation.
+
+    Parameters:
+    S (float or array): Current stock price
+    K (float or array): Strike price
+    T (float or array): Time to maturity in years
+    r (float or array): Risk-free interest rate
+    sigma (float or array): Volatility of the stock
+    b (float, array or None): Cost of carry (r - dividend yield); defaults to r
+    option_type (str): Type of the option - 'call' or 'put'
+
+    Returns:
+    float or numpy.ndarray: American option price(s)
+    """
+    shape = np.broadcast(S, K, T, r, sigma, r if b is None else b).shape
+    S, K, T, r, sigma, b = bjerksund_stensland_inputs(S, K, T, r, sigma, b, option_type)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        beta = (0.5 - b / sigma**2) + np.sqrt((b / sigma**2 - 0.5)**2 + 2 * r / sigma**2)
+        BInfinity = beta / (beta - 1) * K
+        B0 = np.maximum(K, r / (r - b) * K)
+        h = -(b * T + 2 * sigma * np.sqrt(T)) * B0 / (BInfinity - B0)
+        I = B0 + (BInfinity - B0) * (1 - np.exp(h))
+        alpha = (I - K) * I**(-beta)
+
+        american = (alpha * S**beta - alpha * phi(S, T, beta, I, I, r, b, sigma)
+                    + phi(S, T, 1, I, I, r, b, sigma) - phi(S, T, 1, K, I, r, b, sigma)
+                    - K * phi(S, T, 0, I, I, r, b, sigma) + K * phi(S, T, 0, K, I, r, b, sigma))
+        price = np.where(S >= I, S - K, american)
+        price = np.where(b >= r, black_scholes_carry(S, K, T, r, b, sigma), price)
+
+    return price.reshape(shape) if shape else float(price)
+
+def bjerksund_stensland_2002(S, K, T, r, sigma, b=None, option_type='call'):
     """
-    Bjerksund and Stensland (1993) approximation for American call options.
+    Bjerksund and Stensland (2002) two-boundary approximation for American options.
+
+    The exercise boundary is flat at I1 up to t1 = (sqrt(5) - 1) / 2 * T and at I2
+    afterwards, which is noticeably more accurate than the single flat boundary of
+    the 1993 version. Vectorized over all inputs with masks instead of branches.
 
     Parameters:
-    S (float): Current stock price
-    K (float): Strike price
-    T (float): Time to maturity in years
-    r (float): Risk-free interest rate
-    sigma (float): Volatility of the stock
+    S (float or array): Current stock price
+    K (float or array): Strike price
+    T (float or array): Time to maturity in years
+    r (float or array): Risk-free interest rate
+    sigma (float or array): Volatility of the stock
+    b (float, array or None): Cost of carry (r - dividend yield); defaults to r
+    option_type (str): Type of the option - 'call' or 'put'
 
     Returns:
-    float: American Call Option Price
+    float or numpy.ndarray: American option price(s)
     """
-    if S >= K:
-        return S - K
+    shape = np.broadcast(S, K, T, r, sigma, r if b is None else b).shape
+    S, K, T, r, sigma, b = bjerksund_stensland_inputs(S, K, T, r, sigma, b, option_type)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        t1 = 0.5 * (np.sqrt(5) - 1) * T
+        beta = (0.5 - b / sigma**2) + np.sqrt((b / sigma**2 - 0.5)**2 + 2 * r / sigma**2)
+        BInfinity = beta / (beta - 1) * K
+        B0 = np.maximum(K, r / (r - b) * K)
+        h1 = -(b * t1 + 2 * sigma * np.sqrt(t1)) * K**2 / ((BInfinity - B0) * B0)
+        h2 = -(b * T + 2 * sigma * np.sqrt(T)) * K**2 / ((BInfinity - B0) * B0)
+        I1 = B0 + (BInfinity - B0) * (1 - np.exp(h1))
+        I2 = B0 + (BInfinity - B0) * (1 - np.exp(h2))
+        alpha1 = (I1 - K) * I1**(-beta)
+        alpha2 = (I2 - K) * I2**(-beta)
 
-    alpha = (0.5 - r / sigma**2) + np.sqrt((r / sigma**2 - 0.5)**2 + 2 * r / sigma**2)
-    beta = (np.exp(r * T) - 1) / (alpha * (np.exp(alpha * r * T) - 1))
-    BInfinity = beta * K
-    B0 = max(K, r / (r - 1) * K)
-    h1 = -(r * T + 2 * sigma * np.sqrt(T)) * B0 / (BInfinity - B0)
-    I = B0 + (BInfinity - B0) * (1 - np.exp(h1))
+        american = (alpha2 * S**beta - alpha2 * phi(S, t1, beta, I2, I2, r, b, sigma)
+                    + phi(S, t1, 1, I2, I2, r, b, sigma) - phi(S, t1, 1, I1, I2, r, b, sigma)
+                    - K * phi(S, t1, 0, I2, I2, r, b, sigma) + K * phi(S, t1, 0, I1, I2, r, b, sigma)
+                    + alpha1 * phi(S, t1, beta, I1, I2, r, b, sigma)
+                    - alpha1 * psi(S, T, beta, I1, I2, I1, t1, r, b, sigma)
+                    + psi(S, T, 1, I1, I2, I1, t1, r, b, sigma) - psi(S, T, 1, K, I2, I1, t1, r, b, sigma)
+                    - K * psi(S, T, 0, I1, I2, I1, t1, r, b, sigma) + K * psi(S, T, 0, K, I2, I1, t1, r, b, sigma))
+        price = np.where(S >= I2, S - K, american)
+        price = np.where(b >= r, black_scholes_carry(S, K, T, r, b, sigma), price)
+
+    return price.reshape(shape) if shape else float(price)
+
+def binomial_american(S, K, T, r, sigma, b, option_type='call', N=1000):
+    """
+    Vectorized CRR binomial tree for American options, one column per contract.
+
+    Parameters:
+    S, K, T, r, sigma, b (float or array): Contract inputs as in bjerksund_stensland_2002
+    option_type (str): Type of the option - 'call' or 'put'
+    N (int): Number of steps in the binomial tree
+
+    Returns:
+    numpy.ndarray: American option prices
+    """
+    S, K, T, r, sigma, b = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (S, K, T, r, sigma, b)))
+    sign = 1.0 if option_type == 'call' else -1.0
+    dt = T / N
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1 / u
+    p = (np.exp(b * dt) - d) / (u - d)
+    pu = np.exp(-r * dt) * p
+    pd = np.exp(-r * dt) * (1 - p)
 
-    if S < I:
-        return B0 - S + (S - B0)**2 / (BInfinity - B0) * np.exp(h1)
-    else:
-        return S - K
+    j = np.arange(N + 1).reshape(-1, 1)
+    values = np.maximum(sign * (S * u**(N - 2 * j) - K), 0)
+    for i in range(N - 1, -1, -1):
+        values = pu * values[:i + 1] + pd * values[1:i + 2]
+        np.maximum(values, sign * (S * u**(i - 2 * j[:i + 1]) - K), out=values)
+    return values[0]
+
+def compare_with_binomial(n_contracts=500, reference_steps=1000, fast_steps=100, seed=0):
+    """
+    Accuracy-versus-speed comparison of the approximations against the binomial tree.
+
+    Parameters:
+    n_contracts (int): Number of random American put contracts
+    reference_steps (int): Binomial steps used as the reference price
+    fast_steps (int): Binomial steps for the fast tree being compared
+    seed (int): Seed for the random contracts
+
+    Returns:
+    dict: For each method, the RMS and maximum absolute error versus the reference
+          tree and the contracts priced per second
+    """
+    rng = np.random.default_rng(seed)
+    S = np.full(n_contracts, 100.0)
+    K = rng.uniform(70, 130, n_contracts)
+    T = rng.uniform(0.1, 2.0, n_contracts)
+    r = rng.uniform(0.01, 0.08, n_contracts)
+    sigma = rng.uniform(0.1, 0.5, n_contracts)
+    b = r - rng.uniform(0.0, 0.05, n_contracts)
+
+    reference = binomial_american(S, K, T, r, sigma, b, 'put', reference_steps)
+    methods = {
+        'bjerksund_stensland_1993': lambda: bjerksund_stensland_1993(S, K, T, r, sigma, b, 'put'),
+        'bjerksund_stensland_2002': lambda: bjerksund_stensland_2002(S, K, T, r, sigma, b, 'put'),
+        f'binomial_{fast_steps}_steps': lambda: binomial_american(S, K, T, r, sigma, b, 'put', fast_steps),
+    }
+    results = {}
+    for name, method in methods.items():
+        start = time.perf_counter()
+        prices = method()
+        elapsed = time.perf_counter() - start
+        errors = prices - reference
+        results[name] = {'rmse': np.sqrt(np.mean(errors**2)), 'max_error': np.max(np.abs(errors)),
+                         'per_sec': n_contracts / elapsed}
+    return results
 
 # Example usage
 S = 90    # Current stock price
@@ -36,6 +226,18 @@ K = 100   # Strike price
 T = 1     # Time to maturity (1 year)
 r = 0.05  # Risk-free rate (5%)
 sigma = 0.2  # Volatility (20%)
+b = 0.02  # Cost of carry (3% dividend yield)
 
-american_call_price = bjerksund_stensland_1993(S, K, T, r, sigma)
+american_call_price = bjerksund_stensland_1993(S, K, T, r, sigma, b)
 print(f"American Call Option Price: {american_call_price}")
+print(f"American Call Option Price (2002): {bjerksund_stensland_2002(S, K, T, r, sigma, b)}")
+print(f"American Put Option Price (2002): {bjerksund_stensland_2002(S, K, T, r, sigma, b, 'put')}")
+
+# Arrays of contracts in one call
+strikes = np.array([80, 90, 100, 110, 120])
+print("American put chain (2002): ", bjerksund_stensland_2002(S, strikes, T, r, sigma, b, 'put'))
+
+# Accuracy versus speed against the binomial tree
+for name, stats in compare_with_binomial().items():
+    print(f"{name}: RMSE {stats['rmse']:.4f}, max error {stats['max_error']:.4f}, "
+          f"{stats['per_sec']:,.0f} contracts/sec")
@@ -1,5 +1,8 @@
 import math
+import time
+import numpy as np
 from scipy.stats import norm
+from scipy.special import ndtr
 
 def black_scholes(S, K, T, r, sigma, option_type='call'):
     """
@@ -30,6 +33,109 @@ def black_scholes(S, K, T, r, sigma, option_type='call'):
 
     return option_price
 
+def black_scholes_chain(S, K, T, r, sigma, q=0.0, option_type='call'):
+    """
+    Calculate Black-Scholes prices and Greeks for a whole option chain in one pass.
+
+    All inputs are broadcast against each other, so any of them may be scalars or
+    NumPy arrays (or DataFrame columns). d1/d2, the normal pdf and the normal cdf are
+    each evaluated once for the entire chain.
+
+    Parameters:
+    S (float or array): Spot price of the underlying asset
+    K (float or array): Strike price
+    T (float or array): Time to maturity in years
+    r (float or array): Risk-free interest rate
+    sigma (float or array): Volatility of the underlying asset
+    q (float or array): Continuous dividend yield
+    option_type (str or array): 'call'/'put' labels, or booleans where True means call
+
+    Returns:
+    dict: Arrays 'price', 'delta', 'gamma', 'vega', 'theta' (per year) and 'rho'
+    """
+    S, K, T, r, sigma, q = (np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q))
+    option_type = np.asarray(option_type)
+    if option_type.dtype.kind == 'b':
+        is_call = option_type
+    else:
+        if not np.all(np.isin(option_type, ['call', 'put'])):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        is_call = option_type == 'call'
+    sign = np.where(is_call, 1.0, -1.0)
+
+    # Calculating d1 and d2 once for the whole chain
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+
+    # One pdf and one cdf evaluation per leg; puts use N(-x) = 1 - N(x)
+    pdf_d1 = np.exp(-0.5 * d1 ** 2) / math.sqrt(2 * math.pi)
+    cdf_d1 = ndtr(sign * d1)
+    cdf_d2 = ndtr(sign * d2)
+    S_disc = S * np.exp(-q * T)
+    K_disc = K * np.exp(-r * T)
+
+    price = sign * (S_disc * cdf_d1 - K_disc * cdf_d2)
+    delta = sign * np.exp(-q * T) * cdf_d1
+    gamma = np.exp(-q * T) * pdf_d1 / (S * vol_sqrt_T)
+    vega = S_disc * pdf_d1 * sqrt_T
+    theta = (-S_disc * pdf_d1 * sigma / (2 * sqrt_T)
+             + sign * (q * S_disc * cdf_d1 - r * K_disc * cdf_d2))
+    rho = sign * K_disc * T * cdf_d2
+
+    return {'price': price, 'delta': delta, 'gamma': gamma,
+            'vega': vega, 'theta': theta, 'rho': rho}
+
+def black_scholes_chain_df(chain):
+    """
+    Price a DataFrame option chain with black_scholes_chain.
+
+    Parameters:
+    chain (pandas.DataFrame): Columns 'S', 'K', 'T', 'r', 'sigma', 'option_type'
+                              and optionally 'q'
+
+    Returns:
+    pandas.DataFrame: The input chain with price and Greek columns appended
+    """
+    q = chain['q'].to_numpy() if 'q' in chain else 0.0
+    results = black_scholes_chain(chain['S'].to_numpy(), chain['K'].to_numpy(), chain['T'].to_numpy(),
+                                  chain['r'].to_numpy(), chain['sigma'].to_numpy(), q,
+                                  chain['option_type'].to_numpy())
+    return chain.assign(**results)
+
+def benchmark_black_scholes_chain(n_contracts, seed=0):
+    """
+    Compare the throughput of the scalar black_scholes loop and black_scholes_chain.
+
+    Parameters:
+    n_contracts (int): Number of contracts in the random test chain
+    seed (int): Seed for the random chain
+
+    Returns:
+    dict: Contracts per second for each implementation and the maximum price difference
+    """
+    rng = np.random.default_rng(seed)
+    S = np.full(n_contracts, 100.0)
+    K = rng.uniform(60, 140, n_contracts)
+    T = rng.uniform(0.05, 2.0, n_contracts)
+    r = np.full(n_contracts, 0.05)
+    sigma = rng.uniform(0.1, 0.5, n_contracts)
+    option_type = np.where(rng.random(n_contracts) < 0.5, 'call', 'put')
+
+    start = time.perf_counter()
+    scalar_prices = np.array([black_scholes(S[i], K[i], T[i], r[i], sigma[i], option_type[i])
+                              for i in range(n_contracts)])
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chain_prices = black_scholes_chain(S, K, T, r, sigma, 0.0, option_type)['price']
+    chain_time = time.perf_counter() - start
+
+    return {'scalar_per_sec': n_contracts / scalar_time,
+            'chain_per_sec': n_contracts / chain_time,
+            'max_abs_diff': np.max(np.abs(scalar_prices - chain_prices))}
+
 # Example usage
 S = 100  # Spot price
 K = 100  # Strike price
@@ -42,3 +148,15 @@ put_price = black_scholes(S, K, T, r, sigma, 'put')
 
 print(f"Call Option Price: ", {call_price})
 print(f"Put Option Price: ",{put_price})
+
+# Price a small chain with all Greeks in one call
+strikes = np.array([90, 95, 100, 105, 110])
+chain = black_scholes_chain(S, strikes, T, r, sigma, 0.0, 'call')
+print("Chain prices: ", chain['price'])
+print("Chain deltas: ", chain['delta'])
+
+# Throughput benchmark against the scalar function
+benchmark = benchmark_black_scholes_chain(20000)
+print(f"Scalar loop: {benchmark['scalar_per_sec']:,.0f} contracts/sec")
+print(f"Vectorized chain: {benchmark['chain_per_sec']:,.0f} contracts/sec")
+print(f"Max price difference: {benchmark['max_abs_diff']:.2e}")
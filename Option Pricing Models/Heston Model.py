@@ -1,4 +1,7 @@
+import time
+import tracemalloc
 import numpy as np
+from scipy.special import ndtri
 
 def heston_model(S0, K, T, r, V0, kappa, theta, xi, rho, simulations, time_steps):
     """
@@ -33,12 +36,371 @@ def heston_model(S0, K, T, r, V0, kappa, theta, xi, rho, simulations, time_steps
         Z2 = rho * Z1 + np.sqrt(1 - rho**2) * Z2
 
         variances[t] = np.maximum(variances[t - 1] + kappa * (theta - np.maximum(variances[t - 1], 0)) * dt + xi * np.sqrt(np.maximum(variances[t - 1], 0)) * np.sqrt(dt) * Z2, 0)
-        prices[t] = prices[t - 1] * np.exp((r - 0.5 * variances[t]) * dt + np.sqrt(variances[t]) * np.sqrt(dt) * Z1)
+        prices[t] = prices[t - 1] * np.exp((r - 0.5 * variances[t - 1]) * dt + np.sqrt(variances[t - 1]) * np.sqrt(dt) * Z1)
 
     payoffs = np.maximum(prices[-1] - K, 0)
     option_price = np.exp(-r * T) * np.mean(payoffs)
     return option_price
 
+def heston_characteristic_function(u, T, r, V0, kappa, theta, xi, rho, q=0.0):
+    """
+    Characteristic function of log(S_T / S_0) under the Heston model.
+
+    Uses the "little Heston trap" formulation, which avoids the branch-cut
+    discontinuity of the complex logarithm for long maturities.
+
+    Parameters:
+    u (complex array): Points at which to evaluate the characteristic function
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    V0 (float): Initial variance
+    kappa (float): Rate of reversion
+    theta (float): Long-run variance
+    xi (float): Volatility of the volatility
+    rho (float): Correlation coefficient between asset and variance
+    q (float): Continuous dividend yield
+
+    Returns:
+    complex array: E[exp(i u log(S_T / S_0))]
+    """
+    u = np.asarray(u, dtype=complex)
+    beta = kappa - rho * xi * 1j * u
+    d = np.sqrt(beta ** 2 + xi ** 2 * (1j * u + u ** 2))
+    g = (beta - d) / (beta + d)
+    exp_dT = np.exp(-d * T)
+    C = kappa * theta / xi ** 2 * ((beta - d) * T - 2 * np.log((1 - g * exp_dT) / (1 - g)))
+    D = (beta - d) / xi ** 2 * (1 - exp_dT) / (1 - g * exp_dT)
+    return np.exp(1j * u * (r - q) * T + C + D * V0)
+
+def heston_fft(S0, K, T, r, V0, kappa, theta, xi, rho, q=0.0, option_type='call', alpha=1.5, N=4096, eta=0.25):
+    """
+    Carr-Madan FFT pricer for European options under the Heston model.
+
+    One FFT of length N prices calls on a log-strike grid centred at S0; the requested
+    strikes are then read off the grid by interpolation in log-strike. Puts follow from
+    put-call parity.
+
+    Parameters:
+    S0 (float): Current stock price
+    K (float or array): Strike price(s) for this expiry
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    V0 (float): Initial variance
+    kappa (float): Rate of reversion
+    theta (float): Long-run variance
+    xi (float): Volatility of the volatility
+    rho (float): Correlation coefficient between asset and variance
+    q (float): Continuous dividend yield
+    option_type (str): Type of the option - 'call' or 'put'
+    alpha (float): Damping factor of the call price in log-strike
+    N (int): Number of FFT points (a power of two)
+    eta (float): Spacing of the integration grid
+
+    Returns:
+    float or numpy.ndarray: Option price(s) for the requested strikes
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+
+    # Integration grid v_j and log-strike grid k_u = log(S0) - b + lambda * u
+    lam = 2 * np.pi / (N * eta)
+    b = N * lam / 2
+    v = eta * np.arange(N)
+    log_strikes = np.log(S0) - b + lam * np.arange(N)
+
+    # Damped call transform, with phi the characteristic function of log(S_T)
+    phi = np.exp(1j * (v - (alpha + 1) * 1j) * np.log(S0)) * \
+        heston_characteristic_function(v - (alpha + 1) * 1j, T, r, V0, kappa, theta, xi, rho, q)
+    psi = np.exp(-r * T) * phi / (alpha ** 2 + alpha - v ** 2 + 1j * (2 * alpha + 1) * v)
+
+    # Simpson weights and a single FFT over the whole strike grid
+    simpson = 3 + (-1) ** np.arange(1, N + 1)
+    simpson[0] = 1
+    x = np.exp(1j * v * (b - np.log(S0))) * psi * eta * simpson / 3
+    calls = np.exp(-alpha * log_strikes) / np.pi * np.real(np.fft.fft(x))
+
+    K = np.asarray(K, dtype=float)
+    prices = np.interp(np.log(K), log_strikes, calls)
+    if option_type == 'put':
+        prices = prices - S0 * np.exp(-q * T) + K * np.exp(-r * T)
+    return prices if prices.ndim else float(prices)
+
+def heston_cos(S0, K, T, r, V0, kappa, theta, xi, rho, q=0.0, option_type='call', N=256, L=12):
+    """
+    Fang-Oosterlee COS pricer for European options under the Heston model.
+
+    Put payoffs are expanded in a Fourier-cosine series on a truncation range set by
+    the first two cumulants of log(S_T / S_0), widened to cover every requested
+    log-moneyness; the whole strike vector is priced by one
+    (N x strikes) matrix product. Calls follow from put-call parity.
+
+    Parameters:
+    S0 (float): Current stock price
+    K (float or array): Strike price(s) for this expiry
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    V0 (float): Initial variance
+    kappa (float): Rate of reversion
+    theta (float): Long-run variance
+    xi (float): Volatility of the volatility
+    rho (float): Correlation coefficient between asset and variance
+    q (float): Continuous dividend yield
+    option_type (str): Type of the option - 'call' or 'put'
+    N (int): Number of cosine terms
+    L (float): Width of the truncation range in standard deviations
+
+    Returns:
+    float or numpy.ndarray: Option price(s) for the requested strikes
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+
+    # Truncation range from the cumulants of log(S_T / S_0)
+    e = np.exp(-kappa * T)
+    c1 = (r - q) * T + (1 - e) * (theta - V0) / (2 * kappa) - 0.5 * theta * T
+    c2 = 1 / (8 * kappa ** 3) * (xi * T * kappa * e * (V0 - theta) * (8 * kappa * rho - 4 * xi)
+                                 + kappa * rho * xi * (1 - e) * (16 * theta - 8 * V0)
+                                 + 2 * theta * kappa * T * (-4 * kappa * rho * xi + xi ** 2 + 4 * kappa ** 2)
+                                 + xi ** 2 * ((theta - 2 * V0) * e ** 2 + theta * (6 * e - 7) + 2 * V0)
+                                 + 8 * kappa ** 2 * (V0 - theta) * (1 - e))
+    K = np.asarray(K, dtype=float)
+    x = np.log(S0 / np.atleast_1d(K))
+    a = x.min() + c1 - L * np.sqrt(abs(c2))
+    b = x.max() + c1 + L * np.sqrt(abs(c2))
+
+    # Cosine coefficients of the put payoff K * max(1 - e^y, 0) on [a, 0]
+    k = np.arange(N)
+    w = k * np.pi / (b - a)
+    chi = (np.cos(-w * a) - np.exp(a) + w * np.sin(-w * a)) / (1 + w ** 2)
+    psi = np.empty(N)
+    psi[0] = -a
+    psi[1:] = np.sin(-w[1:] * a) / w[1:]
+    payoff = 2 / (b - a) * (psi - chi)
+    payoff[0] *= 0.5
+
+    phi = heston_characteristic_function(w, T, r, V0, kappa, theta, xi, rho, q)
+    terms = np.real(phi[:, None] * np.exp(1j * w[:, None] * (x[None, :] - a)))
+    puts = np.exp(-r * T) * np.atleast_1d(K) * (payoff @ terms)
+
+    prices = puts if option_type == 'put' else puts + S0 * np.exp(-q * T) - np.atleast_1d(K) * np.exp(-r * T)
+    return prices.reshape(K.shape) if K.ndim else float(prices[0])
+
+def heston_monte_carlo(S0, K, T, r, V0, kappa, theta, xi, rho, simulations, time_steps, q=0.0,
+                       option_type='call', payoff='european', scheme='qe', chunk_size=100000, seed=None):
+    """
+    Streaming Monte Carlo for the Heston model with bounded memory.
+
+    Paths are simulated in chunks of `chunk_size`, advancing the log-price and variance
+    in place, and only the running statistic the payoff needs (terminal price, running
+    average or running extreme) is kept. Memory therefore depends on `chunk_size`, not
+    on `simulations`. The 'qe' scheme is Andersen's quadratic-exponential discretisation
+    with the martingale correction, which needs far fewer time steps than the 'euler'
+    full-truncation scheme for the same bias.
+
+    Parameters:
+    S0 (float): Current stock price
+    K (float): Strike price
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    V0 (float): Initial variance
+    kappa (float): Rate of reversion
+    theta (float): Long-run variance
+    xi (float): Volatility of the volatility
+    rho (float): Correlation coefficient between asset and variance
+    simulations (int): Number of simulations
+    time_steps (int): Number of time steps
+    q (float): Continuous dividend yield
+    option_type (str): Type of the option - 'call' or 'put'
+    payoff (str): 'european', 'asian' (arithmetic average over the time steps) or
+                  'lookback' (fixed strike on the running maximum/minimum)
+    scheme (str): Variance discretisation - 'qe' or 'euler'
+    chunk_size (int): Number of paths simulated at a time
+    seed (int or None): Seed for the random number generator
+
+    Returns:
+    float, float: Estimated option price and its standard error
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    if payoff not in ('european', 'asian', 'lookback'):
+        raise ValueError("Invalid payoff. Use 'european', 'asian' or 'lookback'.")
+    if scheme not in ('qe', 'euler'):
+        raise ValueError("Invalid scheme. Use 'qe' or 'euler'.")
+
+    rng = np.random.default_rng(seed)
+    sign = 1.0 if option_type == 'call' else -1.0
+    dt = T / time_steps
+    drift = (r - q) * dt
+
+    # QE constants (Andersen 2008) with central weights gamma1 = gamma2 = 1/2
+    e = np.exp(-kappa * dt)
+    c1 = xi ** 2 * e * (1 - e) / kappa
+    c2 = theta * xi ** 2 * (1 - e) ** 2 / (2 * kappa)
+    K0 = -rho * kappa * theta * dt / xi
+    K1 = 0.5 * dt * (kappa * rho / xi - 0.5) - rho / xi
+    K2 = 0.5 * dt * (kappa * rho / xi - 0.5) + rho / xi
+    K3 = 0.5 * dt * (1 - rho ** 2)
+    A = K2 + 0.5 * K3
+
+    total = 0.0
+    total_sq = 0.0
+    for start in range(0, simulations, chunk_size):
+        n = min(chunk_size, simulations - start)
+        log_S = np.full(n, np.log(S0))
+        v = np.full(n, float(V0))
+        if payoff == 'asian':
+            running = np.zeros(n)
+        elif payoff == 'lookback':
+            running = np.full(n, float(S0))
+
+        for _ in range(time_steps):
+            Z = rng.standard_normal(n)
+            if scheme == 'euler':
+                Zv = rho * Z + np.sqrt(1 - rho ** 2) * rng.standard_normal(n)
+                v_pos = np.maximum(v, 0)
+                log_S += drift - 0.5 * v_pos * dt + np.sqrt(v_pos * dt) * Z
+                v += kappa * (theta - v_pos) * dt + xi * np.sqrt(v_pos * dt) * Zv
+            else:
+                # Moment-matched next variance: quadratic branch for small psi, exponential otherwise
+                m = theta + (v - theta) * e
+                psi = (c1 * v + c2) / m ** 2
+                U = rng.random(n)
+                quadratic = psi <= 1.5
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    b2 = np.where(quadratic, 2 / psi - 1 + np.sqrt(2 / psi) * np.sqrt(np.maximum(2 / psi - 1, 0)), 0)
+                    a = m / (1 + b2)
+                    p = np.where(quadratic, 0, (psi - 1) / (psi + 1))
+                    beta = (1 - p) / m
+                    v_quad = a * (np.sqrt(b2) + ndtri(U)) ** 2
+                    v_exp = np.where(U <= p, 0, np.log((1 - p) / (1 - U)) / beta)
+                    v_next = np.where(quadratic, v_quad, v_exp)
+
+                    # Martingale correction replaces K0 so that E[S_{t+dt}] = S_t * exp(drift)
+                    K0_star = np.where(quadratic,
+                                       -A * b2 * a / (1 - 2 * A * a) + 0.5 * np.log(1 - 2 * A * a),
+                                       -np.log(p + beta * (1 - p) / (beta - A))) - (K1 + 0.5 * K3) * v
+                K0_star = np.where(np.isfinite(K0_star), K0_star, K0)
+                log_S += drift + K0_star + K1 * v + K2 * v_next + np.sqrt(K3 * (v + v_next)) * Z
+                v = v_next
+
+            if payoff == 'asian':
+                running += np.exp(log_S)
+            elif payoff == 'lookback':
+                extreme = np.maximum if option_type == 'call' else np.minimum
+                extreme(running, np.exp(log_S), out=running)
+
+        if payoff == 'european':
+            underlying = np.exp(log_S)
+        elif payoff == 'asian':
+            underlying = running / time_steps
+        else:
+            underlying = running
+        payoffs = np.maximum(sign * (underlying - K), 0)
+        total += payoffs.sum()
+        total_sq += np.dot(payoffs, payoffs)
+
+    mean = total / simulations
+    variance = max(total_sq / simulations - mean ** 2, 0) * simulations / max(simulations - 1, 1)
+    discount = np.exp(-r * T)
+    return discount * mean, discount * np.sqrt(variance / simulations)
+
+def heston_greeks(S0, K, T, r, V0, kappa, theta, xi, rho, simulations, time_steps, q=0.0, option_type='call',
+                  payoff='vanilla', seed=0, vol_bump=0.01):
+    """
+    Price, delta, gamma, vega and rho for a European option under the Heston model from
+    one simulation.
+
+    Conditional on the variance path, the log-price is normal, with the part driven by
+    the independent normal having variance (1 - rho^2) * integrated variance. That
+    conditional density supplies likelihood-ratio weights in S0 and r. Vanilla payoffs use
+    pathwise delta and rho with a mixed likelihood-ratio/pathwise gamma; digital payoffs
+    use likelihood-ratio weights throughout. Vega (with respect to the initial
+    volatility sqrt(V0)) is a central bump that reuses the same random numbers.
+
+    Parameters:
+    S0 (float): Current stock price
+    K (float): Strike price
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    V0 (float): Initial variance
+    kappa (float): Rate of reversion
+    theta (float): Long-run variance
+    xi (float): Volatility of the volatility
+    rho (float): Correlation coefficient between asset and variance (|rho| < 1)
+    simulations (int): Number of simulations
+    time_steps (int): Number of time steps
+    q (float): Continuous dividend yield
+    option_type (str): Type of the option - 'call' or 'put'
+    payoff (str): 'vanilla' or 'digital' (cash-or-nothing paying 1)
+    seed (int): Seed shared by the base and bumped simulations
+    vol_bump (float): Bump applied to sqrt(V0) for vega
+
+    Returns:
+    dict: Estimates 'price', 'delta', 'gamma', 'vega', 'rho' and their 'std_errors'
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    if payoff not in ('vanilla', 'digital'):
+        raise ValueError("Invalid payoff. Use 'vanilla' or 'digital'.")
+    dt = T / time_steps
+    sign = 1.0 if option_type == 'call' else -1.0
+    discount = np.exp(-r * T)
+
+    def simulate(initial_variance):
+        # Euler full truncation; the same seed gives common random numbers across bumps
+        rng = np.random.default_rng(seed)
+        log_S = np.full(simulations, np.log(S0))
+        v = np.full(simulations, float(initial_variance))
+        independent = np.zeros(simulations)
+        integrated = np.zeros(simulations)
+        for _ in range(time_steps):
+            Zv = rng.standard_normal(simulations)
+            Zi = rng.standard_normal(simulations)
+            v_pos = np.maximum(v, 0)
+            vol = np.sqrt(v_pos * dt)
+            log_S += (r - q - 0.5 * v_pos) * dt + vol * (rho * Zv + np.sqrt(1 - rho**2) * Zi)
+            independent += vol * Zi
+            integrated += v_pos * dt
+            v += kappa * (theta - v_pos) * dt + xi * vol * Zv
+        return np.exp(log_S), np.sqrt(1 - rho**2) * independent, (1 - rho**2) * integrated
+
+    def value(ST):
+        if payoff == 'vanilla':
+            return np.maximum(sign * (ST - K), 0)
+        return (sign * (ST - K) > 0).astype(float)
+
+    ST, B, variance = simulate(V0)
+    payoff_value = value(ST)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = np.where(variance > 0, B / variance, 0)  # d log density / d log S0
+        curvature = np.where(variance > 0, score**2 - 1 / variance - score, 0)
+
+    if payoff == 'vanilla':
+        slope = sign * (sign * (ST - K) > 0)
+        samples = {
+            'price': discount * payoff_value,
+            'delta': discount * slope * ST / S0,
+            'gamma': discount * slope * ST * (score - 1) / S0**2,
+            'rho': discount * (slope * ST * T - T * payoff_value),
+        }
+    else:
+        samples = {
+            'price': discount * payoff_value,
+            'delta': discount * payoff_value * score / S0,
+            'gamma': discount * payoff_value * curvature / S0**2,
+            'rho': discount * payoff_value * (score * T - T),
+        }
+
+    # Vega by a central bump of sqrt(V0) with common random numbers
+    vol0 = np.sqrt(V0)
+    up = value(simulate((vol0 + vol_bump)**2)[0])
+    down = value(simulate(max(vol0 - vol_bump, 0)**2)[0])
+    samples['vega'] = discount * (up - down) / (2 * vol_bump)
+
+    estimates = {name: np.mean(x) for name, x in samples.items()}
+    estimates['std_errors'] = {name: np.std(x, ddof=1) / np.sqrt(simulations) for name, x in samples.items()}
+    return estimates
+
 # Example usage
 S0 = 100  # Current stock price
 K = 100   # Strike price
@@ -54,3 +416,30 @@ time_steps = 100 # Number of time steps
 
 option_price = heston_model(S0, K, T, r, V0, kappa, theta, xi, rho, simulations, time_steps)
 print(f"Option Price: {option_price}")
+
+# Semi-analytic prices for a whole strike grid, with Monte Carlo as a cross-check
+strikes = np.array([80, 90, 100, 110, 120])
+print("Carr-Madan FFT prices: ", heston_fft(S0, strikes, T, r, V0, kappa, theta, xi, rho))
+print("COS prices: ", heston_cos(S0, strikes, T, r, V0, kappa, theta, xi, rho))
+print(f"FFT at-the-money price: {heston_fft(S0, K, T, r, V0, kappa, theta, xi, rho)}")
+
+# Streaming Monte Carlo: QE needs far fewer steps than Euler for the same bias
+for scheme, steps in (('qe', 10), ('euler', 10), ('euler', 100)):
+    start = time.perf_counter()
+    price, std_error = heston_monte_carlo(S0, K, T, r, V0, kappa, theta, xi, rho, 200000, steps,
+                                          scheme=scheme, seed=42)
+    print(f"{scheme.upper()} with {steps} steps: {price:.4f} +/- {std_error:.4f} "
+          f"({time.perf_counter() - start:.2f} s)")
+
+# Memory stays flat as the number of simulations grows
+for paths in (100000, 1000000):
+    tracemalloc.start()
+    heston_monte_carlo(S0, K, T, r, V0, kappa, theta, xi, rho, paths, 10, payoff='asian', seed=42)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{paths} Asian paths: peak memory {peak / 1e6:.1f} MB")
+
+# Greeks from a single simulation
+greeks = heston_greeks(S0, K, T, r, V0, kappa, theta, xi, rho, 100000, 50)
+print("Heston Greeks: " + ", ".join(f"{name} {greeks[name]:.4f} (+/- {greeks['std_errors'][name]:.4f})"
+                                    for name in ('price', 'delta', 'gamma', 'vega', 'rho')))
@@ -0,0 +1,165 @@
+import math
+import time
+import numpy as np
+from scipy.special import ndtr
+from scipy.optimize import brentq
+
+def black_scholes_price_vega(S, K, T, r, sigma, q=0.0, sign=1.0):
+    """Vectorized Black-Scholes price (sign +1 call, -1 put) and vega, with d1 and d2 for the Halley correction."""
+    sqrt_T = np.sqrt(T)
+    vol_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / vol_sqrt_T
+    d2 = d1 - vol_sqrt_T
+    S_disc = S * np.exp(-q * T)
+    price = sign * (S_disc * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+    vega = S_disc * np.exp(-0.5 * d1 ** 2) / math.sqrt(2 * math.pi) * sqrt_T
+    return price, vega, d1, d2
+
+def implied_volatility(price, S, K, T, r, q=0.0, option_type='call', tol=1e-8, max_iter=50,
+                       sigma_min=1e-4, sigma_max=5.0):
+    """
+    Back out Black-Scholes implied volatilities for whole arrays of quotes at once.
+
+    Every quote is mapped through put-call parity to its out-of-the-money side, which
+    keeps full precision for deep in-the-money quotes. Each quote starts from the
+    Corrado-Miller rational guess and is refined with Halley steps on vega inside a
+    bisection bracket, so a step that leaves the bracket falls back to bisection.
+    Quotes that violate the no-arbitrage bounds or fail to converge are returned as NaN.
+
+    Parameters:
+    price (float or array): Observed option prices
+    S (float or array): Spot price of the underlying asset
+    K (float or array): Strike price
+    T (float or array): Time to maturity in years
+    r (float or array): Risk-free interest rate
+    q (float or array): Continuous dividend yield
+    option_type (str or array): 'call'/'put' labels, or booleans where True means call
+    tol (float): Volatility tolerance on the Halley step or bracket width
+    max_iter (int): Maximum number of Halley/bisection iterations
+    sigma_min (float): Lower end of the volatility search bracket
+    sigma_max (float): Upper end of the volatility search bracket
+
+    Returns:
+    numpy.ndarray, numpy.ndarray: Implied volatilities (NaN where masked) and a boolean
+                                  array flagging the quotes that converged
+    """
+    price, S, K, T, r, q = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, T, r, q)))
+    option_type = np.broadcast_to(np.asarray(option_type), price.shape)
+    if option_type.dtype.kind == 'b':
+        is_call = option_type
+    else:
+        if not np.all(np.isin(option_type, ['call', 'put'])):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        is_call = option_type == 'call'
+    shape = price.shape
+    price, S, K, T, r, q, is_call = (x.ravel() for x in (price, S, K, T, r, q, is_call))
+
+    S_disc = S * np.exp(-q * T)
+    K_disc = K * np.exp(-r * T)
+
+    # No-arbitrage bounds: max(S e^{-qT} - K e^{-rT}, 0) < C < S e^{-qT}
+    call_price = np.where(is_call, price, price + S_disc - K_disc)
+    valid = (call_price > np.maximum(S_disc - K_disc, 0.0)) & (call_price < S_disc) & (T > 0)
+
+    # Solve on the out-of-the-money side via put-call parity
+    sign = np.where(K_disc >= S_disc, 1.0, -1.0)
+    otm_price = np.where(is_call == (sign > 0), price, price - np.where(is_call, 1.0, -1.0) * (S_disc - K_disc))
+
+    # Corrado-Miller rational initial guess
+    half_gap = 0.5 * (S_disc - K_disc)
+    call_price = np.where(sign > 0, otm_price, otm_price + S_disc - K_disc)
+    discriminant = np.maximum((call_price - half_gap) ** 2 - (S_disc - K_disc) ** 2 / math.pi, 0.0)
+    sigma = (math.sqrt(2 * math.pi) / np.sqrt(T) / (S_disc + K_disc)
+             * (call_price - half_gap + np.sqrt(discriminant)))
+    sigma = np.where(np.isfinite(sigma) & (sigma > sigma_min) & (sigma < sigma_max), sigma, 0.2)
+
+    vol = np.full(price.shape, np.nan)
+    converged = np.zeros(price.shape, dtype=bool)
+
+    # Iterate only on the quotes that are still active
+    idx = np.flatnonzero(valid)
+    sig = sigma[idx]
+    lo = np.full(idx.size, sigma_min)
+    hi = np.full(idx.size, sigma_max)
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        model, vega, d1, d2 = black_scholes_price_vega(S[idx], K[idx], T[idx], r[idx], sig, q[idx], sign[idx])
+        diff = model - otm_price[idx]
+
+        # Shrink the bracket: option prices are increasing in sigma
+        lo = np.where(diff < 0, sig, lo)
+        hi = np.where(diff > 0, sig, hi)
+
+        # Halley step using volga = vega * d1 * d2 / sigma
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = diff / vega
+            correction = 1 - 0.5 * newton * d1 * d2 / sig
+            step = newton / np.where(correction > 0.5, correction, 1.0)
+            new_sig = sig - step
+
+        done = (np.abs(step) < tol) | (hi - lo < tol)
+        vol[idx[done]] = sig[done]
+        converged[idx[done]] = True
+
+        outside = ~np.isfinite(new_sig) | (new_sig <= lo) | (new_sig >= hi)
+        new_sig = np.where(outside, 0.5 * (lo + hi), new_sig)
+
+        keep = ~done
+        idx, sig, lo, hi = idx[keep], new_sig[keep], lo[keep], hi[keep]
+
+    return vol.reshape(shape), converged.reshape(shape)
+
+def benchmark_implied_volatility(n_quotes, n_brentq=2000, seed=0):
+    """
+    Time the vectorized solver against a per-quote brentq inversion.
+
+    Parameters:
+    n_quotes (int): Number of random quotes for the vectorized solver
+    n_brentq (int): Number of quotes to invert with brentq (kept small, it is slow)
+    seed (int): Seed for the random quotes
+
+    Returns:
+    dict: Quotes per second for both solvers, convergence rate and maximum volatility error
+          over quotes whose vega is large enough for the volatility to be identifiable
+    """
+    rng = np.random.default_rng(seed)
+    S = np.full(n_quotes, 100.0)
+    K = rng.uniform(50, 150, n_quotes)
+    T = rng.uniform(0.05, 2.0, n_quotes)
+    r = np.full(n_quotes, 0.03)
+    true_sigma = rng.uniform(0.05, 1.0, n_quotes)
+    is_call = rng.random(n_quotes) < 0.5
+    price, vega, _, _ = black_scholes_price_vega(S, K, T, r, true_sigma, 0.0, np.where(is_call, 1.0, -1.0))
+
+    start = time.perf_counter()
+    vol, converged = implied_volatility(price, S, K, T, r, 0.0, is_call)
+    vector_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(n_brentq):
+        sign = 1.0 if is_call[i] else -1.0
+        brentq(lambda s: black_scholes_price_vega(S[i], K[i], T[i], r[i], s, 0.0, sign)[0] - price[i], 1e-4, 5.0)
+    brentq_time = time.perf_counter() - start
+
+    return {'vectorized_per_sec': n_quotes / vector_time,
+            'brentq_per_sec': n_brentq / brentq_time,
+            'converged_fraction': converged.mean(),
+            'max_vol_error': np.nanmax(np.abs(vol - true_sigma)[vega > 1e-6])}
+
+# Example usage
+S = 100  # Spot price
+K = np.array([80, 90, 100, 110, 120])  # Strike prices
+T = 0.5  # Time to maturity (6 months)
+r = 0.05 # Risk-free rate (5%)
+market_prices = np.array([22.5, 13.8, 7.0, 2.9, 1.0])  # Observed call prices
+
+vols, converged = implied_volatility(market_prices, S, K, T, r)
+print("Implied volatilities: ", vols)
+print("Converged: ", converged)
+
+benchmark = benchmark_implied_volatility(1000000)
+print(f"Vectorized solver: {benchmark['vectorized_per_sec']:,.0f} quotes/sec")
+print(f"Per-quote brentq: {benchmark['brentq_per_sec']:,.0f} quotes/sec")
+print(f"Converged fraction: {benchmark['converged_fraction']:.4f}")
+print(f"Max volatility error: {benchmark['max_vol_error']:.2e}")
@@ -0,0 +1,276 @@
+import os
+import tempfile
+import time
+import numpy as np
+
+class GBMPaths:
+    """Geometric Brownian motion sampled exactly at the exercise dates; state is (S,)."""
+    def __init__(self, S, r, sigma, q=0.0):
+        self.S, self.r, self.sigma, self.q = S, r, sigma, q
+        self.n_factors = 1
+
+    def initial_state(self, n_paths):
+        return np.full((n_paths, 1), float(self.S))
+
+    def transition(self, state, dt, rng):
+        Z = rng.standard_normal(state.shape[:-1])
+        growth = np.exp((self.r - self.q - 0.5 * self.sigma**2) * dt + self.sigma * np.sqrt(dt) * Z)
+        return state * growth[..., None]
+
+class MertonPaths:
+    """Merton jump diffusion with a compensated drift; state is (S,)."""
+    def __init__(self, S, r, sigma, lambda_, mu_j, sigma_j, q=0.0):
+        self.S, self.r, self.sigma, self.q = S, r, sigma, q
+        self.lambda_, self.mu_j, self.sigma_j = lambda_, mu_j, sigma_j
+        self.n_factors = 1
+
+    def initial_state(self, n_paths):
+        return np.full((n_paths, 1), float(self.S))
+
+    def transition(self, state, dt, rng):
+        shape = state.shape[:-1]
+        k = np.exp(self.mu_j + 0.5 * self.sigma_j**2) - 1
+        jump_num = rng.poisson(self.lambda_ * dt, shape)
+        jumps = self.mu_j * jump_num + self.sigma_j * np.sqrt(jump_num) * rng.standard_normal(shape)
+        log_growth = ((self.r - self.q - self.lambda_ * k - 0.5 * self.sigma**2) * dt
+                      + self.sigma * np.sqrt(dt) * rng.standard_normal(shape) + jumps)
+        return state * np.exp(log_growth)[..., None]
+
+class HestonPaths:
+    """Heston model with Euler full-truncation sub-steps between exercise dates; state is (S, v)."""
+    def __init__(self, S, r, V0, kappa, theta, xi, rho, q=0.0, substeps=4):
+        self.S, self.r, self.V0, self.q = S, r, V0, q
+        self.kappa, self.theta, self.xi, self.rho = kappa, theta, xi, rho
+        self.substeps = substeps
+        self.n_factors = 2
+
+    def initial_state(self, n_paths):
+        state = np.empty((n_paths, 2))
+        state[:, 0] = self.S
+        state[:, 1] = self.V0
+        return state
+
+    def transition(self, state, dt, rng):
+        h = dt / self.substeps
+        log_S = np.log(state[..., 0])
+        v = state[..., 1].copy()
+        for _ in range(self.substeps):
+            Z1 = rng.standard_normal(v.shape)
+            Z2 = self.rho * Z1 + np.sqrt(1 - self.rho**2) * rng.standard_normal(v.shape)
+            v_pos = np.maximum(v, 0)
+            log_S += (self.r - self.q - 0.5 * v_pos) * h + np.sqrt(v_pos * h) * Z1
+            v += self.kappa * (self.theta - v_pos) * h + self.xi * np.sqrt(v_pos * h) * Z2
+        return np.stack([np.exp(log_S), v], axis=-1)
+
+def regression_basis(state, K, degree, basis):
+    """
+    Regression features for a batch of states: weighted Laguerre or plain polynomials in
+    moneyness S/K, plus linear and quadratic terms in any additional state factors.
+    """
+    x = state[..., 0] / K
+    columns = [np.ones_like(x)]
+    if basis == 'laguerre':
+        weight = np.exp(-0.5 * x)
+        previous, current = np.ones_like(x), 1 - x
+        columns.append(weight * previous)
+        for n in range(1, degree):
+            columns.append(weight * current)
+            previous, current = current, ((2 * n + 1 - x) * current - n * previous) / (n + 1)
+    else:
+        for n in range(1, degree + 1):
+            columns.append(x**n)
+    for factor in range(1, state.shape[-1]):
+        extra = state[..., factor]
+        columns += [extra, extra**2, extra * x]
+    return np.stack(columns, axis=-1)
+
+def longstaff_schwartz(generator, K, T, exercise_dates, n_paths, option_type='put', degree=3, basis='laguerre',
+                       chunk_size=50000, storage='auto', max_memory_bytes=2**30, n_pricing_paths=None,
+                       upper_bound=False, n_dual_paths=1000, n_inner=500, seed=0):
+    """
+    Longstaff-Schwartz least-squares Monte Carlo for Bermudan and American options.
+
+    Regression paths are simulated chunk by chunk into date-major storage: a float64
+    array in memory, or a float32 memory-mapped file on disk. The stored states take
+    (exercise_dates + 1) x n_paths x factors values, e.g. 4 GB in float64 for 10^6
+    Heston paths on 250 dates, so storage='auto' keeps them in memory only below
+    max_memory_bytes and storage='memory' refuses larger arrays. Continuation values are
+    regressed on the basis over the in-the-money paths of every chunk by accumulating
+    the normal equations. Besides the stored states, one float64 cash-flow vector of
+    n_paths entries and chunk-sized working arrays are held in memory.
+    The fitted exercise policy is then applied to independent paths streamed forward in
+    chunks, which gives a low-biased price. Optionally, an Andersen-Broadie dual estimate
+    gives a high-biased price: the martingale comes from the approximate value function
+    max(h, C), where C is regressed over all paths, and its one-step conditional
+    expectations are estimated by inner simulations. Inner-sample noise biases the bound
+    upwards, so the gap to the low-biased price shrinks as n_inner grows.
+
+    Parameters:
+    generator (object): Path generator with initial_state(n) and transition(state, dt, rng),
+                        e.g. GBMPaths, MertonPaths or HestonPaths
+    K (float): Strike price
+    T (float): Time to maturity in years
+    exercise_dates (int): Number of equally spaced exercise dates in (0, T]
+    n_paths (int): Number of regression paths
+    option_type (str): Type of the option - 'call' or 'put'
+    degree (int): Degree of the regression basis in moneyness
+    basis (str): 'laguerre' or 'polynomial'
+    chunk_size (int): Number of paths simulated and regressed at a time
+    storage (str): 'auto', 'memory' or 'disk' for the regression paths
+    max_memory_bytes (int): Largest in-memory state array; 'auto' goes to disk above it
+    n_pricing_paths (int or None): Independent paths for the low-biased price (default n_paths)
+    upper_bound (bool): Whether to compute the Andersen-Broadie high-biased estimate
+    n_dual_paths (int): Outer paths for the dual estimate
+    n_inner (int): Inner one-step samples per outer path and date for the dual estimate
+    seed (int): Seed for the random number generator
+
+    Returns:
+    dict: 'price' and 'std_error' (low-biased), 'in_sample_price', 'coefficients' and,
+          when requested, 'upper_bound' and 'upper_std_error'
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    if basis not in ('laguerre', 'polynomial'):
+        raise ValueError("Invalid basis. Use 'laguerre' or 'polynomial'.")
+    if storage not in ('auto', 'memory', 'disk'):
+        raise ValueError("Invalid storage. Use 'auto', 'memory' or 'disk'.")
+    rng = np.random.default_rng(seed)
+    sign = 1.0 if option_type == 'call' else -1.0
+    dt = T / exercise_dates
+    disc = np.exp(-generator.r * dt)
+    m = generator.n_factors
+
+    def exercise_value(state):
+        return np.maximum(sign * (state[..., 0] - K), 0)
+
+    def features(state):
+        return regression_basis(state, K, degree, basis)
+
+    # Simulate the regression paths into date-major storage, chunk by chunk
+    shape = (exercise_dates + 1, n_paths, m)
+    in_memory_bytes = 8 * int(np.prod(shape))
+    if storage == 'auto':
+        storage = 'memory' if in_memory_bytes <= max_memory_bytes else 'disk'
+    elif storage == 'memory' and in_memory_bytes > max_memory_bytes:
+        raise ValueError(f"In-memory regression paths need {in_memory_bytes / 1e6:,.0f} MB, above max_memory_bytes; "
+                         f"use storage='disk' or 'auto'.")
+    if storage == 'disk':
+        handle, filename = tempfile.mkstemp(suffix='.npy')
+        os.close(handle)
+        states = np.lib.format.open_memmap(filename, mode='w+', dtype=np.float32, shape=shape)
+    else:
+        states = np.empty(shape)
+    chunks = [(start, min(start + chunk_size, n_paths)) for start in range(0, n_paths, chunk_size)]
+    for start, end in chunks:
+        state = generator.initial_state(end - start)
+        states[0, start:end] = state
+        for k in range(1, exercise_dates + 1):
+            state = generator.transition(state, dt, rng)
+            states[k, start:end] = state
+
+    # Backward induction: regress discounted future cash flows on the basis
+    cash = exercise_value(np.asarray(states[exercise_dates], dtype=float))
+    n_basis = features(np.ones((1, m))).shape[-1]
+    coefficients = np.zeros((exercise_dates + 1, n_basis))
+    value_coefficients = np.zeros((exercise_dates + 1, n_basis))
+    for k in range(exercise_dates - 1, 0, -1):
+        cash *= disc
+        XtX = np.zeros((2, n_basis, n_basis))
+        Xty = np.zeros((2, n_basis))
+        for start, end in chunks:
+            state = np.asarray(states[k, start:end], dtype=float)
+            itm = exercise_value(state) > 0
+            X = features(state)
+            y = cash[start:end]
+            XtX[0] += X[itm].T @ X[itm]
+            Xty[0] += X[itm].T @ y[itm]
+            XtX[1] += X.T @ X
+            Xty[1] += X.T @ y
+        coefficients[k] = np.linalg.lstsq(XtX[0], Xty[0], rcond=None)[0]
+        value_coefficients[k] = np.linalg.lstsq(XtX[1], Xty[1], rcond=None)[0]
+        for start, end in chunks:
+            state = np.asarray(states[k, start:end], dtype=float)
+            value = exercise_value(state)
+            exercise = (value > 0) & (value >= features(state) @ coefficients[k])
+            cash[start:end][exercise] = value[exercise]
+    in_sample_price = disc * cash.mean()
+    if storage == 'disk':
+        del states
+        os.remove(filename)
+
+    # Low-biased price: apply the fitted policy to independent paths streamed forward
+    n_pricing_paths = n_paths if n_pricing_paths is None else n_pricing_paths
+    total = 0.0
+    total_sq = 0.0
+    for start in range(0, n_pricing_paths, chunk_size):
+        n = min(chunk_size, n_pricing_paths - start)
+        state = generator.initial_state(n)
+        realized = np.zeros(n)
+        alive = np.ones(n, dtype=bool)
+        for k in range(1, exercise_dates + 1):
+            state = generator.transition(state, dt, rng)
+            value = exercise_value(state)
+            if k == exercise_dates:
+                exercise = alive & (value > 0)
+            else:
+                exercise = alive & (value > 0) & (value >= features(state) @ coefficients[k])
+            realized[exercise] = disc**k * value[exercise]
+            alive &= ~exercise
+        total += realized.sum()
+        total_sq += np.dot(realized, realized)
+    mean = total / n_pricing_paths
+    result = {
+        'price': mean,
+        'std_error': np.sqrt(max(total_sq / n_pricing_paths - mean**2, 0) / n_pricing_paths),
+        'in_sample_price': in_sample_price,
+        'coefficients': coefficients,
+    }
+
+    if upper_bound:
+        # Approximate value function V_k = max(h_k, C_k), with V_D = h_D
+        def value_function(state, k):
+            value = exercise_value(state)
+            if k == exercise_dates:
+                return value
+            return np.maximum(value, np.maximum(features(state) @ value_coefficients[k], 0))
+
+        gaps = []
+        for start in range(0, n_dual_paths, chunk_size):
+            n = min(chunk_size, n_dual_paths - start)
+            state = generator.initial_state(n)
+            martingale = np.zeros(n)
+            best = np.full(n, -np.inf)
+            for k in range(1, exercise_dates + 1):
+                # Martingale increment: disc^k (V_k(X_k) - E_{k-1}[V_k]), expectation by inner samples
+                inner = generator.transition(np.repeat(state[:, None, :], n_inner, axis=1), dt, rng)
+                expected = value_function(inner, k).mean(axis=1)
+                state = generator.transition(state, dt, rng)
+                martingale += disc**k * (value_function(state, k) - expected)
+                best = np.maximum(best, disc**k * exercise_value(state) - martingale)
+            gaps.append(best)
+        gaps = np.concatenate(gaps)
+        result['upper_bound'] = gaps.mean()
+        result['upper_std_error'] = gaps.std(ddof=1) / np.sqrt(n_dual_paths)
+
+    return result
+
+# Example usage: the Longstaff-Schwartz (2001) American put, S=36, K=40 (finite-difference value 4.478)
+S = 36     # Current stock price
+K = 40     # Strike price
+T = 1      # Time to maturity (1 year)
+r = 0.06   # Risk-free rate (6%)
+sigma = 0.2  # Volatility (20%)
+exercise_dates = 50  # Exercise opportunities per year
+
+start = time.perf_counter()
+result = longstaff_schwartz(GBMPaths(S, r, sigma), K, T, exercise_dates, 100000, upper_bound=True)
+print(f"LSM American Put: {result['price']:.4f} +/- {result['std_error']:.4f} (low-biased), "
+      f"{result['upper_bound']:.4f} +/- {result['upper_std_error']:.4f} (high-biased), "
+      f"{time.perf_counter() - start:.2f} seconds")
+
+# The same engine on the Heston and Merton generators, with regression paths on disk
+heston = longstaff_schwartz(HestonPaths(S, r, 0.04, 2.0, 0.04, 0.3, -0.7), K, T, exercise_dates, 50000,
+                            storage='disk')
+merton = longstaff_schwartz(MertonPaths(S, r, sigma, 0.5, -0.1, 0.15), K, T, exercise_dates, 50000)
+print(f"Heston American Put: {heston['price']:.4f} +/- {heston['std_error']:.4f}")
+print(f"Merton American Put: {merton['price']:.4f} +/- {merton['std_error']:.4f}")
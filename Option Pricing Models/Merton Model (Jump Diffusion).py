@@ -1,10 +1,87 @@
 import numpy as np
 import scipy.stats as si
+from scipy.special import ndtr
 
-def merton_jump_diffusion(S, K, T, r, sigma, lambda_, mu_j, sigma_j, simulations):
+def merton_jump_paths(S, T, r, sigma, lambda_, mu_j, sigma_j, simulations, time_steps, seed=None):
+    """
+    Simulate Merton jump-diffusion price paths for all simulations at once.
+
+    Poisson jump counts are drawn per path and step as one array; since log jump sizes
+    are normal, the compound jump of n jumps is drawn directly as N(n mu_j, n sigma_j^2).
+    The drift is compensated so the discounted price is a martingale.
+
+    Parameters:
+    S (float): Current stock price
+    T (float): Time horizon in years
+    r (float): Risk-free interest rate
+    sigma (float): Volatility of the stock
+    lambda_ (float): Average number of jumps per year
+    mu_j (float): Mean of the log jump size
+    sigma_j (float): Standard deviation of the log jump size
+    simulations (int): Number of paths
+    time_steps (int): Number of time steps
+    seed (int or None): Seed for the random number generator
+
+    Returns:
+    numpy.ndarray: Price paths of shape (simulations, time_steps + 1)
+    """
+    rng = np.random.default_rng(seed)
+    dt = T / time_steps
+    k = np.exp(mu_j + 0.5 * sigma_j**2) - 1  # Expected relative jump size
+    drift = (r - lambda_ * k - 0.5 * sigma**2) * dt
+
+    jump_num = rng.poisson(lambda_ * dt, (simulations, time_steps))
+    jump_sum = mu_j * jump_num + sigma_j * np.sqrt(jump_num) * rng.standard_normal((simulations, time_steps))
+    log_returns = drift + sigma * np.sqrt(dt) * rng.standard_normal((simulations, time_steps)) + jump_sum
+
+    log_paths = np.zeros((simulations, time_steps + 1))
+    np.cumsum(log_returns, axis=1, out=log_paths[:, 1:])
+    return S * np.exp(log_paths)
+
+def merton_jump_diffusion(S, K, T, r, sigma, lambda_, mu_j, sigma_j, simulations, option_type='call', seed=None):
     """
     Monte Carlo simulation using the Merton Jump Diffusion Model for option pricing.
 
+    Only the terminal price is needed for a European payoff, so each path is sampled in
+    one step: a Poisson jump count and the matching compound normal jump, all as arrays.
+
+    Parameters:
+    S (float): Current stock price
+    K (float or array): Strike price(s)
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    sigma (float): Volatility of the stock
+    lambda_ (float): Average number of jumps per year
+    mu_j (float): Mean of the log jump size
+    sigma_j (float): Standard deviation of the log jump size
+    simulations (int): Number of simulations
+    option_type (str): Type of the option - 'call' or 'put'
+    seed (int or None): Seed for the random number generator
+
+    Returns:
+    float or numpy.ndarray: Estimated option price(s)
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    ST = merton_jump_paths(S, T, r, sigma, lambda_, mu_j, sigma_j, simulations, 1, seed)[:, -1]
+    sign = 1.0 if option_type == 'call' else -1.0
+
+    # Payoffs for every strike from the same terminal prices
+    K = np.asarray(K, dtype=float)
+    payoff = np.maximum(sign * (ST[:, None] - K.reshape(1, -1)), 0)
+    option_price = np.exp(-r * T) * np.mean(payoff, axis=0)
+    return option_price.reshape(K.shape) if K.ndim else float(option_price[0])
+
+def merton_greeks(S, K, T, r, sigma, lambda_, mu_j, sigma_j, simulations, option_type='call', payoff='vanilla', seed=None):
+    """
+    Price, delta, gamma, vega and rho for a European option under the Merton model from
+    one set of terminal draws.
+
+    The diffusion normal Z is independent of the jumps, so the log-price is conditionally
+    normal with variance sigma^2 T; its density gives likelihood-ratio weights. Vanilla
+    payoffs use pathwise delta, vega and rho with a mixed gamma; digital payoffs use
+    likelihood-ratio weights for every Greek.
+
     Parameters:
     S (float): Current stock price
     K (float): Strike price
@@ -12,32 +89,102 @@ def merton_jump_diffusion(S, K, T, r, sigma, lambda_, mu_j, sigma_j, simulations
     r (float): Risk-free interest rate
     sigma (float): Volatility of the stock
     lambda_ (float): Average number of jumps per year
-    mu_j (float): Mean jump size
-    sigma_j (float): Standard deviation of jump size
+    mu_j (float): Mean of the log jump size
+    sigma_j (float): Standard deviation of the log jump size
     simulations (int): Number of simulations
+    option_type (str): Type of the option - 'call' or 'put'
+    payoff (str): 'vanilla' or 'digital' (cash-or-nothing paying 1)
+    seed (int or None): Seed for the random number generator
 
     Returns:
-    float: Estimated Call Option Price
+    dict: Estimates 'price', 'delta', 'gamma', 'vega', 'rho' and their 'std_errors'
     """
-    np.random.seed(0)  # For reproducible results
-    dt = T / simulations
-    jump_num = np.random.poisson(lambda_ * dt, simulations)
-    jump_size = np.random.normal(mu_j, sigma_j, simulations)
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    if payoff not in ('vanilla', 'digital'):
+        raise ValueError("Invalid payoff. Use 'vanilla' or 'digital'.")
+    rng = np.random.default_rng(seed)
+    k = np.exp(mu_j + 0.5 * sigma_j**2) - 1
+    jump_num = rng.poisson(lambda_ * T, simulations)
+    jumps = mu_j * jump_num + sigma_j * np.sqrt(jump_num) * rng.standard_normal(simulations)
+    Z = rng.standard_normal(simulations)
+    sqrt_T = np.sqrt(T)
+    ST = S * np.exp((r - lambda_ * k - 0.5 * sigma**2) * T + sigma * sqrt_T * Z + jumps)
 
-    # Simulate stock price paths with jumps
-    prices = np.zeros(simulations)
-    prices[0] = S
+    discount = np.exp(-r * T)
+    sign = 1.0 if option_type == 'call' else -1.0
+    in_the_money = sign * (ST - K) > 0
+    if payoff == 'vanilla':
+        value = np.maximum(sign * (ST - K), 0)
+        slope = sign * in_the_money
+        samples = {
+            'price': discount * value,
+            'delta': discount * slope * ST / S,
+            'gamma': discount * slope * ST * (Z / (sigma * sqrt_T) - 1) / S**2,
+            'vega': discount * slope * ST * (sqrt_T * Z - sigma * T),
+            'rho': discount * (slope * ST * T - T * value),
+        }
+    else:
+        value = in_the_money.astype(float)
+        samples = {
+            'price': discount * value,
+            'delta': discount * value * Z / (S * sigma * sqrt_T),
+            'gamma': discount * value * (Z**2 - 1 - Z * sigma * sqrt_T) / (S**2 * sigma**2 * T),
+            'vega': discount * value * ((Z**2 - 1) / sigma - Z * sqrt_T),
+            'rho': discount * value * (Z * sqrt_T / sigma - T),
+        }
 
-    for i in range(1, simulations):
-        Z = np.random.standard_normal()
-        prices[i] = prices[i - 1] * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-        # Apply jumps
-        for j in range(jump_num[i]):
-            prices[i] = prices[i] * np.exp(jump_size[j])
+    estimates = {name: np.mean(x) for name, x in samples.items()}
+    estimates['std_errors'] = {name: np.std(x, ddof=1) / np.sqrt(simulations) for name, x in samples.items()}
+    return estimates
 
-    payoff = np.maximum(prices - K, 0)
-    option_price = np.exp(-r * T) * np.mean(payoff)
-    return option_price
+def merton_closed_form(S, K, T, r, sigma, lambda_, mu_j, sigma_j, option_type='call', tol=1e-12, max_terms=200):
+    """
+    Merton's closed-form price as a Poisson-weighted series of Black-Scholes prices.
+
+    Conditional on n jumps the terminal price is lognormal, so the option price is
+    sum_n P(N = n) * BS(S, K, T, r_n, sigma_n) under the jump-adjusted intensity
+    lambda' = lambda (1 + k). The series is truncated once the remaining Poisson mass
+    falls below `tol` (or at `max_terms`), and all strikes are priced in one evaluation.
+
+    Parameters:
+    S (float): Current stock price
+    K (float or array): Strike price(s)
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    sigma (float): Volatility of the stock
+    lambda_ (float): Average number of jumps per year
+    mu_j (float): Mean of the log jump size
+    sigma_j (float): Standard deviation of the log jump size
+    option_type (str): Type of the option - 'call' or 'put'
+    tol (float): Poisson tail mass at which the series is truncated
+    max_terms (int): Maximum number of series terms
+
+    Returns:
+    float or numpy.ndarray: Option price(s)
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    k = np.exp(mu_j + 0.5 * sigma_j**2) - 1
+    lam_T = lambda_ * (1 + k) * T
+
+    # Number of terms needed for the Poisson tail to drop below tol
+    n_terms = int(si.poisson.isf(tol, lam_T)) + 1 if lam_T > 0 else 1
+    n = np.arange(min(n_terms, max_terms)).reshape(-1, 1)
+    weights = si.poisson.pmf(n, lam_T)
+
+    # Black-Scholes price conditional on n jumps, for every (n, strike) pair
+    r_n = r - lambda_ * k + n * np.log(1 + k) / T
+    sigma_n = np.sqrt(sigma**2 + n * sigma_j**2 / T)
+    K = np.asarray(K, dtype=float)
+    K_row = K.reshape(1, -1)
+    d1 = (np.log(S / K_row) + (r_n + 0.5 * sigma_n**2) * T) / (sigma_n * np.sqrt(T))
+    d2 = d1 - sigma_n * np.sqrt(T)
+    sign = 1.0 if option_type == 'call' else -1.0
+    bs = sign * (S * ndtr(sign * d1) - K_row * np.exp(-r_n * T) * ndtr(sign * d2))
+
+    option_price = np.sum(weights * bs, axis=0)
+    return option_price.reshape(K.shape) if K.ndim else float(option_price[0])
 
 # Example usage
 S = 100  # Current stock price
@@ -46,9 +193,19 @@ T = 1    # Time to maturity (1 year)
 r = 0.05 # Risk-free rate (5%)
 sigma = 0.2 # Volatility (20%)
 lambda_ = 0.1 # Average number of jumps per year
-mu_j = -0.05 # Mean jump size
-sigma_j = 0.1 # Standard deviation of jump size
+mu_j = -0.05 # Mean log jump size
+sigma_j = 0.1 # Standard deviation of log jump size
 simulations = 100000 # Number of simulations
 
-call_option_price = merton_jump_diffusion(S, K, T, r, sigma, lambda_, mu_j, sigma_j, simulations)
+call_option_price = merton_jump_diffusion(S, K, T, r, sigma, lambda_, mu_j, sigma_j, simulations, seed=0)
 print(f"Call Option Price: {call_option_price}")
+
+# Closed-form series across a strike chain
+strikes = np.array([80, 90, 100, 110, 120])
+print("Closed-form call prices: ", merton_closed_form(S, strikes, T, r, sigma, lambda_, mu_j, sigma_j))
+print("Monte Carlo call prices: ", merton_jump_diffusion(S, strikes, T, r, sigma, lambda_, mu_j, sigma_j, simulations, seed=0))
+
+# Greeks from the same draws
+greeks = merton_greeks(S, K, T, r, sigma, lambda_, mu_j, sigma_j, simulations, seed=0)
+print("Merton Greeks: " + ", ".join(f"{name} {greeks[name]:.4f} (+/- {greeks['std_errors'][name]:.4f})"
+                                    for name in ('price', 'delta', 'gamma', 'vega', 'rho')))
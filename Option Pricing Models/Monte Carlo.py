@@ -1,6 +1,8 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
-def monte_carlo_call_option(S, K, T, r, sigma, simulations):
+def monte_carlo_call_option(S, K, T, r, sigma, simulations, seed=0):
     """
     Monte Carlo simulation for European Call Option Pricing.
 
@@ -11,24 +13,420 @@ def monte_carlo_call_option(S, K, T, r, sigma, simulations):
     r (float): Risk-free interest rate
     sigma (float): Volatility of the stock
     simulations (int): Number of simulations
+    seed (int or None): Seed for the random number generator
 
     Returns:
     float: Estimated Call Option Price
     """
-    np.random.seed(0)  # For reproducible results
-    Z = np.random.standard_normal(simulations)  # Random standard normals
+    rng = np.random.default_rng(seed)  # For reproducible results
+    Z = rng.standard_normal(simulations)  # Random standard normals
     ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * Z)  # Stock price at maturity
     payoff = np.maximum(ST - K, 0)  # Payoff for Call Option
     option_price = np.exp(-r * T) * np.mean(payoff)  # Discounted average payoff
     return option_price
 
-# Example usage
-S = 100  # Current stock price
-K = 100  # Strike price
-T = 1    # Time to maturity (1 year)
-r = 0.05 # Risk-free rate (5%)
-sigma = 0.2 # Volatility (20%)
-simulations = 1000000  # Number of simulations
+def monte_carlo_greeks(S, K, T, r, sigma, simulations, option_type='call', payoff='vanilla', q=0.0, seed=0):
+    """
+    Price, delta, gamma, vega and rho for a European option from one set of GBM draws.
+
+    Vanilla payoffs are Lipschitz, so delta, vega and rho use pathwise derivatives and
+    gamma uses the mixed likelihood-ratio/pathwise estimator. Digital payoffs are
+    discontinuous, so every Greek uses likelihood-ratio weights on the driving normal.
+
+    Parameters:
+    S (float): Current stock price
+    K (float): Strike price
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    sigma (float): Volatility of the stock
+    simulations (int): Number of simulations
+    option_type (str): Type of the option - 'call' or 'put'
+    payoff (str): 'vanilla' or 'digital' (cash-or-nothing paying 1)
+    q (float): Continuous dividend yield
+    seed (int or None): Seed for the random number generator
+
+    Returns:
+    dict: Estimates 'price', 'delta', 'gamma', 'vega', 'rho' and their 'std_errors'
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    if payoff not in ('vanilla', 'digital'):
+        raise ValueError("Invalid payoff. Use 'vanilla' or 'digital'.")
+    rng = np.random.default_rng(seed)
+    Z = rng.standard_normal(simulations)
+    sqrt_T = np.sqrt(T)
+    ST = S * np.exp((r - q - 0.5 * sigma**2) * T + sigma * sqrt_T * Z)
+    discount = np.exp(-r * T)
+    sign = 1.0 if option_type == 'call' else -1.0
+    in_the_money = sign * (ST - K) > 0
+
+    if payoff == 'vanilla':
+        value = np.maximum(sign * (ST - K), 0)
+        slope = sign * in_the_money  # Derivative of the payoff with respect to ST
+        samples = {
+            'price': discount * value,
+            'delta': discount * slope * ST / S,
+            'gamma': discount * slope * ST * (Z / (sigma * sqrt_T) - 1) / S**2,
+            'vega': discount * slope * ST * (sqrt_T * Z - sigma * T),
+            'rho': discount * (slope * ST * T - T * value),
+        }
+    else:
+        value = in_the_money.astype(float)
+        samples = {
+            'price': discount * value,
+            'delta': discount * value * Z / (S * sigma * sqrt_T),
+            'gamma': discount * value * (Z**2 - 1 - Z * sigma * sqrt_T) / (S**2 * sigma**2 * T),
+            'vega': discount * value * ((Z**2 - 1) / sigma - Z * sqrt_T),
+            'rho': discount * value * (Z * sqrt_T / sigma - T),
+        }
+
+    estimates = {name: np.mean(x) for name, x in samples.items()}
+    estimates['std_errors'] = {name: np.std(x, ddof=1) / np.sqrt(simulations) for name, x in samples.items()}
+    return estimates
+
+class EuropeanPayoff:
+    """Vanilla call or put on the terminal price."""
+    def __init__(self, K, option_type='call'):
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        self.K = K
+        self.sign = 1.0 if option_type == 'call' else -1.0
+        self.time_steps = 1
+
+    def __call__(self, paths):
+        return np.maximum(self.sign * (paths[:, -1] - self.K), 0)
+
+class AsianPayoff:
+    """Fixed-strike call or put on the arithmetic or geometric average of the monitoring dates."""
+    def __init__(self, K, option_type='call', averaging='arithmetic', time_steps=252):
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        if averaging not in ('arithmetic', 'geometric'):
+            raise ValueError("Invalid averaging. Use 'arithmetic' or 'geometric'.")
+        self.K = K
+        self.sign = 1.0 if option_type == 'call' else -1.0
+        self.averaging = averaging
+        self.time_steps = time_steps
+
+    def __call__(self, paths):
+        fixings = paths[:, 1:]
+        if self.averaging == 'geometric':
+            average = np.exp(np.mean(np.log(fixings), axis=1))
+        else:
+            average = np.mean(fixings, axis=1)
+        return np.maximum(self.sign * (average - self.K), 0)
+
+class BarrierPayoff:
+    """Knock-in or knock-out call or put, with the barrier monitored at every time step."""
+    def __init__(self, K, barrier, barrier_type='up-and-out', option_type='call', time_steps=252):
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        if barrier_type not in ('up-and-out', 'up-and-in', 'down-and-out', 'down-and-in'):
+            raise ValueError("Invalid barrier type. Use 'up-and-out', 'up-and-in', 'down-and-out' or 'down-and-in'.")
+        self.K = K
+        self.barrier = barrier
+        self.up = barrier_type.startswith('up')
+        self.knock_in = barrier_type.endswith('in')
+        self.sign = 1.0 if option_type == 'call' else -1.0
+        self.time_steps = time_steps
+
+    def __call__(self, paths):
+        if self.up:
+            touched = np.max(paths, axis=1) >= self.barrier
+        else:
+            touched = np.min(paths, axis=1) <= self.barrier
+        alive = touched if self.knock_in else ~touched
+        return np.where(alive, np.maximum(self.sign * (paths[:, -1] - self.K), 0), 0)
+
+class LookbackPayoff:
+    """Lookback call or put; floating strike when K is None, otherwise fixed strike on the extreme."""
+    def __init__(self, K=None, option_type='call', time_steps=252):
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        self.K = K
+        self.call = option_type == 'call'
+        self.time_steps = time_steps
+
+    def __call__(self, paths):
+        if self.K is None:
+            if self.call:
+                return paths[:, -1] - np.min(paths, axis=1)
+            return np.max(paths, axis=1) - paths[:, -1]
+        if self.call:
+            return np.maximum(np.max(paths, axis=1) - self.K, 0)
+        return np.maximum(self.K - np.min(paths, axis=1), 0)
+
+class DigitalPayoff:
+    """Cash-or-nothing call or put on the terminal price."""
+    def __init__(self, K, option_type='call', cash=1.0):
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        self.K = K
+        self.call = option_type == 'call'
+        self.cash = cash
+        self.time_steps = 1
+
+    def __call__(self, paths):
+        in_the_money = paths[:, -1] > self.K if self.call else paths[:, -1] < self.K
+        return self.cash * in_the_money
+
+def simulate_block(task):
+    """
+    Simulate one fixed-size block of GBM paths and return its payoff sum and sum of squares.
+
+    The block's generator is rebuilt from the root entropy and the block index, so each
+    block always sees the same random numbers whichever process runs it.
+    """
+    entropy, block, n, S, T, r, q, sigma, time_steps, payoff = task
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(block,)))
+    payoffs = payoff(gbm_paths(rng, n, S, T, r, q, sigma, time_steps))
+    return payoffs.sum(), np.dot(payoffs, payoffs)
+
+def gbm_paths(rng, n, S, T, r, q, sigma, time_steps):
+    """Simulate n GBM paths as an (n x time_steps+1) array starting at S."""
+    dt = T / time_steps
+    log_increments = rng.standard_normal((n, time_steps))
+    log_increments *= sigma * np.sqrt(dt)
+    log_increments += (r - q - 0.5 * sigma**2) * dt
+    paths = np.empty((n, time_steps + 1))
+    paths[:, 0] = 0.0
+    np.cumsum(log_increments, axis=1, out=paths[:, 1:])
+    np.exp(paths, out=paths)
+    paths *= S
+    return paths
+
+def monte_carlo_price(S, T, r, sigma, payoff, simulations, q=0.0, time_steps=None, seed=0,
+                      workers=1, block_size=65536):
+    """
+    Monte Carlo pricing engine for arbitrary payoff objects under GBM.
+
+    Paths are generated in fixed-size blocks, each with its own generator spawned from
+    one SeedSequence, and the block results are combined in block order. The estimate
+    is therefore bit-identical for any number of worker processes, and memory is bounded
+    by block_size x time_steps per worker.
+
+    Parameters:
+    S (float): Current stock price
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    sigma (float): Volatility of the stock
+    payoff (callable): Payoff object mapping a (paths x time_steps+1) array to payoffs,
+                       e.g. EuropeanPayoff, AsianPayoff, BarrierPayoff, LookbackPayoff
+                       or DigitalPayoff
+    simulations (int): Number of simulated paths
+    q (float): Continuous dividend yield
+    time_steps (int or None): Number of time steps; defaults to payoff.time_steps
+    seed (int): Root seed for the SeedSequence
+    workers (int): Number of worker processes (1 runs in the current process)
+    block_size (int): Number of paths per block
+
+    Returns:
+    dict: 'price', 'std_error', 'paths_per_sec' and 'simulations'
+    """
+    time_steps = payoff.time_steps if time_steps is None else time_steps
+    entropy = np.random.SeedSequence(seed).entropy
+    tasks = [(entropy, block, min(block_size, simulations - start), S, T, r, q, sigma, time_steps, payoff)
+             for block, start in enumerate(range(0, simulations, block_size))]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = list(map(simulate_block, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(simulate_block, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    elapsed = time.perf_counter() - start
+
+    # Combine in block order so the result does not depend on the worker count
+    total = 0.0
+    total_sq = 0.0
+    for block_sum, block_sum_sq in results:
+        total += block_sum
+        total_sq += block_sum_sq
+
+    mean = total / simulations
+    variance = max(total_sq / simulations - mean**2, 0) * simulations / max(simulations - 1, 1)
+    discount = np.exp(-r * T)
+    return {'price': discount * mean,
+            'std_error': discount * np.sqrt(variance / simulations),
+            'paths_per_sec': simulations / elapsed,
+            'simulations': simulations}
+
+class RunningStatistics:
+    """Running mean and variance of several quantities, merged batch by batch with Welford updates."""
+    def __init__(self, size):
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    def update(self, values):
+        """Merge an (n x size) batch into the running statistics."""
+        n = values.shape[0]
+        batch_mean = values.mean(axis=0)
+        batch_m2 = np.sum((values - batch_mean)**2, axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta**2 * self.count * n / total
+        self.count = total
+
+    @property
+    def std_error(self):
+        return np.sqrt(self.m2 / max(self.count - 1, 1) / max(self.count, 1))
+
+def monte_carlo_until_converged(S, T, r, sigma, payoffs, abs_tol=None, rel_tol=None, max_seconds=None,
+                                max_paths=10**8, batch_size=65536, min_batches=4, min_nonzero=100, q=0.0,
+                                time_steps=None, generator=None, seed=0):
+    """
+    Run-until-converged Monte Carlo pricing of one payoff or a portfolio of payoffs on shared paths.
+
+    Paths are drawn in batches (seeded per batch as in monte_carlo_price) and every
+    contract's discounted payoff mean and variance are updated with Welford merges. The run
+    stops once every contract has a standard error below abs_tol or below rel_tol times its
+    price, or when the wall-clock or path budget runs out. A tolerance stop also needs at
+    least min_batches batches and min_nonzero non-zero payoffs for every contract, and a
+    zero price never meets rel_tol, so a rare-event contract whose batches are all zero
+    (standard error 0) is not reported as converged. Contracts on coarser monitoring
+    grids read every k-th date of the shared paths.
+
+    Parameters:
+    S (float): Current stock price
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate
+    sigma (float): Volatility of the stock
+    payoffs (callable or dict): A payoff object, or a dict of payoff objects by name
+    abs_tol (float or None): Target absolute standard error
+    rel_tol (float or None): Target standard error relative to the price
+    max_seconds (float or None): Wall-clock budget
+    max_paths (int): Path budget
+    batch_size (int): Number of paths per batch
+    min_batches (int): Batches drawn before a tolerance stop is allowed
+    min_nonzero (int): Non-zero payoffs every contract needs before a tolerance stop
+    q (float): Continuous dividend yield
+    time_steps (int or None): Steps of the shared grid; defaults to the finest payoff grid
+    generator (callable or None): generator(rng, n, time_steps) returning an (n x time_steps+1)
+                                  path array, e.g. a Heston scheme; GBM if None
+    seed (int): Root seed for the SeedSequence
+
+    Returns:
+    dict: 'price' and 'std_error' (floats, or dicts by name for a portfolio), 'converged'
+          (False whenever a budget ran out first), 'stop_reason', 'simulations', 'seconds' and 'trace', a list of
+          (paths, seconds, prices, std_errors) after every batch
+    """
+    if abs_tol is None and rel_tol is None and max_seconds is None and max_paths is None:
+        raise ValueError("Give a tolerance or a budget.")
+    portfolio = isinstance(payoffs, dict)
+    contracts = payoffs if portfolio else {'price': payoffs}
+    names = list(contracts)
+    time_steps = max(p.time_steps for p in contracts.values()) if time_steps is None else time_steps
+    strides = {}
+    for name, payoff in contracts.items():
+        if time_steps % payoff.time_steps:
+            raise ValueError("Every payoff's time steps must divide the shared time steps.")
+        strides[name] = time_steps // payoff.time_steps
+    if generator is None:
+        generator = lambda rng, n, steps: gbm_paths(rng, n, S, T, r, q, sigma, steps)
+
+    entropy = np.random.SeedSequence(seed).entropy
+    discount = np.exp(-r * T)
+    statistics = RunningStatistics(len(names))
+    nonzero = np.zeros(len(names), dtype=int)
+    trace = []
+    start = time.perf_counter()
+    block = 0
+    while True:
+        n = batch_size if max_paths is None else min(batch_size, max_paths - statistics.count)
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(block,)))
+        paths = generator(rng, n, time_steps)
+        values = discount * np.column_stack([contracts[name](paths[:, ::strides[name]]) for name in names])
+        statistics.update(values)
+        nonzero += np.count_nonzero(values, axis=0)
+        block += 1
+        elapsed = time.perf_counter() - start
+        std_error = statistics.std_error
+        trace.append((statistics.count, elapsed, statistics.mean.copy(), std_error))
+
+        # Each contract meets whichever of the two tolerances is looser for it; a zero price
+        # cannot meet rel_tol, and too few batches or non-zero payoffs meet neither
+        met = np.zeros(len(names), dtype=bool)
+        if abs_tol is not None:
+            met |= std_error <= abs_tol
+        if rel_tol is not None:
+            met |= (statistics.mean != 0) & (std_error <= rel_tol * np.abs(statistics.mean))
+        converged = block >= min_batches and bool(np.all(met & (nonzero >= min_nonzero)))
+        if converged:
+            reason = 'tolerance'
+        elif max_paths is not None and statistics.count >= max_paths:
+            reason = 'path budget'
+        elif max_seconds is not None and elapsed >= max_seconds:
+            reason = 'time budget'
+        else:
+            continue
+        break
+
+    if portfolio:
+        price = dict(zip(names, statistics.mean.tolist()))
+        error = dict(zip(names, std_error.tolist()))
+    else:
+        price, error = float(statistics.mean[0]), float(std_error[0])
+    return {'price': price, 'std_error': error, 'converged': converged, 'stop_reason': reason,
+            'simulations': statistics.count, 'seconds': elapsed, 'trace': trace}
+
+if __name__ == '__main__':
+    # Example usage (guarded so worker processes can import this file safely)
+    S = 100  # Current stock price
+    K = 100  # Strike price
+    T = 1    # Time to maturity (1 year)
+    r = 0.05 # Risk-free rate (5%)
+    sigma = 0.2 # Volatility (20%)
+    simulations = 1000000  # Number of simulations
+
+    call_price = monte_carlo_call_option(S, K, T, r, sigma, simulations)
+    print(f"Call Option Price: {call_price}")
+
+    # Pluggable payoffs on the streaming engine
+    payoffs = {
+        'European call': EuropeanPayoff(K),
+        'Asian call': AsianPayoff(K, time_steps=50),
+        'Up-and-out call': BarrierPayoff(K, 130, 'up-and-out', time_steps=50),
+        'Floating lookback call': LookbackPayoff(time_steps=50),
+        'Digital call': DigitalPayoff(K),
+    }
+    for name, payoff in payoffs.items():
+        result = monte_carlo_price(S, T, r, sigma, payoff, 200000)
+        print(f"{name}: {result['price']:.4f} +/- {result['std_error']:.4f} "
+              f"({result['paths_per_sec']:,.0f} paths/sec)")
+
+    # The estimate is identical for any number of workers
+    single = monte_carlo_price(S, T, r, sigma, AsianPayoff(K, time_steps=50), 400000, workers=1)
+    parallel = monte_carlo_price(S, T, r, sigma, AsianPayoff(K, time_steps=50), 400000, workers=2)
+    print(f"1 worker: {single['price']!r}, 2 workers: {parallel['price']!r}, "
+          f"identical: {single['price'] == parallel['price']}")
+
+    # All Greeks from the same simulation
+    for payoff in ('vanilla', 'digital'):
+        greeks = monte_carlo_greeks(S, K, T, r, sigma, simulations, payoff=payoff)
+        print(f"{payoff.title()} call Greeks: " + ", ".join(
+            f"{name} {greeks[name]:.4f} (+/- {greeks['std_errors'][name]:.4f})"
+            for name in ('price', 'delta', 'gamma', 'vega', 'rho')))
+
+    # Run until converged: a half-cent standard error, or 0.1% of the price, on every contract
+    book = {'European call': EuropeanPayoff(K), 'European put': EuropeanPayoff(K, 'put'),
+            'Monthly Asian call': AsianPayoff(K, time_steps=12), 'Up-and-out call': BarrierPayoff(K, 130, time_steps=48),
+            'Digital call': DigitalPayoff(K)}
+    result = monte_carlo_until_converged(S, T, r, sigma, book, abs_tol=0.005, rel_tol=0.001, max_seconds=30)
+    print(f"Stopped on {result['stop_reason']} after {result['simulations']:,} shared paths "
+          f"in {result['seconds']:.2f} seconds")
+    for name in book:
+        print(f"  {name}: {result['price'][name]:.4f} +/- {result['std_error'][name]:.4f}")
+    for paths, seconds, prices, errors in result['trace'][::10]:
+        print(f"  {paths:>9,} paths, {seconds:.2f} s, largest standard error {errors.max():.4f}")
+
+    # A hard contract under a wall-clock budget
+    result = monte_carlo_until_converged(S, T, r, sigma, DigitalPayoff(160), rel_tol=0.001, max_seconds=2)
+    print(f"Deep OTM digital: {result['price']:.6f} +/- {result['std_error']:.6f}, stopped on {result['stop_reason']}")
 
-call_price = monte_carlo_call_option(S, K, T, r, sigma, simulations)
-print(f"Call Option Price: {call_price}")
+    # A contract that never pays within the budget is not reported as converged
+    result = monte_carlo_until_converged(S, T, r, sigma, DigitalPayoff(300), rel_tol=0.01, max_paths=10**6)
+    print(f"Digital struck at 300: {result['price']:.6f} +/- {result['std_error']:.6f}, "
+          f"converged: {result['converged']}, stopped on {result['stop_reason']}")
+    assert not result['converged'] and result['stop_reason'] == 'path budget'
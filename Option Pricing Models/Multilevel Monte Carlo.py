@@ -0,0 +1,240 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+class GBMLevels:
+    """Geometric Brownian motion with the Euler scheme on S; draws are the Brownian increments."""
+    def __init__(self, S, r, sigma, q=0.0):
+        self.S, self.r, self.sigma, self.q = S, r, sigma, q
+
+    def draw(self, rng, n, steps, T):
+        return {'dW': np.sqrt(T / steps) * rng.standard_normal((n, steps))}
+
+    def paths(self, draws, T):
+        dW = draws['dW']
+        dt = T / dW.shape[1]
+        paths = np.empty((dW.shape[0], dW.shape[1] + 1))
+        paths[:, 0] = self.S
+        np.cumprod(1 + (self.r - self.q) * dt + self.sigma * dW, axis=1, out=paths[:, 1:])
+        paths[:, 1:] *= self.S
+        return paths
+
+class MertonLevels:
+    """Merton jump diffusion, exact in log price per step; draws are Brownian increments, jump counts and jump sizes."""
+    def __init__(self, S, r, sigma, lambda_, mu_j, sigma_j, q=0.0):
+        self.S, self.r, self.sigma, self.q = S, r, sigma, q
+        self.lambda_, self.mu_j, self.sigma_j = lambda_, mu_j, sigma_j
+
+    def draw(self, rng, n, steps, T):
+        dt = T / steps
+        jump_num = rng.poisson(self.lambda_ * dt, (n, steps))
+        jumps = self.mu_j * jump_num + self.sigma_j * np.sqrt(jump_num) * rng.standard_normal((n, steps))
+        return {'dW': np.sqrt(dt) * rng.standard_normal((n, steps)), 'jumps': jumps}
+
+    def paths(self, draws, T):
+        dW = draws['dW']
+        dt = T / dW.shape[1]
+        k = np.exp(self.mu_j + 0.5 * self.sigma_j**2) - 1
+        log_growth = (self.r - self.q - self.lambda_ * k - 0.5 * self.sigma**2) * dt + self.sigma * dW + draws['jumps']
+        paths = np.empty((dW.shape[0], dW.shape[1] + 1))
+        paths[:, 0] = 0.0
+        np.cumsum(log_growth, axis=1, out=paths[:, 1:])
+        return self.S * np.exp(paths)
+
+class HestonLevels:
+    """Heston model with Euler full truncation; draws are two independent Brownian increments."""
+    def __init__(self, S, r, V0, kappa, theta, xi, rho, q=0.0):
+        self.S, self.r, self.V0, self.q = S, r, V0, q
+        self.kappa, self.theta, self.xi, self.rho = kappa, theta, xi, rho
+
+    def draw(self, rng, n, steps, T):
+        return {'dW': np.sqrt(T / steps) * rng.standard_normal((n, steps)),
+                'dB': np.sqrt(T / steps) * rng.standard_normal((n, steps))}
+
+    def paths(self, draws, T):
+        dW1 = draws['dW']
+        dW2 = self.rho * dW1 + np.sqrt(1 - self.rho**2) * draws['dB']
+        n, steps = dW1.shape
+        dt = T / steps
+        log_S = np.full(n, np.log(self.S))
+        v = np.full(n, float(self.V0))
+        paths = np.empty((n, steps + 1))
+        paths[:, 0] = self.S
+        for i in range(steps):
+            v_pos = np.maximum(v, 0)
+            log_S += (self.r - self.q - 0.5 * v_pos) * dt + np.sqrt(v_pos) * dW1[:, i]
+            v += self.kappa * (self.theta - v_pos) * dt + self.xi * np.sqrt(v_pos) * dW2[:, i]
+            paths[:, i + 1] = np.exp(log_S)
+        return paths
+
+def coarsen(draws):
+    """Coarse-grid draws from fine ones: increments, jump counts and jump sizes add over pairs of steps."""
+    return {name: x[:, 0::2] + x[:, 1::2] for name, x in draws.items()}
+
+class EuropeanPayoff:
+    """Vanilla call or put on the terminal price."""
+    def __init__(self, K, option_type='call'):
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        self.K = K
+        self.sign = 1.0 if option_type == 'call' else -1.0
+
+    def __call__(self, paths):
+        return np.maximum(self.sign * (paths[:, -1] - self.K), 0)
+
+class AsianPayoff:
+    """Fixed-strike call or put on the average of the path over [0, T] (trapezoidal rule on the grid)."""
+    def __init__(self, K, option_type='call'):
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        self.K = K
+        self.sign = 1.0 if option_type == 'call' else -1.0
+
+    def __call__(self, paths):
+        average = 0.5 * (paths[:, :-1] + paths[:, 1:]).mean(axis=1)
+        return np.maximum(self.sign * (average - self.K), 0)
+
+def simulate_level(task):
+    """
+    Simulate n coupled samples of level l: P_l - P_{l-1} (or P_0 on level 0), with the
+    coarse path driven by the pairwise sums of the fine path's draws.
+
+    Returns the sums of Y, Y^2, the fine payoff P_l and P_l^2, and the elapsed time.
+    """
+    entropy, key, level, n, generator, payoff, T, discount, base_steps, chunk_size = task
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=key))
+    steps = base_steps * 2**level
+    sums = np.zeros(4)
+    start = time.perf_counter()
+    for first in range(0, n, chunk_size):
+        size = min(chunk_size, n - first)
+        draws = generator.draw(rng, size, steps, T)
+        fine = discount * payoff(generator.paths(draws, T))
+        Y = fine if level == 0 else fine - discount * payoff(generator.paths(coarsen(draws), T))
+        sums += [Y.sum(), np.dot(Y, Y), fine.sum(), np.dot(fine, fine)]
+    return sums, time.perf_counter() - start
+
+def multilevel_monte_carlo(generator, payoff, T, r, epsilon, base_steps=2, pilot_samples=2000, min_levels=3,
+                           max_levels=12, workers=1, chunk_size=50000, seed=0):
+    """
+    Multilevel Monte Carlo estimate of E[exp(-rT) payoff(paths)] with root-mean-square error epsilon.
+
+    Level l uses base_steps * 2^l time steps, and its correction P_l - P_{l-1} is simulated
+    with the coarse path driven by the same Brownian increments (and jumps) as the fine
+    one, so the correction variances V_l decay with l. Following Giles (2008), after a
+    pilot run on each level the samples per level are set to
+    N_l = 2 epsilon^-2 sqrt(V_l / C_l) sum_k sqrt(V_k C_k), with C_l the cost per sample,
+    which splits the squared error equally between variance and bias. Levels are added
+    until the bias estimate max(|E[Y_L]|, |E[Y_{L-1}]| / 2) / (2^alpha - 1) is below
+    epsilon / sqrt(2), with the weak order alpha fitted to the level means and clipped to
+    [0.5, 2] so that a sign change in the corrections cannot end the search early. All levels
+    needing extra samples in a round are simulated in parallel.
+
+    Parameters:
+    generator: GBMLevels, MertonLevels or HestonLevels (any object with draw and paths methods)
+    payoff (callable): Payoff object mapping a (paths x steps+1) array to payoffs
+    T (float): Time to maturity in years
+    r (float): Risk-free interest rate used for discounting
+    epsilon (float): Target root-mean-square error
+    base_steps (int): Time steps on level 0
+    pilot_samples (int): Pilot samples on every new level
+    min_levels (int): Levels used before the bias test is applied, at least 3 so the weak
+                      order can be fitted to two correction levels
+    max_levels (int): Maximum number of levels
+    workers (int): Number of worker processes (1 runs in the current process)
+    chunk_size (int): Number of samples simulated at a time
+    seed (int): Root seed for the SeedSequence
+
+    Returns:
+    dict: 'price', 'std_error', 'bias' (estimate), 'converged' (bias test passed before
+          max_levels), 'levels', 'samples', 'means', 'variances', 'cost'
+          (time steps simulated), 'seconds' (simulation time summed over levels) and 'standard_cost' (steps plain Monte Carlo on the
+          finest level would need for the same error)
+    """
+    if min_levels < 3:
+        raise ValueError("min_levels must be at least 3: the bias test fits the weak order to two correction levels.")
+    if max_levels < min_levels:
+        raise ValueError("max_levels must be at least min_levels.")
+    entropy = np.random.SeedSequence(seed).entropy
+    discount = np.exp(-r * T)
+    sums = np.zeros((0, 4))
+    samples = np.zeros(0, dtype=int)
+    seconds = np.zeros(0)
+    extra = np.full(min_levels, pilot_samples)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    round_ = 0
+
+    try:
+        while True:
+            # Grow the per-level arrays for any new level
+            L = extra.size
+            sums = np.vstack([sums, np.zeros((L - sums.shape[0], 4))])
+            samples = np.concatenate([samples, np.zeros(L - samples.size, dtype=int)])
+            seconds = np.concatenate([seconds, np.zeros(L - seconds.size)])
+
+            tasks = [(entropy, (level, round_), level, int(extra[level]), generator, payoff, T, discount, base_steps,
+                      chunk_size) for level in range(L) if extra[level] > 0]
+            results = list(executor.map(simulate_level, tasks)) if executor else list(map(simulate_level, tasks))
+            for task, (level_sums, elapsed) in zip(tasks, results):
+                sums[task[2]] += level_sums
+                samples[task[2]] += task[3]
+                seconds[task[2]] += elapsed
+            round_ += 1
+
+            means = sums[:, 0] / samples
+            variances = np.maximum(sums[:, 1] / samples - means**2, 1e-30)
+            cost = base_steps * 2.0**np.arange(L) * np.where(np.arange(L) > 0, 1.5, 1.0)
+
+            # Optimal samples per level for a variance of epsilon^2 / 2
+            target = np.ceil(2 / epsilon**2 * np.sqrt(variances / cost) * np.sum(np.sqrt(variances * cost)))
+            extra = np.maximum(target - samples, 0).astype(int)
+            if np.any(extra > 0.01 * samples):
+                continue
+
+            # Bias test with the weak order fitted to the level means
+            levels = np.arange(1, L)
+            alpha = np.clip(-np.polyfit(levels, np.log2(np.abs(means[1:]) + 1e-30), 1)[0], 0.5, 2.0)
+            bias = max(abs(means[-1]), abs(means[-2]) / 2**alpha) / (2**alpha - 1)
+            if bias < epsilon / np.sqrt(2) or L >= max_levels:
+                break
+            # Add a level with a pilot run, then re-optimise every level
+            extra = np.append(np.zeros(L, dtype=int), pilot_samples)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    fine_variance = sums[-1, 3] / samples[-1] - (sums[-1, 2] / samples[-1])**2
+    return {'price': float(means.sum()), 'std_error': float(np.sqrt(np.sum(variances / samples))),
+            'bias': float(bias), 'converged': bool(bias < epsilon / np.sqrt(2)), 'levels': L, 'samples': samples, 'means': means, 'variances': variances,
+            'cost': float(samples @ cost), 'seconds': float(seconds.sum()),
+            'standard_cost': float(2 / epsilon**2 * fine_variance * base_steps * 2**(L - 1))}
+
+if __name__ == '__main__':
+    # Example usage (guarded so worker processes can import this file safely)
+    S = 100     # Current stock price
+    K = 100     # Strike price
+    T = 1       # Time to maturity in years
+    r = 0.05    # Risk-free rate
+    sigma = 0.2 # Volatility
+
+    # Arithmetic Asian call under GBM: cost grows like epsilon^-2 instead of epsilon^-3
+    gbm = GBMLevels(S, r, sigma)
+    for epsilon in (0.02, 0.01, 0.005, 0.0025):
+        result = multilevel_monte_carlo(gbm, AsianPayoff(K), T, r, epsilon, workers=4)
+        print(f"GBM Asian, epsilon {epsilon}: {result['price']:.4f} +/- {result['std_error']:.4f}, "
+              f"{result['levels']} levels, N_l = {result['samples'].tolist()}, "
+              f"cost {result['cost']:.2e} vs standard {result['standard_cost']:.2e}, "
+              f"epsilon^2 x cost {epsilon**2 * result['cost']:.1f}")
+
+    # Heston and Merton generators with the same driver; the variance process needs a finer base grid
+    heston = HestonLevels(S, r, 0.04, 2.0, 0.04, 0.3, -0.7)
+    merton = MertonLevels(S, r, sigma, 0.5, -0.1, 0.15)
+    for name, generator, payoff, base_steps in (('Heston European call', heston, EuropeanPayoff(K), 8),
+                                                ('Heston Asian call', heston, AsianPayoff(K), 8),
+                                                ('Merton Asian put', merton, AsianPayoff(K, 'put'), 2),
+                                                ('Merton European put', merton, EuropeanPayoff(K, 'put'), 2)):
+        start = time.perf_counter()
+        result = multilevel_monte_carlo(generator, payoff, T, r, 0.005, base_steps=base_steps, workers=4)
+        print(f"{name}: {result['price']:.4f} +/- {result['std_error']:.4f}, {result['levels']} levels "
+              f"(converged: {result['converged']}), cost ratio {result['standard_cost'] / result['cost']:.1f}x, "
+              f"{time.perf_counter() - start:.2f} seconds")
@@ -0,0 +1,252 @@
+import functools
+import inspect
+import time
+from collections import OrderedDict
+import numpy as np
+from scipy.stats import norm
+
+CACHED_PRICERS = []  # Every function wrapped by memoize_pricer, for cache_report
+
+def memoize_pricer(func=None, maxsize=100000, quantum=None, vectorized=True):
+    """
+    Memoize a pricing function with quantised keys, bounded LRU eviction and statistics.
+
+    Float arguments are snapped to a grid of step `quantum` before the lookup and the
+    function is evaluated at the snapped inputs, so nearby calls share one entry and the
+    cached value does not depend on call order. Integers (step counts, path counts) and
+    other arguments are passed through unchanged and keyed exactly. When numeric array
+    arguments are passed, every element is looked up separately and all the misses are
+    priced in one call on the arrays of missing inputs (or one call per miss if
+    vectorized=False).
+
+    The pricer may return a number, an array with one row per quote, or a dict of such
+    values (e.g. Greeks); batch calls return the same structure with the batch shape in front.
+
+    Can be used as @memoize_pricer or @memoize_pricer(maxsize=..., quantum=...).
+
+    Parameters:
+    func (callable): Pricing function, vectorized over its numeric array arguments
+    maxsize (int): Maximum number of cached entries; least recently used entries are evicted
+    quantum (float, dict or None): Grid step for every float argument, a dict of steps by
+                                   argument name (only those are snapped), or None to
+                                   cache exact inputs
+    vectorized (bool): Whether func accepts arrays
+
+    Returns:
+    callable: Wrapped function with .stats(), .cache_clear() and .cache attributes
+    """
+    if func is None:
+        return functools.partial(memoize_pricer, maxsize=maxsize, quantum=quantum, vectorized=vectorized)
+
+    signature = inspect.signature(func)
+    cache = OrderedDict()
+    counters = {'calls': 0, 'hits': 0, 'misses': 0, 'evictions': 0, 'seconds': 0.0, 'compute_seconds': 0.0}
+
+    def step(name, value):
+        # Only real floats are snapped by a scalar quantum; a dict names the snapped arguments
+        if isinstance(quantum, dict):
+            return quantum.get(name)
+        if isinstance(value, (float, np.floating)) or (isinstance(value, np.ndarray) and value.dtype.kind == 'f'):
+            return quantum
+        return None
+
+    def snap(q, value):
+        # Grid index used in the key, and the snapped value the pricer is evaluated at
+        index = np.round(np.asarray(value, dtype=float) / q)
+        return index, index * q
+
+    def is_array(value):
+        return isinstance(value, (np.ndarray, list, tuple)) and np.ndim(value) > 0 and \
+            np.asarray(value).dtype.kind in 'biuf'
+
+    def hashable(value):
+        if isinstance(value, (np.ndarray, list, tuple)):
+            value = np.asarray(value)
+            return (value.shape, tuple(value.ravel().tolist()))
+        return value
+
+    def split(value, n):
+        # One cache entry per quote from a vectorized result
+        if isinstance(value, dict):
+            parts = {name: split(part, n) for name, part in value.items()}
+            return [{name: parts[name][i] for name in parts} for i in range(n)]
+        value = np.asarray(value)
+        if value.ndim == 0:
+            return [value[()]] * n
+        if value.shape[0] != n:
+            raise ValueError(f"Pricer returned shape {value.shape} for {n} quotes; "
+                             f"expected a number or one row per quote.")
+        return list(value)
+
+    def combine(entries, shape):
+        if isinstance(entries[0], dict):
+            return {name: combine([entry[name] for entry in entries], shape) for name in entries[0]}
+        values = np.array(entries)
+        return values.reshape(shape + values.shape[1:])
+
+    def store(key, value):
+        cache[key] = value
+        if len(cache) > maxsize:
+            cache.popitem(last=False)
+            counters['evictions'] += 1
+
+    def compute(arguments):
+        start = time.perf_counter()
+        value = func(**arguments)
+        counters['compute_seconds'] += time.perf_counter() - start
+        return value
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        steps = {name: step(name, value) for name, value in arguments.items()}
+        arrays = [name for name, value in arguments.items() if is_array(value)]
+
+        # Key entry of every scalar argument, and the scalar inputs the pricer is evaluated at
+        inputs = {}
+        key_parts = {}
+        for name, value in arguments.items():
+            if name in arrays:
+                continue
+            if steps[name] is not None and not isinstance(value, bool):
+                index, inputs[name] = snap(steps[name], value)
+                key_parts[name] = float(index)
+            else:
+                inputs[name] = value
+                key_parts[name] = hashable(value)
+
+        if not arrays:
+            # Scalar call: one lookup
+            key = tuple(key_parts.values())
+            counters['calls'] += 1
+            if key in cache:
+                cache.move_to_end(key)
+                counters['hits'] += 1
+                value = cache[key]
+            else:
+                counters['misses'] += 1
+                value = compute(inputs)
+                store(key, value)
+            counters['seconds'] += time.perf_counter() - start
+            return value
+
+        # Batch call: one key per element of the broadcast array arguments
+        columns = np.broadcast_arrays(*(np.asarray(arguments[name]) for name in arrays))
+        shape = columns[0].shape
+        size = columns[0].size
+        batch_inputs = {}
+        for name, column in zip(arrays, columns):
+            column = column.ravel()
+            if steps[name] is not None:
+                index, column = snap(steps[name], column)
+                key_parts[name] = index.tolist()
+            else:
+                key_parts[name] = column.tolist()
+            batch_inputs[name] = column
+        keys = list(zip(*(key_parts[name] if name in arrays else [key_parts[name]] * size
+                          for name in arguments)))
+        counters['calls'] += len(keys)
+
+        result = [None] * len(keys)
+        missing = {}
+        for position, key in enumerate(keys):
+            if key in cache:
+                cache.move_to_end(key)
+                result[position] = cache[key]
+            else:
+                missing.setdefault(key, []).append(position)
+        # Repeats of a missing input within the batch are priced once, so they count as hits
+        counters['hits'] += len(keys) - len(missing)
+        counters['misses'] += len(missing)
+
+        if missing:
+            # Price every distinct miss in one call on the snapped inputs
+            first = np.array([positions[0] for positions in missing.values()])
+            batch = {name: column[first] for name, column in batch_inputs.items()}
+            if vectorized:
+                values = split(compute({**inputs, **batch}), first.size)
+            else:
+                values = [compute({**inputs, **{name: column[i].item() for name, column in batch.items()}})
+                          for i in range(first.size)]
+            for (key, positions), value in zip(missing.items(), values):
+                for position in positions:
+                    result[position] = value
+                store(key, value)
+        counters['seconds'] += time.perf_counter() - start
+        return combine(result, shape)
+
+    def stats():
+        calls = max(counters['calls'], 1)
+        return {'function': func.__name__, 'size': len(cache), 'maxsize': maxsize,
+                'calls': counters['calls'], 'hits': counters['hits'], 'misses': counters['misses'],
+                'hit_rate': counters['hits'] / calls, 'evictions': counters['evictions'],
+                'latency_us': counters['seconds'] / calls * 1e6,
+                'compute_seconds': counters['compute_seconds'], 'total_seconds': counters['seconds']}
+
+    def cache_clear():
+        cache.clear()
+        for name in counters:
+            counters[name] = 0
+
+    wrapper.stats = stats
+    wrapper.cache_clear = cache_clear
+    wrapper.cache = cache
+    CACHED_PRICERS.append(wrapper)
+    return wrapper
+
+def cache_report():
+    """Print hit rate and latency for every memoized pricer."""
+    for pricer in CACHED_PRICERS:
+        s = pricer.stats()
+        print(f"{s['function']:>14}: {s['calls']} lookups, hit rate {s['hit_rate']:.1%}, "
+              f"{s['latency_us']:.2f} us/lookup, {s['evictions']} evictions, "
+              f"{s['compute_seconds'] * 1e3:.1f} ms pricing, size {s['size']}/{s['maxsize']}")
+
+if __name__ == '__main__':
+    # Example usage (guarded so the hedging scripts can load this file): Black-Scholes pricers, memoized
+    @memoize_pricer(quantum={'S': 0.01, 'K': 0.01, 'T': 1 / 365, 'r': 1e-4, 'sigma': 1e-4})
+    def bsformula(S, K, T, r, sigma):
+        d1 = (np.log(S / K) + (r + sigma**2 / 2) * T) / (sigma * np.sqrt(T))
+        d2 = d1 - sigma * np.sqrt(T)
+        return S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
+
+    @memoize_pricer(quantum={'S': 0.01, 'K': 0.01, 'T': 1 / 365, 'r': 1e-4, 'sigma': 1e-4})
+    def vega(S, K, T, r, sigma):
+        d1 = (np.log(S / K) + (r + sigma**2 / 2) * T) / (sigma * np.sqrt(T))
+        return S * np.sqrt(T) * norm.pdf(d1)
+
+    @memoize_pricer(quantum={'S': 0.01, 'K': 0.01, 'T': 1 / 365, 'r': 1e-4, 'sigma': 1e-4}, maxsize=5000)
+    def gamma(S, K, T, r, sigma):
+        d1 = (np.log(S / K) + (r + sigma**2 / 2) * T) / (sigma * np.sqrt(T))
+        return norm.pdf(d1) / (S * sigma * np.sqrt(T))
+
+    S = 100  # Current stock price
+    K = 100  # Strike price
+    T = 1    # Time to maturity in years
+    r = 0.05 # Risk-free rate
+
+    # Vega-hedge grid: overlapping volatility sweeps are priced once
+    for initial_sigma in (0.2, 0.21, 0.22, 0.2):
+        sigmas = np.linspace(initial_sigma - 0.1, initial_sigma + 0.1, 50)
+        vegas = vega(S, K, T, r, sigmas)
+        option_prices = bsformula(S, K, T, r, sigmas)
+    print(f"Vega at sigma=0.2: {vega(S, K, T, r, 0.2)}, price: {bsformula(S, K, T, r, 0.2)}")
+
+    # Portfolio vega and gamma on ticks that barely move: one batched lookup per tick
+    strikes = np.array([100, 110, 90])
+    vols = np.array([0.2, 0.25, 0.22])
+    rng = np.random.default_rng(0)
+    for spot in S + np.round(np.cumsum(0.01 * rng.standard_normal(2000)), 2):
+        portfolio_vega = vega(spot, strikes, T, r, vols).sum()
+        portfolio_gamma = gamma(spot, strikes, T, r, vols).sum()
+    print(f"Portfolio vega: {portfolio_vega}, gamma: {portfolio_gamma}")
+
+    # Batch lookups compute only the misses, in one vectorized call
+    spots = rng.uniform(95, 105, 100000)
+    before = bsformula.stats()['misses']
+    bsformula(spots, K, T, r, 0.2)
+    print(f"100k-quote batch priced {bsformula.stats()['misses'] - before} distinct snapped inputs")
+    cache_report()
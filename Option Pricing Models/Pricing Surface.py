@@ -0,0 +1,481 @@
+import json
+import math
+import os
+import tempfile
+import time
+import numpy as np
+from scipy.special import ndtr
+
+def black_scholes_carry(S, K, T, r, b, sigma, sign=1.0):
+    """Generalized Black-Scholes price with cost of carry b (sign +1 call, -1 put)."""
+    d1 = (np.log(S / K) + (b + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+    return sign * (S * np.exp((b - r) * T) * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+
+def phi(S, T, gamma, H, I, r, b, sigma):
+    """Bjerksund-Stensland phi function, vectorized over all inputs."""
+    lam = (-r + gamma * b + 0.5 * gamma * (gamma - 1) * sigma**2) * T
+    d = -(np.log(S / H) + (b + (gamma - 0.5) * sigma**2) * T) / (sigma * np.sqrt(T))
+    kappa = 2 * b / sigma**2 + (2 * gamma - 1)
+    return np.exp(lam) * S**gamma * (ndtr(d) - (I / S)**kappa * ndtr(d - 2 * np.log(I / S) / (sigma * np.sqrt(T))))
+
+def bjerksund_stensland_1993(S, K, T, r, sigma, b=None, option_type='call'):
+    """
+    Bjerksund and Stensland (1993) approximation for American options, vectorized over
+    all inputs. Puts use the put-call transformation P(S, K, T, r, b) = C(K, S, T, r - b, -b).
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    b = r if b is None else b
+    S, K, T, r, sigma, b = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, b)))
+    if option_type == 'put':
+        S, K, r, b = K, S, r - b, -b
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        beta = (0.5 - b / sigma**2) + np.sqrt((b / sigma**2 - 0.5)**2 + 2 * r / sigma**2)
+        BInfinity = beta / (beta - 1) * K
+        B0 = np.maximum(K, r / (r - b) * K)
+        h = -(b * T + 2 * sigma * np.sqrt(T)) * B0 / (BInfinity - B0)
+        I = B0 + (BInfinity - B0) * (1 - np.exp(h))
+        alpha = (I - K) * I**(-beta)
+
+        american = (alpha * S**beta - alpha * phi(S, T, beta, I, I, r, b, sigma)
+                    + phi(S, T, 1, I, I, r, b, sigma) - phi(S, T, 1, K, I, r, b, sigma)
+                    - K * phi(S, T, 0, I, I, r, b, sigma) + K * phi(S, T, 0, K, I, r, b, sigma))
+        price = np.where(S >= I, S - K, american)
+        return np.where(b >= r, black_scholes_carry(S, K, T, r, b, sigma), price)
+
+def normalised_price(model, option_type, x, s, a, c):
+    """
+    Exact price divided by the strike, as a function of log-moneyness x = ln(S/K), total
+    volatility s = sigma sqrt(T), integrated rate a = rT and integrated dividend yield c = qT.
+    Both models depend on their inputs only through these four numbers.
+    """
+    if model == 'black-scholes':
+        return black_scholes_carry(np.exp(x), 1.0, 1.0, a, a - c, s, 1.0 if option_type == 'call' else -1.0)
+    return bjerksund_stensland_1993(np.exp(x), 1.0, 1.0, a, s, a - c, option_type)
+
+def not_a_knot_matrix(n):
+    """
+    Map n samples on a uniform grid to the n + 2 coefficients of the interpolating cubic
+    B-spline with not-a-knot end conditions (continuous third derivative at the second
+    and second-to-last nodes).
+    """
+    A = np.zeros((n + 2, n + 2))
+    for j in range(n):
+        A[j, j:j + 3] = [1 / 6, 4 / 6, 1 / 6]
+    A[n, 0:5] = [1, -4, 6, -4, 1]
+    A[n + 1, n - 3:n + 2] = [1, -4, 6, -4, 1]
+    return np.linalg.inv(A)[:, :n]
+
+def bspline_weights(u, n):
+    """
+    Uniform cubic B-spline taps for fractional grid positions u in [0, n - 1].
+
+    Returns the first coefficient index and the (len(u), 4) weights with their first
+    and second derivatives with respect to u.
+    """
+    i = np.clip(np.floor(u).astype(int), 0, n - 2)
+    t = u - i
+    s = 1 - t
+    t2 = t * t
+    weights = np.stack([s * s * s, (3 * t - 6) * t2 + 4, ((3 - 3 * t) * t + 3) * t + 1, t2 * t], axis=1) / 6
+    first = np.stack([-s * s, (3 * t - 4) * t, (2 - 3 * t) * t + 1, t2], axis=1) / 2
+    second = np.stack([s, 3 * t - 2, 1 - 3 * t, t], axis=1)
+    return i, weights, first, second
+
+class PricingSurface:
+    """
+    Precomputed normalised price grid served by tensor-product cubic spline interpolation,
+    with the exact model as a fallback outside the grid and in the grid cells where the
+    spline misses the tolerance.
+
+    The speed-up over the exact model is on the scalar quote() path, where one lookup
+    skips the per-call numpy overhead of the closed form. Batched price() calls run at
+    about the same throughput as the vectorized exact model.
+    """
+    def __init__(self, coefficients, axes, model, option_type, error_bound=None, exact_cells=None, tolerance=None):
+        # A plain ndarray view: slicing it skips the np.memmap overhead but keeps the mapping
+        self.coefficients = np.asarray(coefficients)
+        self.axes = [tuple(axis) for axis in axes]  # (low, high, nodes) per dimension
+        self.model = model
+        self.option_type = option_type
+        self.error_bound = error_bound
+        self.tolerance = tolerance
+        # exact_cells[patch, x, s, m, d] marks the grid cells priced by the exact model
+        if exact_cells is None:
+            exact_cells = np.zeros((2,) + tuple(n - 1 for _, _, n in self.axes), dtype=bool)
+        self.exact_cells = np.asarray(exact_cells)
+
+    @classmethod
+    def build(cls, model='bjerksund-stensland', option_type='put', log_moneyness=(-0.7, 0.7, 113),
+              total_volatility=(0.05, 1.0, 49), rate_time=(0.0, 0.1, 8), carry_time=(0.0, 0.1, 8),
+              tolerance=1e-4, validation_samples=20000, seed=0):
+        """
+        Price the exact model on the grid, fit the spline coefficients, flag the cells where
+        the spline misses the tolerance and record the largest normalised error found on
+        random validation points.
+
+        The rate and carry dimensions are gridded as min(r, q) T and |b| T with b = r - q,
+        in two patches for b >= 0 and b < 0. The Bjerksund-Stensland exercise boundary
+        switches formula at b = 0, so its kink falls on the patch edge instead of cutting
+        diagonally through the grid.
+
+        The exercise boundary still kinks the price inside the grid for short-dated,
+        low-volatility, deep in-the-money contracts, which no spline fits to a few basis
+        points. Those cells are flagged in exact_cells and priced by the exact model: every
+        cell whose spline support straddles the boundary, every cell with a probe error
+        above half the tolerance, and every cell where a round of random points still finds
+        an error above the tolerance (up to 20 rounds, until one passes). 'error_bound' is then
+        measured on independent random points.
+
+        Parameters:
+        model (str): 'black-scholes' or 'bjerksund-stensland' (1993 American approximation)
+        option_type (str): Type of the option - 'call' or 'put'
+        log_moneyness (tuple): (low, high, nodes) for ln(S/K)
+        total_volatility (tuple): (low, high, nodes) for sigma sqrt(T), i.e. the square
+                                  root of the total variance
+        rate_time (tuple): (low, high, nodes) for min(r, q) T
+        carry_time (tuple): (low, high, nodes) for |r - q| T
+        tolerance (float): Largest accepted error of price / K before a cell falls back
+                           to the exact model
+        validation_samples (int): Number of random points per flagging round and for the
+                                  error bound
+        seed (int): Seed for the random points
+
+        Returns:
+        PricingSurface: Surface with float32 coefficients, its 'exact_cells' and 'error_bound'
+        """
+        if model not in ('black-scholes', 'bjerksund-stensland'):
+            raise ValueError("Invalid model. Use 'black-scholes' or 'bjerksund-stensland'.")
+        if option_type not in ('call', 'put'):
+            raise ValueError("Invalid option type. Use 'call' or 'put'.")
+        axes = [log_moneyness, total_volatility, rate_time, carry_time]
+        x, s, m, d = np.meshgrid(*(np.linspace(low, high, n) for low, high, n in axes), indexing='ij')
+        coefficients = np.stack([normalised_price(model, option_type, x, s, m + d, m),
+                                 normalised_price(model, option_type, x, s, m, m + d)])
+        intrinsic = np.maximum((1.0 if option_type == 'call' else -1.0) * (np.exp(x) - 1), 0)
+        exercised = (intrinsic > 0) & (np.abs(coefficients - intrinsic) < 1e-12)
+
+        # Not-a-knot spline coefficients, solved one dimension at a time
+        for axis, (_, _, n) in enumerate(axes, start=1):
+            coefficients = np.moveaxis(np.tensordot(not_a_knot_matrix(n), coefficients, axes=(1, axis)), 0, axis)
+        surface = cls(coefficients.astype(np.float32, order='C'), axes, model, option_type, tolerance=tolerance)
+
+        # Cells whose 4 x 4 x 4 x 4 support holds exercised and unexercised nodes straddle the boundary
+        straddle = [exercised, ~exercised]
+        for axis, (_, _, n) in enumerate(axes, start=1):
+            support = [np.clip(np.arange(n - 1) + offset, 0, n - 1) for offset in (-1, 0, 1, 2)]
+            straddle = [np.logical_or.reduce([nodes.take(taps, axis=axis) for taps in support]) for nodes in straddle]
+        surface.exact_cells |= straddle[0] & straddle[1]
+
+        # Probe every cell at 3 x 3 points in moneyness and volatility, at the centre of its rate
+        # and carry cell, or at 3 x 3 points there too next to zero rate or carry, where the
+        # early exercise premium bends sharply
+        thirds = np.array([1, 3, 5]) / 6
+        probes = [low + (np.arange(n - 1)[:, None] + thirds).ravel() * (high - low) / (n - 1)
+                  for low, high, n in axes[:2]]
+        x, s = (v.ravel() for v in np.meshgrid(*probes, indexing='ij'))
+        n_x, n_s = (n - 1 for _, _, n in axes[:2])
+        (m_low, m_high, n_m), (d_low, d_high, n_d) = axes[2:]
+        for j in range(n_m - 1):
+            for k in range(n_d - 1):
+                for m in m_low + (j + (thirds if j == 0 else thirds[1:2])) * (m_high - m_low) / (n_m - 1):
+                    for d in d_low + (k + (thirds if k == 0 else thirds[1:2])) * (d_high - d_low) / (n_d - 1):
+                        for patch, (a, c) in enumerate(((m + d, m), (m, m + d))):
+                            errors = np.abs(surface.evaluate(x, s, a, c)['f']
+                                            - normalised_price(model, option_type, x, s, a, c))
+                            # Half the tolerance leaves room for the error between the probes
+                            surface.exact_cells[patch, :, :, j, k] |= (
+                                errors.reshape(n_x, 3, n_s, 3).max(axis=(1, 3)) > tolerance / 2)
+
+        # Random rounds catch the cells the probes missed
+        for attempt in range(1, 21):
+            x, s, a, c = surface.random_points(validation_samples, [seed, attempt])
+            errors = np.abs(surface.evaluate(x, s, a, c)['f'] - normalised_price(model, option_type, x, s, a, c))
+            missed = errors > tolerance
+            if not np.any(missed):
+                break
+            surface.exact_cells[surface.cell_index(x[missed], s[missed], a[missed], c[missed])] = True
+        surface.error_bound = surface.validate(validation_samples, seed)['max_error']
+        return surface
+
+    def save(self, path):
+        """
+        Write the coefficients to path.npy, the exact cells to path.exact.npy and the grid
+        description to path.json.
+        """
+        np.save(path + '.npy', self.coefficients)
+        np.save(path + '.exact.npy', self.exact_cells)
+        with open(path + '.json', 'w') as f:
+            json.dump({'axes': self.axes, 'model': self.model, 'option_type': self.option_type,
+                       'error_bound': self.error_bound, 'tolerance': self.tolerance}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a saved surface. With mmap=True the coefficients are memory-mapped read-only,
+        so every process that loads the same file shares one copy in the page cache.
+        """
+        with open(path + '.json') as f:
+            meta = json.load(f)
+        coefficients = np.load(path + '.npy', mmap_mode='r' if mmap else None)
+        exact_cells = np.load(path + '.exact.npy', mmap_mode='r' if mmap else None)
+        return cls(coefficients, meta['axes'], meta['model'], meta['option_type'], meta['error_bound'], exact_cells,
+                   meta['tolerance'])
+
+    def cell_index(self, x, s, a, c):
+        """Index of the exact_cells entry holding every point."""
+        m, d = np.minimum(a, c), np.abs(a - c)
+        index = [(c > a).astype(int)]
+        for values, (low, high, n) in zip((x, s, m, d), self.axes):
+            index.append(np.clip(np.floor((values - low) / (high - low) * (n - 1)).astype(int), 0, n - 2))
+        return tuple(index)
+
+    def exact(self, x, s, a, c, derivatives=False, h=1e-4):
+        """
+        Exact normalised price, with partial derivatives by finite differences (central in
+        x and s, forward in a and c so they stay non-negative) when requested.
+        """
+        f = lambda *point: normalised_price(self.model, self.option_type, *point)
+        out = {'f': f(x, s, a, c)}
+        if derivatives:
+            up, down = f(x + h, s, a, c), f(x - h, s, a, c)
+            out['f_x'] = (up - down) / (2 * h)
+            out['f_xx'] = (up - 2 * out['f'] + down) / h**2
+            out['f_s'] = (f(x, s + h, a, c) - f(x, s - h, a, c)) / (2 * h)
+            out['f_a'] = (f(x, s, a + h, c) - out['f']) / h
+            out['f_c'] = (f(x, s, a, c + h) - out['f']) / h
+        return out
+
+    def axis_weights(self, axis, values):
+        """Spline taps for one dimension, the per-unit derivative scale and an in-grid mask."""
+        low, high, n = self.axes[axis]
+        u = (values - low) / (high - low) * (n - 1)
+        return bspline_weights(np.clip(u, 0, n - 1), n) + ((n - 1) / (high - low), (u >= 0) & (u <= n - 1))
+
+    def evaluate(self, x, s, a, c, derivatives=False, chunk_size=16384):
+        """
+        Interpolate the normalised price f(x, s, a, c) (and, if requested, its partial
+        derivatives f_x, f_xx, f_s, f_a, f_c) at arrays of coordinates. Points outside the
+        grid and points in exact_cells are priced by the exact model.
+
+        When the whole batch shares one rate and dividend pair, as a quote chain for one
+        expiry does, those two dimensions are contracted once and every point needs only
+        the 4 x 4 taps in moneyness and volatility.
+        """
+        x, s, a, c = (np.ravel(v).astype(float) for v in np.broadcast_arrays(x, s, a, c))
+        names = ('f', 'f_x', 'f_xx', 'f_s', 'f_a', 'f_c') if derivatives else ('f',)
+        out = {name: np.empty(x.size) for name in names}
+        flagged = np.zeros(x.size, dtype=bool)
+        patch = (c > a).astype(int)
+        m = np.minimum(a, c)
+        d = np.abs(a - c)
+        taps = np.arange(4)
+        n_x, n_s = self.coefficients.shape[1:3]
+        shared = x.size > 0 and np.all(m == m[0]) and np.all(d == d[0])
+
+        if shared:
+            # Contract the rate and carry dimensions once for the whole batch
+            i_m, w_m, d_m, _, h_m, inside_m = self.axis_weights(2, m[:1])
+            i_d, w_d, d_d, _, h_d, inside_d = self.axis_weights(3, d[:1])
+            block = np.asarray(self.coefficients[patch[0], :, :, i_m[0]:i_m[0] + 4, i_d[0]:i_d[0] + 4], dtype=float)
+            slabs = [np.einsum('xsmd,m,d->xs', block, w_m[0], w_d[0])]
+            if derivatives:
+                slabs += [np.einsum('xsmd,m,d->xs', block, d_m[0] * h_m, w_d[0]),
+                          np.einsum('xsmd,m,d->xs', block, w_m[0], d_d[0] * h_d)]
+            slabs = [slab.ravel() for slab in slabs]
+        else:
+            shape = self.coefficients.shape
+            strides = [int(np.prod(shape[k + 1:])) for k in range(5)]
+            flat = np.ravel(self.coefficients)
+
+        for start in range(0, x.size, chunk_size):
+            block = slice(start, start + chunk_size)
+            i_x, w_x, d_x, d2_x, h_x, inside_x = self.axis_weights(0, x[block])
+            i_s, w_s, d_s, _, h_s, inside_s = self.axis_weights(1, s[block])
+            index = ((i_x[:, None] + taps) * n_s)[:, :, None] + (i_s[:, None] + taps)[:, None, :]
+            if shared:
+                inside = inside_x & inside_s & inside_m[0] & inside_d[0]
+                G = [slab[index] for slab in slabs]
+            else:
+                # Gather the 4 x 4 x 4 x 4 coefficient block around every point
+                i_m, w_m, d_m, _, h_m, inside_m = self.axis_weights(2, m[block])
+                i_d, w_d, d_d, _, h_d, inside_d = self.axis_weights(3, d[block])
+                inside = inside_x & inside_s & inside_m & inside_d
+                index = (patch[block] * strides[0])[:, None, None, None, None] + (
+                    (i_x[:, None] + taps) * strides[1])[:, :, None, None, None] + (
+                    (i_s[:, None] + taps) * strides[2])[:, None, :, None, None] + (
+                    (i_m[:, None] + taps) * strides[3])[:, None, None, :, None] + (
+                    (i_d[:, None] + taps) * strides[4])[:, None, None, None, :]
+                values = flat[index].astype(float)
+                by_m = np.einsum('qxsmd,qd->qxsm', values, w_d)
+                G = [np.einsum('qxsm,qm->qxs', by_m, w_m)]
+                if derivatives:
+                    G += [np.einsum('qxsm,qm->qxs', by_m, d_m * h_m),
+                          np.einsum('qxsmd,qd,qm->qxs', values, d_d * h_d, w_m)]
+
+            flagged[block] = ~inside | self.exact_cells[patch[block], i_x, i_s, i_m, i_d]
+
+            # Contract volatility, then moneyness
+            A = np.einsum('qxs,qs->qx', G[0], w_s)
+            out['f'][block] = np.einsum('qx,qx->q', A, w_x)
+            if derivatives:
+                f_m = np.einsum('qxs,qs,qx->q', G[1], w_s, w_x)
+                f_d = np.einsum('qxs,qs,qx->q', G[2], w_s, w_x)
+                # a = m + d, c = m on the b >= 0 patch; a = m, c = m + d on the other
+                above = patch[block] == 1
+                partials = {
+                    'f_x': np.einsum('qx,qx->q', A, d_x) * h_x,
+                    'f_xx': np.einsum('qx,qx->q', A, d2_x) * h_x**2,
+                    'f_s': np.einsum('qxs,qs,qx->q', G[0], d_s, w_x) * h_s,
+                    'f_a': np.where(above, f_m - f_d, f_d),
+                    'f_c': np.where(above, f_d, f_m - f_d),
+                }
+                for name, value in partials.items():
+                    out[name][block] = value
+
+        if np.any(flagged):
+            exact = self.exact(x[flagged], s[flagged], a[flagged], c[flagged], derivatives)
+            for name in names:
+                out[name][flagged] = exact[name]
+        return out
+
+    def quote(self, S, K, T, r, sigma, q=0.0):
+        """
+        Price of a single contract, for the per-tick quoting path: the weights are computed
+        from plain floats and contracted with one 4 x 4 x 4 x 4 slice of the coefficients.
+        The exact model outside the grid and in exact_cells.
+        """
+        point = (math.log(S / K), sigma * math.sqrt(T), r * T, q * T)
+        index = [1 if q > r else 0]
+        weights = []
+        for value, (low, high, n) in zip((point[0], point[1], min(r, q) * T, abs(r - q) * T), self.axes):
+            u = (value - low) / (high - low) * (n - 1)
+            if not 0 <= u <= n - 1:
+                return K * float(normalised_price(self.model, self.option_type, *point))
+            i = min(int(u), n - 2)
+            t = u - i
+            index.append(i)
+            weights += [(1 - t)**3 / 6, ((3 * t - 6) * t * t + 4) / 6, (((-3 * t + 3) * t + 3) * t + 1) / 6, t**3 / 6]
+        if self.exact_cells[tuple(index)]:
+            return K * float(normalised_price(self.model, self.option_type, *point))
+        p, i_x, i_s, i_m, i_d = index
+        block = self.coefficients[p, i_x:i_x + 4, i_s:i_s + 4, i_m:i_m + 4, i_d:i_d + 4]
+        w = np.array(weights).reshape(4, 4)
+        return K * float(((block @ w[3]) @ w[2]) @ w[1] @ w[0])
+
+    def price(self, S, K, T, r, sigma, q=0.0):
+        """
+        Option price(s) by table lookup. Scalar arguments take the quote() path; arrays are
+        interpolated in one batch, at about the throughput of the vectorized exact model.
+
+        Parameters:
+        S, K, T, r, sigma, q (float or array): Spot, strike, maturity, rate, volatility and
+                                              dividend yield, broadcast together
+
+        Returns:
+        float or numpy.ndarray: Interpolated price(s), exact outside the grid
+        """
+        if all(isinstance(v, (int, float, np.number)) for v in (S, K, T, r, sigma, q)):
+            return self.quote(S, K, T, r, sigma, q)
+        S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (S, K, T, r, sigma, q)))
+        f = self.evaluate(np.log(S / K), sigma * np.sqrt(T), r * T, q * T)['f']
+        price = K * f.reshape(S.shape)
+        return price
+
+    def greeks(self, S, K, T, r, sigma, q=0.0):
+        """
+        Price, delta, gamma, vega, theta and rho from the derivatives of the spline.
+
+        With P = K f(ln(S/K), sigma sqrt(T), rT, qT): delta = K f_x / S,
+        gamma = K (f_xx - f_x) / S^2, vega = K f_s sqrt(T), rho = K f_a T and
+        theta = -K (f_s sigma / (2 sqrt(T)) + f_a r + f_c q).
+
+        Returns:
+        dict: 'price', 'delta', 'gamma', 'vega', 'theta' and 'rho'
+        """
+        S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (S, K, T, r, sigma, q)))
+        shape = S.shape
+        d = self.evaluate(np.log(S / K), sigma * np.sqrt(T), r * T, q * T, derivatives=True)
+        S, K, T, r, sigma, q = (v.ravel() for v in (S, K, T, r, sigma, q))
+        greeks = {
+            'price': K * d['f'],
+            'delta': K * d['f_x'] / S,
+            'gamma': K * (d['f_xx'] - d['f_x']) / S**2,
+            'vega': K * d['f_s'] * np.sqrt(T),
+            'theta': -K * (d['f_s'] * sigma / (2 * np.sqrt(T)) + d['f_a'] * r + d['f_c'] * q),
+            'rho': K * d['f_a'] * T,
+        }
+        return {name: value.reshape(shape) if shape else float(value[0]) for name, value in greeks.items()}
+
+    def random_points(self, n_samples, seed=0):
+        """Uniform random (x, s, a, c) inside the grid, half of them on each patch."""
+        rng = np.random.default_rng(seed)
+        x, s, m, d = (rng.uniform(low, high, n_samples) for low, high, _ in self.axes)
+        above = rng.random(n_samples) < 0.5
+        return x, s, np.where(above, m, m + d), np.where(above, m + d, m)
+
+    def validate(self, n_samples=20000, seed=0):
+        """
+        Compare the normalised prices served by the surface with the exact model at random
+        points inside the grid.
+
+        Returns:
+        dict: 'max_error' and 'rms_error' of price / K, and 'exact_share', the fraction of
+              points served by the exact model
+        """
+        x, s, a, c = self.random_points(n_samples, seed)
+        errors = self.evaluate(x, s, a, c)['f'] - normalised_price(self.model, self.option_type, x, s, a, c)
+        return {'max_error': float(np.max(np.abs(errors))), 'rms_error': float(np.sqrt(np.mean(errors**2))),
+                'exact_share': float(np.mean(self.exact_cells[self.cell_index(x, s, a, c)]))}
+
+# Example usage
+S = 100  # Current stock price
+K = 100  # Strike price
+T = 1    # Time to maturity (1 year)
+r = 0.05 # Risk-free rate (5%)
+sigma = 0.2 # Volatility (20%)
+q = 0.02 # Dividend yield (2%)
+
+start = time.perf_counter()
+surface = PricingSurface.build('bjerksund-stensland', 'put')
+print(f"Built {surface.coefficients.shape} float32 surface ({surface.coefficients.nbytes / 1e6:.1f} MB) "
+      f"in {time.perf_counter() - start:.2f} seconds")
+errors = surface.validate(100000, seed=1)
+print(f"Error against the exact model per 100 of strike: max {errors['max_error'] * K:.2e}, "
+      f"rms {errors['rms_error'] * K:.2e}, tolerance {surface.tolerance * K:.2e}; "
+      f"{errors['exact_share']:.1%} of the points fall back to the exact model near the exercise boundary")
+
+# Save once, then memory-map from any process
+path = os.path.join(tempfile.mkdtemp(), 'american_put')
+surface.save(path)
+shared = PricingSurface.load(path)
+print(f"Interpolated American put: {shared.price(S, K, T, r, sigma, q)}, "
+      f"exact: {float(bjerksund_stensland_1993(S, K, T, r, sigma, r - q, 'put'))}")
+print("Greeks:", shared.greeks(S, K, T, r, sigma, q))
+
+# Per-tick scalar quotes
+start = time.perf_counter()
+for _ in range(10000):
+    shared.price(S, K, T, r, sigma, q)
+lookup_time = time.perf_counter() - start
+start = time.perf_counter()
+for _ in range(10000):
+    bjerksund_stensland_1993(S, K, T, r, sigma, r - q, 'put')
+exact_time = time.perf_counter() - start
+print(f"Scalar lookup: {lookup_time / 10000 * 1e6:.1f} us/quote, exact: {exact_time / 10000 * 1e6:.1f} us/quote")
+
+# Batched quotes: the spline only matches the vectorized exact model here, the gain is per tick
+rng = np.random.default_rng(1)
+n_quotes = 200000
+spots = S * np.exp(0.01 * rng.standard_normal(n_quotes))
+strikes = rng.choice(np.arange(80, 125, 5), n_quotes)
+start = time.perf_counter()
+interpolated = shared.price(spots, strikes, T, r, sigma, q)
+lookup_time = time.perf_counter() - start
+start = time.perf_counter()
+exact = bjerksund_stensland_1993(spots, strikes, T, r, sigma, r - q, 'put')
+exact_time = time.perf_counter() - start
+print(f"Lookup: {lookup_time / n_quotes * 1e6:.2f} us/quote, exact: {exact_time / n_quotes * 1e6:.2f} us/quote, "
+      f"max abs difference {np.max(np.abs(interpolated - exact)):.2e}")
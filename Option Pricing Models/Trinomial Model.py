@@ -1,64 +1,119 @@
+import time
+import tracemalloc
 import numpy as np
 
-def trinomial_tree_option_pricing(S, K, T, r, sigma, N, option_type='call'):
+def trinomial_tree_option_pricing(S, K, T, r, sigma, N, option_type='call', exercise='european', q=0.0,
+                                  barrier=None, barrier_type='up-and-out'):
     """
     Calculate the option price using the Trinomial Tree Model.
 
+    Terminal node prices are computed in closed form and a single array of node values
+    is rolled back in place, so memory is O(N) per contract instead of two dense
+    (2N+1) x (N+1) matrices. K, T and barrier may be arrays; each contract is one column
+    of the lattice and contracts with a common expiry share the same node prices.
+
     Parameters:
     S (float): Current stock price
-    K (float): Strike price
-    T (float): Time to maturity in years
+    K (float or array): Strike price(s)
+    T (float or array): Time(s) to maturity in years
     r (float): Risk-free interest rate
     sigma (float): Volatility of the stock
     N (int): Number of time steps
     option_type (str): Type of the option - 'call' or 'put'
+    exercise (str): Exercise style - 'european' or 'american'
+    q (float): Continuous dividend yield
+    barrier (float, array or None): Knock-out barrier level(s), monitored at every step
+    barrier_type (str): 'up-and-out' or 'down-and-out'
 
     Returns:
-    float: Option price
+    float or numpy.ndarray: Option price(s), shaped like np.broadcast(K, T, barrier)
     """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    if exercise not in ('european', 'american'):
+        raise ValueError("Invalid exercise style. Use 'european' or 'american'.")
+    if barrier_type not in ('up-and-out', 'down-and-out'):
+        raise ValueError("Invalid barrier type. Use 'up-and-out' or 'down-and-out'.")
+
+    K, T, B = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float),
+                                  np.asarray(np.nan if barrier is None else barrier, dtype=float))
+    shape = K.shape
+    K = K.reshape(1, -1)
+    B = B.reshape(1, -1)
+    # Contracts with a common expiry share one set of node prices
+    T = T.reshape(1, -1)[:, :1] if np.all(T == T.flat[0]) else T.reshape(1, -1)
+    sign = 1.0 if option_type == 'call' else -1.0
+    american = exercise == 'american'
+
     # Time step
     dt = T / N
-    # Up, down, and unchanged factors
+    # Up and down factors
     u = np.exp(sigma * np.sqrt(2 * dt))
-    d = 1 / u
-    m = 1
-
-    # Risk-neutral probabilities
-    pu = ((np.exp(r * dt / 2) - np.exp(-sigma * np.sqrt(dt / 2))) / 
-          (np.exp(sigma * np.sqrt(dt / 2)) - np.exp(-sigma * np.sqrt(dt / 2)))) ** 2
-    pd = ((np.exp(sigma * np.sqrt(dt / 2)) - np.exp(r * dt / 2)) / 
-          (np.exp(sigma * np.sqrt(dt / 2)) - np.exp(-sigma * np.sqrt(dt / 2)))) ** 2
+
+    # Risk-neutral probabilities, with the discount factor folded in
+    a = np.exp((r - q) * dt / 2)
+    up = np.exp(sigma * np.sqrt(dt / 2))
+    down = np.exp(-sigma * np.sqrt(dt / 2))
+    pu = ((a - down) / (up - down)) ** 2
+    pd = ((up - a) / (up - down)) ** 2
     pm = 1 - pu - pd
+    disc = np.exp(-r * dt)
+    pu, pm, pd = disc * pu, disc * pm, disc * pd
 
-    # Initialize asset prices at maturity
-    asset_prices = np.zeros((2 * N + 1, N + 1))
-    asset_prices[0, 0] = S
-
-    for j in range(1, N + 1):
-        for i in range(2 * j + 1):
-            if i < j:
-                asset_prices[i, j] = asset_prices[i, j - 1] * u
-            elif i == j:
-                asset_prices[i, j] = asset_prices[i, j - 1]
-            else:
-                asset_prices[i, j] = asset_prices[i - 1, j - 1] * d
-
-    # Initialize option values at maturity
-    option_values = np.zeros((2 * N + 1, N + 1))
-    for i in range(2 * N + 1):
-        if option_type == "call":
-            option_values[i, N] = max(asset_prices[i, N] - K, 0)
-        elif option_type == "put":
-            option_values[i, N] = max(K - asset_prices[i, N], 0)
-
-    # Backward induction for option pricing
+    # Node k of the final slice sits at S * u^(N - k); at step j the live nodes are N-j..N+j
+    asset_prices = S * u ** (N - np.arange(2 * N + 1).reshape(-1, 1))
+    if barrier_type == 'up-and-out':
+        knocked_out = asset_prices >= B
+    else:
+        knocked_out = asset_prices <= B
+
+    # Option values at maturity
+    option_values = np.maximum(sign * (asset_prices - K), 0)
+    option_values[knocked_out] = 0
+
+    # Backward induction on a single array
+    scratch_m = np.empty_like(option_values)
+    scratch_d = np.empty_like(option_values)
     for j in range(N - 1, -1, -1):
-        for i in range(2 * j + 1):
-            option_values[i, j] = (pu * option_values[i, j + 1] +
-                                   pm * option_values[i + 1, j + 1] +
-                                   pd * option_values[i + 2, j + 1]) * np.exp(-r * dt)
+        n = 2 * j + 1
+        np.multiply(option_values[1:n + 1], pm, out=scratch_m[:n])
+        np.multiply(option_values[2:n + 2], pd, out=scratch_d[:n])
+        values = option_values[:n]
+        values *= pu
+        values += scratch_m[:n]
+        values += scratch_d[:n]
+        nodes = slice(N - j, N + j + 1)
+        if american:
+            np.maximum(values, sign * (asset_prices[nodes] - K), out=values)
+        np.putmask(values, knocked_out[nodes], 0)
+
+    prices = option_values[0]
+    return prices.reshape(shape) if shape else float(prices[0])
+
+def benchmark_trinomial_tree(step_counts, n_contracts=1):
+    """
+    Measure time and peak memory of trinomial_tree_option_pricing across N.
+
+    Parameters:
+    step_counts (list of int): Numbers of time steps to benchmark
+    n_contracts (int): Number of strikes priced in each call
 
-    return option_values[0, 0]
+    Returns:
+    list of dict: For each N, seconds, peak traced memory and the memory the dense
+                  (2N+1) x (N+1) price and value matrices would need, in megabytes
+    """
+    strikes = np.linspace(80, 120, n_contracts)
+    results = []
+    for steps in step_counts:
+        tracemalloc.start()
+        start = time.perf_counter()
+        trinomial_tree_option_pricing(100, strikes, 1, 0.05, 0.2, steps, 'put', 'american')
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        dense = 2 * (2 * steps + 1) * (steps + 1) * 8 * n_contracts
+        results.append({'N': steps, 'seconds': elapsed, 'peak_mb': peak / 1e6, 'dense_mb': dense / 1e6})
+    return results
 
 # Example usage
 S = 100  # Current stock price
@@ -73,3 +128,18 @@ put_price = trinomial_tree_option_pricing(S, K, T, r, sigma, N, 'put')
 
 print(f"Call Option Price: {call_price}")
 print(f"Put Option Price: {put_price}")
+
+# Barrier and American variants
+up_and_out_call = trinomial_tree_option_pricing(S, K, T, r, sigma, N, 'call', barrier=130)
+american_put = trinomial_tree_option_pricing(S, K, T, r, sigma, N, 'put', 'american')
+print(f"Up-and-Out Call (B=130) Price: {up_and_out_call}")
+print(f"American Put Option Price: {american_put}")
+
+# Many contracts at once
+strikes = np.arange(80, 125, 5)
+print("American put chain: ", trinomial_tree_option_pricing(S, strikes, T, r, sigma, N, 'put', 'american'))
+
+# Memory and time across N
+for row in benchmark_trinomial_tree([100, 1000, 10000]):
+    print(f"N={row['N']:>6}: {row['seconds']:.3f} s, peak {row['peak_mb']:.2f} MB "
+          f"(dense matrices would need {row['dense_mb']:.1f} MB)")
@@ -1,39 +1,148 @@
+import time
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.special import ndtr
+
+def bridge_schedule(times):
+    """
+    Precompute the construction order of a Brownian bridge on any increasing time grid.
+
+    times[0] and times[-1] are the endpoints. Interval midpoints (by index) are filled
+    level by level, each conditioned on its already-known neighbours:
+    W(t_m) = w_l W(t_l) + w_r W(t_r) + std Z, with w_l = (t_r - t_m) / (t_r - t_l),
+    w_r = (t_m - t_l) / (t_r - t_l) and std^2 = (t_m - t_l)(t_r - t_m) / (t_r - t_l).
+
+    Parameters:
+        times (array): Increasing time points, including both endpoints.
+
+    Returns:
+        levels (list): One dict per level with arrays 'mid', 'left', 'right', 'w_left',
+                       'w_right', 'std' and 'column' (the normal used for each point).
+    """
+    t = np.asarray(times, dtype=float)
+    if t.ndim != 1 or t.size < 2 or np.any(np.diff(t) <= 0):
+        raise ValueError("Time points must be strictly increasing and include both endpoints.")
+    levels = []
+    intervals = [(0, t.size - 1)]
+    column = 1  # Column 0 drives the free endpoint
+    while intervals:
+        rows = []
+        next_intervals = []
+        for left, right in intervals:
+            if right - left > 1:
+                mid = (left + right) // 2
+                span = t[right] - t[left]
+                rows.append((mid, left, right, (t[right] - t[mid]) / span, (t[mid] - t[left]) / span,
+                             np.sqrt((t[mid] - t[left]) * (t[right] - t[mid]) / span), column))
+                column += 1
+                next_intervals += [(left, mid), (mid, right)]
+        if rows:
+            mid, left, right, w_left, w_right, std, columns = (np.array(x) for x in zip(*rows))
+            levels.append({'mid': mid, 'left': left, 'right': right, 'w_left': w_left,
+                           'w_right': w_right, 'std': std, 'column': columns})
+        intervals = next_intervals
+    return levels
+
+def sample_bridges(times, n_paths, start=0.0, end=None, drift=0.0, sigma=1.0, normals=None, seed=None,
+                   schedule=None, dtype=np.float64):
+    """
+    Sample paths of X(t) = start + drift (t - t_0) + sigma W(t - t_0) on the grid `times`,
+    filling a (paths x points) array one level of the bridge at a time.
+
+    Parameters:
+        times (array): Increasing time points, including both endpoints.
+        n_paths (int): The number of paths.
+        start (float or array): Value at times[0], per path if an array.
+        end (float, array or None): Value at times[-1] to condition on; None draws it freely.
+        drift (float): Drift of X, only used for a free endpoint.
+        sigma (float): Volatility of X.
+        normals (numpy.ndarray or None): (n_paths x len(times)-1) normals in construction
+                                         order (e.g. Sobol points), column 0 for the endpoint.
+        seed (int or None): Seed for the random number generator when normals is None.
+        schedule (list or None): Output of bridge_schedule(times), to reuse across calls.
+        dtype (numpy.dtype): dtype of the path array, float32 halves the memory.
+
+    Returns:
+        paths (numpy.ndarray): An (n_paths x len(times)) array of path values.
+    """
+    t = np.asarray(times, dtype=float)
+    levels = bridge_schedule(t) if schedule is None else schedule
+    # Fill time-major so every level works on contiguous rows, and return the transpose
+    if normals is None:
+        normals = np.random.default_rng(seed).standard_normal((t.size - 1, n_paths), dtype=dtype)
+    else:
+        normals = np.asarray(normals, dtype=dtype).T
+    values = np.empty((t.size, n_paths), dtype=dtype)
+    values[0] = start
+    if end is None:
+        horizon = t[-1] - t[0]
+        values[-1] = values[0] + drift * horizon + sigma * np.sqrt(horizon) * normals[0]
+    else:
+        values[-1] = end
+    for level in levels:
+        # Weights in the path dtype so float32 paths are never upcast
+        mid = normals[level['column']] * (sigma * level['std'][:, None]).astype(dtype)
+        mid += level['w_left'][:, None].astype(dtype) * values[level['left']]
+        mid += level['w_right'][:, None].astype(dtype) * values[level['right']]
+        values[level['mid']] = mid
+    return values.T
+
+def barrier_crossing_probability(paths, times, barrier, sigma, direction='down'):
+    """
+    Probability that each path crossed the barrier at any time, given its values at the
+    monitoring dates, using the Brownian-bridge crossing probability between dates:
+    p_i = exp(-2 (x_i - b)(x_{i+1} - b) / (sigma^2 dt_i)).
+
+    For GBM pass log prices and the log of the barrier.
+
+    Parameters:
+        paths (numpy.ndarray): (n_paths x len(times)) values of an arithmetic Brownian motion.
+        times (array): The monitoring times.
+        barrier (float): The barrier level, in the units of the paths.
+        sigma (float): Volatility of the paths.
+        direction (str): 'down' or 'up' barrier.
+
+    Returns:
+        probability (numpy.ndarray): The crossing probability of each path.
+    """
+    if direction not in ('down', 'up'):
+        raise ValueError("Invalid barrier direction. Use 'down' or 'up'.")
+    distance = paths - barrier if direction == 'down' else barrier - paths
+    dt = np.diff(np.asarray(times, dtype=float))
+    # A date on the wrong side of the barrier gives a non-negative exponent, i.e. p_i = 1
+    exponent = np.minimum(-2 * distance[:, :-1] * distance[:, 1:] / (sigma**2 * dt), 0)
+    # Survival is the product of the per-interval no-crossing probabilities
+    return 1 - np.prod(-np.expm1(exponent), axis=1)
+
+def down_and_out_call_price(S, K, H, T, r, sigma, q=0.0):
+    """Closed-form continuously monitored down-and-out call, for H <= K."""
+    lam = (r - q + 0.5 * sigma**2) / sigma**2
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+    call = S * np.exp(-q * T) * ndtr(d1) - K * np.exp(-r * T) * ndtr(d1 - sigma * np.sqrt(T))
+    y = np.log(H**2 / (S * K)) / (sigma * np.sqrt(T)) + lam * sigma * np.sqrt(T)
+    down_in = (S * np.exp(-q * T) * (H / S)**(2 * lam) * ndtr(y)
+               - K * np.exp(-r * T) * (H / S)**(2 * lam - 2) * ndtr(y - sigma * np.sqrt(T)))
+    return call - down_in
 
 def brownian_bridge(T, N):
     """
     Constructs a Brownian Bridge from 0 to T with N intermediate points.
-    
+
     Parameters:
         T (float): The final time of the Brownian Bridge.
         N (int): The number of intermediate points to generate.
-        
+
     Returns:
         times (numpy.ndarray): Array of time points.
         path (numpy.ndarray): The constructed Brownian Bridge path.
     """
-    # Initialize the time and path arrays
     times = np.linspace(0, T, N+2)  # Include start and end times
-    path = np.zeros(N+2)  # Start and end points are 0
-    
-    # Recursive function to fill in the path
-    def fill_path(start, end, level):
-        if end - start > 1:  # More than one point between start and end
-            mid = (start + end) // 2
-            var = (times[mid] - times[start]) * (times[end] - times[mid]) / (times[end] - times[start])
-            path[mid] = (path[start] + path[end]) / 2 + np.random.normal(0, np.sqrt(var))
-            fill_path(start, mid, level+1)
-            fill_path(mid, end, level+1)
-
-    # Start filling in the path
-    fill_path(0, N+1, 1)
-    
+    path = sample_bridges(times, 1, start=0.0, end=0.0)[0]  # Start and end points are 0
     return times, path
 
 # Parameters
 T = 1  # Total time
-N = 2**10 - 1  # Number of intermediate points (2^k - 1 for some integer k)
+N = 2**10 - 1  # Number of intermediate points (any N works)
 
 # Generate the Brownian Bridge
 times, path = brownian_bridge(T, N)
@@ -47,3 +156,30 @@ plt.ylabel("Value")
 plt.grid(True)
 plt.show()
 
+# Batched sampling on a 512-step grid, precomputing the schedule once
+grid = np.linspace(0, T, 513)
+schedule = bridge_schedule(grid)
+start = time.perf_counter()
+paths = sample_bridges(grid, 10**5, schedule=schedule, seed=0, dtype=np.float32)
+print(f"10^5 paths x 512 steps: {time.perf_counter() - start:.2f} seconds, "
+      f"Var W(T/2) = {paths[:, 256].var():.4f} (exact 0.5)")
+
+# Conditioning on per-path endpoints on a non-uniform grid
+uneven = np.sort(np.concatenate([[0, 1], np.random.default_rng(1).uniform(0, 1, 30)]))
+bridges = sample_bridges(uneven, 10**5, start=1.0, end=np.linspace(-1, 1, 10**5), seed=2)
+print(f"Endpoints kept: {np.allclose(bridges[:, -1], np.linspace(-1, 1, 10**5))}, "
+      f"mean at t={uneven[16]:.3f}: {bridges[:, 16].mean():.4f} (exact {1 - uneven[16]:.4f})")
+
+# Down-and-out call: discrete monitoring on 16 dates, with and without the crossing correction
+S = 100     # Initial stock price
+K = 100     # Strike price
+H = 90      # Barrier level
+r = 0.05    # Risk-free rate
+sigma = 0.2 # Volatility
+monitoring = np.linspace(0, T, 17)
+log_paths = sample_bridges(monitoring, 10**5, start=np.log(S), drift=r - 0.5 * sigma**2, sigma=sigma, seed=3)
+payoff = np.exp(-r * T) * np.maximum(np.exp(log_paths[:, -1]) - K, 0)
+discrete = payoff * np.all(log_paths > np.log(H), axis=1)
+corrected = payoff * (1 - barrier_crossing_probability(log_paths, monitoring, np.log(H), sigma))
+print(f"Down-and-out call: discrete {discrete.mean():.4f}, bridge-corrected {corrected.mean():.4f} "
+      f"+/- {corrected.std() / np.sqrt(corrected.size):.4f}, closed form {down_and_out_call_price(S, K, H, T, r, sigma):.4f}")
@@ -1,3 +1,4 @@
+import time
 import numpy as np
 import scipy.stats as stats
 
@@ -8,30 +9,98 @@ def black_scholes_call_price(S, K, T, r, sigma):
     call_price = S * stats.norm.cdf(d1) - K * np.exp(-r * T) * stats.norm.cdf(d2)
     return call_price
 
+def geometric_asian_call_price(S, K, r, fixing_times, sigma):
+    """Closed-form price of a discretely monitored geometric-average Asian call."""
+    t = np.asarray(fixing_times, dtype=float)
+    mean = np.log(S) + (r - 0.5 * sigma**2) * t.mean()
+    std = sigma * np.sqrt(np.minimum.outer(t, t).sum()) / t.size
+    d2 = (mean - np.log(K)) / std
+    return np.exp(-r * t[-1]) * (np.exp(mean + 0.5 * std**2) * stats.norm.cdf(d2 + std) - K * stats.norm.cdf(d2))
+
+def control_variate_estimator(simulate, control_means, n, chunk_size=100000, seed=None):
+    """
+    Estimate E[Y] with any number of controls X_1..X_k of known means, using the optimal
+    coefficient vector b = Cov(X)^-1 Cov(X, Y).
+
+    The sums of [1, Y, X] and of its outer products are accumulated chunk by chunk, so the
+    least-squares coefficients are found without keeping the payoffs in memory.
+
+    Parameters:
+        simulate (callable): simulate(rng, size) returning Y (size,) and X (size x k).
+        control_means (array): The known means of the k controls.
+        n (int): Number of simulated paths.
+        chunk_size (int): Number of paths simulated at a time.
+        seed (int or None): Seed for the random number generator.
+
+    Returns:
+        result (dict): 'estimate', 'std_error', 'coefficients', 'plain_estimate',
+                       'plain_std_error', 'r_squared' and 'vrf' (variance reduction factor).
+    """
+    rng = np.random.default_rng(seed)
+    control_means = np.atleast_1d(np.asarray(control_means, dtype=float))
+    k = control_means.size
+    moments = np.zeros((k + 2, k + 2))
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        Y, X = simulate(rng, size)
+        A = np.column_stack([np.ones(size), Y, np.asarray(X).reshape(size, k)])
+        moments += A.T @ A
+
+    # Centred (co)variances of Y and X from the streamed sums
+    means = moments[0, 1:] / n
+    covariance = (moments[1:, 1:] - n * np.outer(means, means)) / (n - 1)
+    var_Y, cov_XY, cov_X = covariance[0, 0], covariance[1:, 0], covariance[1:, 1:]
+    coefficients = np.linalg.lstsq(cov_X, cov_XY, rcond=None)[0]
+    estimate = means[0] - coefficients @ (means[1:] - control_means)
+    residual_variance = max(var_Y - coefficients @ cov_XY, 0.0) * (n - 1) / max(n - k - 1, 1)
+    return {'estimate': float(estimate), 'std_error': float(np.sqrt(residual_variance / n)),
+            'coefficients': coefficients, 'plain_estimate': float(means[0]),
+            'plain_std_error': float(np.sqrt(var_Y / n)),
+            'r_squared': float(1 - residual_variance / var_Y) if var_Y > 0 else 0.0,
+            'vrf': float(var_Y / residual_variance) if residual_variance > 0 else np.inf}
+
 def european_call_with_control_variates(S0, K, T, r, sigma, n, K_cv):
-    """Price a European call option using control variates."""
-    # Time parameters
-    dt = T
+    """Price a European call option using the call struck at K_cv and the stock as controls."""
     discount_factor = np.exp(-r * T)
 
-    # Simulate end-of-period prices
-    Z = np.random.normal(0, 1, n)
-    ST = S0 * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
+    def simulate(rng, size):
+        # Simulate end-of-period prices
+        ST = S0 * np.exp((r - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * rng.standard_normal(size))
+        controls = np.column_stack([np.maximum(ST - K_cv, 0), ST])
+        return discount_factor * np.maximum(ST - K, 0), discount_factor * controls
 
-    # Compute payoffs
-    payoff_option = np.maximum(ST - K, 0)
-    payoff_cv = np.maximum(ST - K_cv, 0)
+    # Theoretical prices of the controls
+    means = [black_scholes_call_price(S0, K_cv, T, r, sigma), S0]
+    return control_variate_estimator(simulate, means, n)['estimate']
 
-    # Theoretical price of the control variate option
-    cv_theoretical_price = black_scholes_call_price(S0, K_cv, T, r, sigma)
+def asian_call_with_control_variates(S0, K, T, r, sigma, n, time_steps=12, controls=('geometric', 'stock', 'european'),
+                                     chunk_size=100000, seed=None):
+    """
+    Price an arithmetic-average Asian call with any combination of the geometric Asian
+    call, the terminal stock price and the European call as controls.
 
-    # Adjust payoffs using the control variate
-    adjusted_payoff = payoff_option + cv_theoretical_price - payoff_cv
+    Returns:
+        result (dict): As control_variate_estimator.
+    """
+    t = np.linspace(T / time_steps, T, time_steps)
+    dt = T / time_steps
+    discount_factor = np.exp(-r * T)
+    known = {'geometric': geometric_asian_call_price(S0, K, r, t, sigma), 'stock': S0,
+             'european': black_scholes_call_price(S0, K, T, r, sigma)}
+    for name in controls:
+        if name not in known:
+            raise ValueError("Invalid control. Use 'geometric', 'stock' or 'european'.")
 
-    # Estimate the option price and reduce variance
-    option_price_estimate = discount_factor * np.mean(adjusted_payoff)
+    def simulate(rng, size):
+        log_S = np.log(S0) + np.cumsum((r - 0.5 * sigma**2) * dt
+                                       + sigma * np.sqrt(dt) * rng.standard_normal((size, time_steps)), axis=1)
+        S = np.exp(log_S)
+        values = {'geometric': np.maximum(np.exp(log_S.mean(axis=1)) - K, 0), 'stock': S[:, -1],
+                  'european': np.maximum(S[:, -1] - K, 0)}
+        X = np.column_stack([values[name] for name in controls]) if controls else np.empty((size, 0))
+        return discount_factor * np.maximum(S.mean(axis=1) - K, 0), discount_factor * X
 
-    return option_price_estimate
+    return control_variate_estimator(simulate, [known[name] for name in controls], n, chunk_size, seed)
 
 # Parameters
 S0 = 100  # Initial stock price
@@ -45,4 +114,13 @@ n = 10000  # Number of simulations
 # Price the option using control variates
 option_price = european_call_with_control_variates(S0, K, T, r, sigma, n, K_cv)
 print("Estimated European Call Option Price with Control Variates:", option_price)
+print("Black-Scholes price:", black_scholes_call_price(S0, K, T, r, sigma))
 
+# Asian call with growing sets of controls, streamed over 10^6 paths
+for controls in ((), ('stock',), ('european',), ('geometric',), ('geometric', 'stock', 'european')):
+    start = time.perf_counter()
+    result = asian_call_with_control_variates(S0, K, T, r, sigma, 10**6, controls=controls, seed=0)
+    print(f"Asian call, controls {', '.join(controls) or 'none':>26}: {result['estimate']:.5f} "
+          f"+/- {result['std_error']:.5f}, VRF {result['vrf']:8.1f}, "
+          f"b = {np.round(result['coefficients'], 3).tolist()}, "
+          f"{time.perf_counter() - start:.2f} seconds")
@@ -1,7 +1,112 @@
+import time
 import numpy as np
 import scipy.stats as stats
 
-def importance_sampling(mu, sigma, alpha, n, mu_prime):
+def log_likelihood_ratio(X, shift, scale=None):
+    """
+    Closed-form log of dN(0, I)/dN(shift, diag(scale^2)) at the rows of X.
+
+    Parameters:
+        X (numpy.ndarray): (n x dim) samples from the proposal.
+        shift (numpy.ndarray): Mean of the proposal.
+        scale (numpy.ndarray or None): Standard deviations of the proposal (1 if None).
+
+    Returns:
+        log_weights (numpy.ndarray): The log likelihood ratio of every row.
+    """
+    if scale is None:
+        # -x.x/2 + (x - m).(x - m)/2 = -x.m + m.m/2
+        return -X @ shift + 0.5 * shift @ shift
+    Y = (X - shift) / scale
+    return np.sum(np.log(scale)) + 0.5 * np.einsum('ij,ij->i', Y, Y) - 0.5 * np.einsum('ij,ij->i', X, X)
+
+def cross_entropy_tuning(score, dim, level, payoff=None, tune_scale=False, pilot_size=2000, rho=0.1, max_iter=50,
+                         seed=None):
+    """
+    Tune the proposal N(shift, diag(scale^2)) for E[payoff(Z) 1{score(Z) >= level}], Z ~ N(0, I),
+    by cross-entropy iterations on small pilot batches.
+
+    Each iteration samples a pilot batch from the current proposal and raises an
+    intermediate level to the (1 - rho) quantile of the scores (capped at `level`). The new
+    shift (and scale) are the likelihood-ratio-weighted mean (and standard deviation) of
+    the elite samples above that level. Once `level` itself is reached the elite samples
+    are also weighted by the payoff, which targets the zero-variance density.
+
+    Parameters:
+        score (callable): Maps an (n x dim) array of normals to a performance value per row.
+        dim (int): The number of normal drivers.
+        level (float): The rare-event threshold on the score.
+        payoff (callable or None): Non-negative payoff of the normals; None for the probability.
+        tune_scale (bool): Also tune the standard deviation of every driver.
+        pilot_size (int): Samples per pilot batch.
+        rho (float): Elite fraction per iteration.
+        max_iter (int): Maximum number of iterations.
+        seed (int or None): Seed for the random number generator.
+
+    Returns:
+        shift (numpy.ndarray), scale (numpy.ndarray or None), iterations (int)
+    """
+    rng = np.random.default_rng(seed)
+    shift = np.zeros(dim)
+    scale = np.ones(dim) if tune_scale else None
+    reached = False
+    for iteration in range(1, max_iter + 1):
+        X = shift + (1.0 if scale is None else scale) * rng.standard_normal((pilot_size, dim))
+        s = score(X)
+        gamma = min(np.quantile(s, 1 - rho), level)
+        elite = s >= gamma
+        weights = np.exp(log_likelihood_ratio(X[elite], shift, scale))
+        if gamma >= level and payoff is not None:
+            weights *= payoff(X[elite])
+        if weights.sum() <= 0:
+            break
+        weights /= weights.sum()
+        shift = weights @ X[elite]
+        if tune_scale:
+            scale = np.sqrt(np.maximum(weights @ (X[elite] - shift)**2, 1e-4))
+        # One update at the target level gives the final proposal
+        if reached:
+            break
+        reached = gamma >= level
+    return shift, scale, iteration
+
+def adaptive_importance_sampling(score, dim, level, n, payoff=None, tune_scale=False, pilot_size=2000, rho=0.1,
+                                 chunk_size=100000, seed=None):
+    """
+    Estimate E[payoff(Z) 1{score(Z) >= level}] (a probability if payoff is None) with
+    Z ~ N(0, I_dim), sampling from a cross-entropy tuned normal proposal.
+
+    Parameters:
+        score, dim, level, payoff, tune_scale, pilot_size, rho: As in cross_entropy_tuning.
+        n (int): Number of samples of the final estimate.
+        chunk_size (int): Number of samples drawn at a time.
+        seed (int or None): Seed for the random number generator.
+
+    Returns:
+        result (dict): 'estimate', 'std_error', 'relative_error', 'shift', 'scale',
+                       'iterations' and 'pilot_samples' spent on the tuning.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(2)
+    shift, scale, iterations = cross_entropy_tuning(score, dim, level, payoff, tune_scale, pilot_size, rho,
+                                                    seed=seeds[0])
+    rng = np.random.default_rng(seeds[1])
+    total = 0.0
+    squares = 0.0
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        X = shift + (1.0 if scale is None else scale) * rng.standard_normal((size, dim))
+        values = np.where(score(X) >= level, np.exp(log_likelihood_ratio(X, shift, scale)), 0.0)
+        if payoff is not None:
+            values *= payoff(X)
+        total += values.sum()
+        squares += np.dot(values, values)
+    estimate = total / n
+    std_error = np.sqrt(max(squares / n - estimate**2, 0.0) / (n - 1))
+    return {'estimate': estimate, 'std_error': std_error,
+            'relative_error': std_error / estimate if estimate > 0 else np.inf,
+            'shift': shift, 'scale': scale, 'iterations': iterations, 'pilot_samples': iterations * pilot_size}
+
+def importance_sampling(mu, sigma, alpha, n, mu_prime=None):
     """
     Estimate the probability of a rare event using importance sampling.
 
@@ -10,16 +115,21 @@ def importance_sampling(mu, sigma, alpha, n, mu_prime):
         sigma (float): Standard deviation of the original distribution.
         alpha (float): Loss threshold.
         n (int): Number of samples.
-        mu_prime (float): Mean of the alternative distribution.
+        mu_prime (float or None): Mean of the alternative distribution, tuned by
+                                  cross-entropy if None.
 
     Returns:
         probability_estimate (float): Estimated probability of the rare event.
     """
+    if mu_prime is None:
+        shift, _, _ = cross_entropy_tuning(lambda Z: -(mu + sigma * Z[:, 0]), 1, alpha)
+        mu_prime = mu + sigma * shift[0]
+
     # Generate samples from the alternative distribution Q
     samples = np.random.normal(mu_prime, sigma, n)
 
-    # Compute the weights of the samples
-    weights = stats.norm.pdf(samples, mu, sigma) / stats.norm.pdf(samples, mu_prime, sigma)
+    # Compute the weights of the samples in closed form
+    weights = np.exp(((samples - mu_prime)**2 - (samples - mu)**2) / (2 * sigma**2))
 
     # Indicator function for the rare event
     indicator = samples < -alpha
@@ -39,4 +149,43 @@ mu_prime = -1.5  # Mean of the alternative distribution
 # Estimate the probability of the rare event
 probability_estimate = importance_sampling(mu, sigma, alpha, n, mu_prime)
 print("Estimated Probability of the Rare Event:", probability_estimate)
+print("With a cross-entropy tuned mean:", importance_sampling(mu, sigma, alpha, n),
+      "exact:", stats.norm.cdf(-alpha, mu, sigma))
+
+# 1-in-10,000 portfolio loss: 10 correlated assets, loss above the 99.99% quantile
+rng = np.random.default_rng(0)
+dim = 10
+vols = rng.uniform(0.15, 0.4, dim) * np.sqrt(10 / 252)  # 10-day volatilities
+correlation = np.full((dim, dim), 0.3) + 0.7 * np.eye(dim)
+L = np.linalg.cholesky(correlation)
+positions = np.full(dim, 1e6)
+loss = lambda Z: -(np.exp(vols * (Z @ L.T) - 0.5 * vols**2) - 1) @ positions
+level = np.quantile(loss(rng.standard_normal((10**6, dim))), 1 - 1e-4)
+
+n_plain = 10**6
+start = time.perf_counter()
+exceed = loss(rng.standard_normal((n_plain, dim))) >= level
+p = exceed.mean()
+print(f"Plain MC, {n_plain} samples: P(loss >= {level:,.0f}) = {p:.3e}, relative error "
+      f"{np.sqrt(p * (1 - p) / n_plain) / p:.3f}, {time.perf_counter() - start:.2f} seconds")
+for tune_scale in (False, True):
+    start = time.perf_counter()
+    result = adaptive_importance_sampling(loss, dim, level, n_plain // 100, tune_scale=tune_scale, seed=1)
+    print(f"Cross-entropy IS (scale tuned: {tune_scale}), {n_plain // 100} + {result['pilot_samples']} pilot samples: "
+          f"{result['estimate']:.3e}, relative error {result['relative_error']:.3f}, "
+          f"{time.perf_counter() - start:.2f} seconds")
 
+# Deep out-of-the-money call: the payoff is positive only above log(K/S)
+S = 100     # Initial stock price
+K = 200     # Strike price
+T = 1       # Time to expiration in years
+r = 0.05    # Risk-free rate
+vol = 0.2   # Volatility
+terminal = lambda Z: S * np.exp((r - 0.5 * vol**2) * T + vol * np.sqrt(T) * Z[:, 0])
+call = lambda Z: np.exp(-r * T) * np.maximum(terminal(Z) - K, 0)
+d1 = (np.log(S / K) + (r + 0.5 * vol**2) * T) / (vol * np.sqrt(T))
+exact = S * stats.norm.cdf(d1) - K * np.exp(-r * T) * stats.norm.cdf(d1 - vol * np.sqrt(T))
+values = call(rng.standard_normal((10**5, 1)))
+result = adaptive_importance_sampling(terminal, 1, K, 10**5, payoff=call, seed=2)
+print(f"Deep OTM call: exact {exact:.6f}, plain {values.mean():.6f} +/- {values.std() / np.sqrt(values.size):.6f}, "
+      f"IS {result['estimate']:.6f} +/- {result['std_error']:.6f} (shift {result['shift'][0]:.2f})")
@@ -1,34 +1,27 @@
+import time
 import numpy as np
+from scipy.special import ndtr, ndtri
 
 def estimate_pi_stratified(num_strata_per_side, num_samples_per_stratum):
     """
     Estimate the value of Pi using stratified sampling.
-    
+
     Parameters:
         num_strata_per_side (int): The number of strata along one side of the unit square.
         num_samples_per_stratum (int): The number of samples to draw from each stratum.
-    
+
     Returns:
         pi_estimate (float): The estimated value of Pi.
     """
-    total_inside = 0
-    stratum_side_length = 1 / num_strata_per_side
-
-    # Loop over each stratum
-    for i in range(num_strata_per_side):
-        for j in range(num_strata_per_side):
-            # Determine the (x, y) coordinates of the lower-left corner of the stratum
-            x_min, y_min = i * stratum_side_length, j * stratum_side_length
-
-            # Generate random points within this stratum
-            x_rand = x_min + np.random.rand(num_samples_per_stratum) * stratum_side_length
-            y_rand = y_min + np.random.rand(num_samples_per_stratum) * stratum_side_length
+    # Lower-left corners of every stratum, repeated once per sample
+    cells = np.repeat(np.arange(num_strata_per_side**2), num_samples_per_stratum)
+    corners = np.stack(np.divmod(cells, num_strata_per_side), axis=1)
 
-            # Check if the points are inside the quarter circle
-            inside = x_rand**2 + y_rand**2 <= 1
+    # Generate random points within all strata at once
+    points = (corners + np.random.rand(cells.size, 2)) / num_strata_per_side
 
-            # Count how many points fell inside the quarter circle
-            total_inside += np.sum(inside)
+    # Count how many points fell inside the quarter circle
+    total_inside = np.sum(points[:, 0]**2 + points[:, 1]**2 <= 1)
 
     # Calculate the estimate of Pi
     total_samples = num_strata_per_side**2 * num_samples_per_stratum
@@ -36,6 +29,190 @@ def estimate_pi_stratified(num_strata_per_side, num_samples_per_stratum):
 
     return pi_estimate
 
+def allocate(n, probabilities, stds=None, minimum=2):
+    """
+    Split n samples across strata: proportional to p_h, or Neyman (p_h sigma_h) when
+    stratum standard deviations are given. Rounded by largest remainder, with at least
+    `minimum` samples per stratum so every stratum variance can be estimated.
+
+    Parameters:
+        n (int): The total number of samples.
+        probabilities (numpy.ndarray): Stratum probabilities p_h.
+        stds (numpy.ndarray or None): Stratum standard deviations for Neyman allocation.
+        minimum (int): Minimum samples per stratum.
+
+    Returns:
+        counts (numpy.ndarray): Samples per stratum, summing to max(n, minimum * strata).
+    """
+    weights = probabilities if stds is None else probabilities * stds
+    if not np.any(weights > 0):
+        weights = probabilities
+    spare = max(n - minimum * weights.size, 0)
+    target = spare * weights / weights.sum()
+    counts = np.floor(target).astype(int)
+    remainder = spare - counts.sum()
+    counts[np.argsort(counts - target)[:remainder]] += 1
+    return counts + minimum
+
+def stratified_uniforms(counts, strata_per_dim, dim, rng):
+    """
+    Uniforms on the equal-probability grid of strata_per_dim^dim cells, counts[h] in
+    cell h, generated for all strata in one array operation.
+
+    Returns:
+        U (numpy.ndarray): A (sum(counts) x dim) array of uniforms.
+        labels (numpy.ndarray): The stratum of every row.
+    """
+    labels = np.repeat(np.arange(counts.size), counts)
+    cells = np.stack(np.unravel_index(labels, (strata_per_dim,) * dim), axis=1)
+    U = (cells + rng.random((labels.size, dim))) / strata_per_dim
+    return U, labels
+
+def latin_hypercube(n, dim, rng):
+    """Latin hypercube sample: every dimension has exactly one point in each of n equal bins."""
+    bins = rng.random((dim, n)).argsort(axis=1).T
+    return (bins + rng.random((n, dim))) / n
+
+def stratified_statistics(values, labels, probabilities):
+    """
+    Stratified estimate sum_h p_h mean_h, its variance sum_h p_h^2 s_h^2 / n_h, and the
+    variance plain Monte Carlo would have with the same budget (for the reduction factor).
+
+    Returns:
+        estimate (float), variance (float), plain_variance (float), stds (numpy.ndarray)
+    """
+    H = probabilities.size
+    counts = np.bincount(labels, minlength=H)
+    means = np.bincount(labels, values, minlength=H) / counts
+    squares = np.bincount(labels, values**2, minlength=H) / counts
+    variances = np.maximum(squares - means**2, 0) * counts / np.maximum(counts - 1, 1)
+    estimate = probabilities @ means
+    variance = np.sum(probabilities**2 * variances / counts)
+    plain_variance = (probabilities @ (variances + (means - estimate)**2)) / counts.sum()
+    return estimate, variance, plain_variance, np.sqrt(variances)
+
+def stratified_monte_carlo(payoff, dim, n, strata=100, stratified_dims=1, directions=None, allocation='proportional',
+                           pilot_fraction=0.1, replications=10, variables='normal', seed=None):
+    """
+    Estimate E[payoff(X)] with X a vector of iid standard normals (or uniforms), stratifying
+    the projections of X on one or several directions.
+
+    allocation='proportional' draws n p_h samples in each of the strata^stratified_dims
+    equal-probability cells. allocation='neyman' first spends pilot_fraction of the budget
+    proportionally, estimates the stratum standard deviations, and allocates the rest in
+    proportion to p_h sigma_h, estimating from the main samples only. allocation='lhs' uses
+    Latin hypercube sampling in all dimensions, with the error estimated from
+    independent replications.
+
+    Parameters:
+        payoff (callable): Maps an (n x dim) array of variables to (discounted) payoffs.
+        dim (int): The number of driving variables.
+        n (int): The total number of payoff evaluations.
+        strata (int): Strata per stratified dimension.
+        stratified_dims (int): Number of stratified directions.
+        directions (numpy.ndarray or None): (stratified_dims x dim) directions to stratify,
+                                            orthonormalised; the first coordinates by default.
+        allocation (str): 'proportional', 'neyman' or 'lhs'.
+        pilot_fraction (float): Share of the budget used by the Neyman pilot run.
+        replications (int): Independent Latin hypercubes for the LHS error estimate.
+        variables (str): 'normal' or 'uniform' driving variables.
+        seed (int or None): Seed for the random number generator.
+
+    Returns:
+        result (dict): 'estimate', 'std_error', 'variance', 'vrf' (variance reduction
+                       against plain Monte Carlo) and 'counts' (samples per stratum).
+    """
+    if allocation not in ('proportional', 'neyman', 'lhs'):
+        raise ValueError("Invalid allocation. Use 'proportional', 'neyman' or 'lhs'.")
+    if variables not in ('normal', 'uniform'):
+        raise ValueError("Invalid variables. Use 'normal' or 'uniform'.")
+    rng = np.random.default_rng(seed)
+    to_variables = (lambda U: ndtri(np.clip(U, 1e-16, 1 - 1e-16))) if variables == 'normal' else (lambda U: U)
+
+    if allocation == 'lhs':
+        size = n // replications
+        means = np.array([np.mean(payoff(to_variables(latin_hypercube(size, dim, rng)))) for _ in range(replications)])
+        plain = np.var(payoff(to_variables(rng.random((size, dim)))), ddof=1) / (size * replications)
+        variance = means.var(ddof=1) / replications
+        return {'estimate': means.mean(), 'std_error': np.sqrt(variance), 'variance': variance,
+                'vrf': plain / variance, 'counts': np.full(replications, size)}
+
+    # Orthonormal stratification directions (rows of V)
+    if directions is None:
+        V = np.eye(dim)[:stratified_dims]
+    else:
+        V = np.linalg.qr(np.atleast_2d(np.asarray(directions, dtype=float)).T)[0].T
+    if variables == 'uniform' and directions is not None:
+        raise ValueError("Uniform variables can only be stratified along their coordinates.")
+    H = strata**stratified_dims
+    probabilities = np.full(H, 1.0 / H)
+
+    def sample(counts):
+        # Replace the projections of iid draws on V by their stratified values
+        U, labels = stratified_uniforms(counts, strata, stratified_dims, rng)
+        if variables == 'uniform':
+            X = rng.random((labels.size, dim))
+            X[:, :stratified_dims] = U
+        else:
+            X = rng.standard_normal((labels.size, dim))
+            X += (ndtri(U) - X @ V.T) @ V
+        return payoff(X), labels
+
+    if allocation == 'neyman':
+        pilot_values, pilot_labels = sample(allocate(int(pilot_fraction * n), probabilities))
+        stds = stratified_statistics(pilot_values, pilot_labels, probabilities)[3]
+        # The pilot only sets the allocation: pooling it would bias strata it under-sampled
+        values, labels = sample(allocate(n - pilot_labels.size, probabilities, stds))
+    else:
+        values, labels = sample(allocate(n, probabilities))
+
+    estimate, variance, plain_variance, _ = stratified_statistics(values, labels, probabilities)
+    return {'estimate': estimate, 'std_error': np.sqrt(variance), 'variance': variance,
+            'vrf': plain_variance / variance, 'counts': np.bincount(labels, minlength=H)}
+
+def european_option_stratified(S, K, T, r, sigma, n, option_type='call', q=0.0, strata=100,
+                               allocation='neyman', seed=None):
+    """
+    Price a European option by Monte Carlo with the terminal normal stratified.
+
+    Returns:
+        result (dict): As stratified_monte_carlo, with 'estimate' the option price.
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    sign = 1.0 if option_type == 'call' else -1.0
+    discount = np.exp(-r * T)
+
+    def payoff(Z):
+        ST = S * np.exp((r - q - 0.5 * sigma**2) * T + sigma * np.sqrt(T) * Z[:, 0])
+        return discount * np.maximum(sign * (ST - K), 0)
+
+    return stratified_monte_carlo(payoff, 1, n, strata, 1, allocation=allocation, seed=seed)
+
+def asian_option_stratified(S, K, T, r, sigma, n, time_steps=12, option_type='call', q=0.0, strata=32,
+                            stratified_dims=1, allocation='neyman', seed=None):
+    """
+    Price an arithmetic-average Asian option by Monte Carlo, stratifying the Brownian
+    increments along the direction that drives the average (and, with stratified_dims=2,
+    the terminal value).
+
+    Returns:
+        result (dict): As stratified_monte_carlo, with 'estimate' the option price.
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError("Invalid option type. Use 'call' or 'put'.")
+    sign = 1.0 if option_type == 'call' else -1.0
+    dt = T / time_steps
+    discount = np.exp(-r * T)
+    # Increment i enters time_steps - i of the averaged log prices, and every terminal one
+    directions = np.stack([np.arange(time_steps, 0, -1), np.ones(time_steps)])[:stratified_dims]
+
+    def payoff(Z):
+        log_paths = np.cumsum((r - q - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z, axis=1)
+        return discount * np.maximum(sign * (S * np.exp(log_paths).mean(axis=1) - K), 0)
+
+    return stratified_monte_carlo(payoff, time_steps, n, strata, stratified_dims, directions, allocation, seed=seed)
+
 # Parameters
 num_strata_per_side = 10  # 10 strata along each side of the unit square
 num_samples_per_stratum = 100  # 100 samples per stratum
@@ -43,3 +220,25 @@ num_samples_per_stratum = 100  # 100 samples per stratum
 # Estimate Pi
 pi_estimate = estimate_pi_stratified(num_strata_per_side, num_samples_per_stratum)
 print(f"Estimated value of Pi using stratified sampling: {pi_estimate}")
+
+# European and Asian calls under every allocation
+S = 100     # Initial stock price
+K = 100     # Strike price
+T = 1       # Time to expiration in years
+r = 0.05    # Risk-free rate
+sigma = 0.2 # Volatility
+n = 100000  # Payoff evaluations
+
+d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+print(f"Black-Scholes reference: {S * ndtr(d1) - K * np.exp(-r * T) * ndtr(d1 - sigma * np.sqrt(T)):.5f}")
+for allocation in ('proportional', 'neyman', 'lhs'):
+    result = european_option_stratified(S, K, T, r, sigma, n, allocation=allocation, seed=0)
+    print(f"European call, {allocation:>12}: {result['estimate']:.5f} +/- {result['std_error']:.5f}, "
+          f"VRF {result['vrf']:.0f}")
+
+for allocation, strata, dims in (('proportional', 32, 1), ('neyman', 32, 1), ('neyman', 10, 2), ('lhs', 32, 1)):
+    start = time.perf_counter()
+    result = asian_option_stratified(S, K, T, r, sigma, n, strata=strata, stratified_dims=dims, allocation=allocation,
+                                     seed=0)
+    print(f"Asian call, {allocation:>12}, {dims}-D: {result['estimate']:.5f} +/- {result['std_error']:.5f}, "
+          f"VRF {result['vrf']:.0f} in {time.perf_counter() - start:.2f} seconds")
@@ -1,4 +1,6 @@
+import time
 from scipy.stats.qmc import Sobol
+from scipy.special import ndtri
 import numpy as np
 
 def estimate_pi_quasi_random(num_samples):
@@ -31,6 +33,153 @@ def estimate_pi_quasi_random(num_samples):
 
     return pi_estimate
 
+def sobol_normals(n, dim, seed=None):
+    """
+    Scrambled Sobol points mapped to standard normals by the inverse normal cdf.
+
+    Parameters:
+        n (int): The number of points (a power of 2 keeps the balance properties).
+        dim (int): The dimension of each point.
+        seed (int, Generator or None): Seed of the Owen scrambling.
+
+    Returns:
+        normals (numpy.ndarray): An (n x dim) array of normals.
+    """
+    points = Sobol(d=dim, scramble=True, seed=seed).random(n)
+    return ndtri(np.clip(points, 1e-16, 1 - 1e-16))
+
+def bridge_schedule(times):
+    """
+    Precompute the construction order of a Brownian bridge on any increasing time grid.
+
+    times[0] and times[-1] are the endpoints. Interval midpoints (by index) are filled
+    level by level, each conditioned on its already-known neighbours:
+    W(t_m) = w_l W(t_l) + w_r W(t_r) + std Z, with w_l = (t_r - t_m) / (t_r - t_l),
+    w_r = (t_m - t_l) / (t_r - t_l) and std^2 = (t_m - t_l)(t_r - t_m) / (t_r - t_l).
+
+    Parameters:
+        times (array): Increasing time points, including both endpoints.
+
+    Returns:
+        levels (list): One dict per level with arrays 'mid', 'left', 'right', 'w_left',
+                       'w_right', 'std' and 'column' (the normal used for each point).
+    """
+    t = np.asarray(times, dtype=float)
+    if t.ndim != 1 or t.size < 2 or np.any(np.diff(t) <= 0):
+        raise ValueError("Time points must be strictly increasing and include both endpoints.")
+    levels = []
+    intervals = [(0, t.size - 1)]
+    column = 1  # Column 0 drives the free endpoint
+    while intervals:
+        rows = []
+        next_intervals = []
+        for left, right in intervals:
+            if right - left > 1:
+                mid = (left + right) // 2
+                span = t[right] - t[left]
+                rows.append((mid, left, right, (t[right] - t[mid]) / span, (t[mid] - t[left]) / span,
+                             np.sqrt((t[mid] - t[left]) * (t[right] - t[mid]) / span), column))
+                column += 1
+                next_intervals += [(left, mid), (mid, right)]
+        if rows:
+            mid, left, right, w_left, w_right, std, columns = (np.array(x) for x in zip(*rows))
+            levels.append({'mid': mid, 'left': left, 'right': right, 'w_left': w_left,
+                           'w_right': w_right, 'std': std, 'column': columns})
+        intervals = next_intervals
+    return levels
+
+def brownian_bridge_paths(Z, times, levels=None):
+    """
+    Build Brownian motion values from an (n x m) array of normals, one vectorized
+    assignment per level of the bridge.
+
+    The terminal value is drawn first from the first normal, then the midpoints follow
+    the bridge_schedule order, so the first (best distributed) Sobol coordinates drive
+    the coarse shape of the path.
+
+    Parameters:
+        Z (numpy.ndarray): (n x m) normals in construction order.
+        times (array): Increasing positive time points, not necessarily uniform.
+        levels (list or None): Output of bridge_schedule on [0, times], to reuse across calls.
+
+    Returns:
+        W (numpy.ndarray): An (n x m) array of W(t_1), ..., W(t_m).
+    """
+    t = np.concatenate([[0.0], np.asarray(times, dtype=float)])
+    levels = bridge_schedule(t) if levels is None else levels
+    W = np.zeros((Z.shape[0], t.size))
+    W[:, -1] = np.sqrt(t[-1]) * Z[:, 0]
+    for level in levels:
+        W[:, level['mid']] = (level['w_left'] * W[:, level['left']] + level['w_right'] * W[:, level['right']]
+                              + level['std'] * Z[:, level['column']])
+    return W[:, 1:]
+
+def gbm_paths(S, T, r, sigma, n, time_steps, q=0.0, sampler='sobol', seed=None):
+    """
+    GBM paths on an equally spaced grid, in the (n x time_steps+1) layout of the payoff
+    objects in Monte Carlo.py, driven by Brownian-bridge-ordered Sobol or pseudo-random normals.
+    """
+    times = np.linspace(T / time_steps, T, time_steps)
+    if sampler == 'sobol':
+        Z = sobol_normals(n, time_steps, seed)
+    else:
+        Z = np.random.default_rng(seed).standard_normal((n, time_steps))
+    W = brownian_bridge_paths(Z, times)
+    paths = np.empty((n, time_steps + 1))
+    paths[:, 0] = S
+    paths[:, 1:] = S * np.exp((r - q - 0.5 * sigma**2) * times + sigma * W)
+    return paths
+
+def heston_paths(S0, T, r, V0, kappa, theta, xi, rho, n, time_steps, q=0.0, sampler='sobol', seed=None):
+    """
+    Heston paths with Euler full truncation, in the (n x time_steps+1) layout.
+
+    Both Brownian motions are built by the Brownian bridge, with their construction
+    coordinates interleaved so the leading Sobol dimensions drive the coarse shape of
+    both the price and the variance.
+    """
+    times = np.linspace(T / time_steps, T, time_steps)
+    if sampler == 'sobol':
+        Z = sobol_normals(n, 2 * time_steps, seed)
+    else:
+        Z = np.random.default_rng(seed).standard_normal((n, 2 * time_steps))
+    levels = bridge_schedule(np.concatenate([[0.0], times]))
+    dW1 = np.diff(brownian_bridge_paths(Z[:, 0::2], times, levels), axis=1, prepend=0.0)
+    dW2 = np.diff(brownian_bridge_paths(Z[:, 1::2], times, levels), axis=1, prepend=0.0)
+    dW2 = rho * dW1 + np.sqrt(1 - rho**2) * dW2
+
+    dt = T / time_steps
+    log_S = np.full(n, np.log(S0))
+    v = np.full(n, float(V0))
+    paths = np.empty((n, time_steps + 1))
+    paths[:, 0] = S0
+    for i in range(time_steps):
+        v_pos = np.maximum(v, 0)
+        log_S += (r - q - 0.5 * v_pos) * dt + np.sqrt(v_pos) * dW1[:, i]
+        v += kappa * (theta - v_pos) * dt + xi * np.sqrt(v_pos) * dW2[:, i]
+        paths[:, i + 1] = np.exp(log_S)
+    return paths
+
+def rqmc_price(generate, payoff, n, replications=16, discount=1.0, seed=0):
+    """
+    Randomised QMC estimate with an error bar from independent scramblings.
+
+    Parameters:
+        generate (callable): generate(n, rng) returning an (n x steps+1) path array,
+                             e.g. a lambda around gbm_paths or heston_paths.
+        payoff (callable): Maps the path array to payoffs (e.g. a Monte Carlo.py payoff object).
+        n (int): Points per replication (a power of 2).
+        replications (int): Number of independently scrambled replications.
+        discount (float): Discount factor applied to the payoffs.
+        seed (int): Root seed for the scramblings.
+
+    Returns:
+        result (dict): 'price' and 'std_error' across the replication means.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    means = np.array([discount * np.mean(payoff(generate(n, np.random.default_rng(s)))) for s in seeds])
+    return {'price': means.mean(), 'std_error': means.std(ddof=1) / np.sqrt(replications)}
+
 # Number of samples
 num_samples = 10000
 
@@ -38,3 +187,26 @@ num_samples = 10000
 pi_estimate = estimate_pi_quasi_random(num_samples)
 print(f"Estimated value of Pi using quasi-random sampling: {pi_estimate}")
 
+# Arithmetic Asian call on 64 daily fixings: Sobol + Brownian bridge against pseudo-random paths
+S = 100     # Initial stock price
+K = 100     # Strike price
+T = 0.25    # Time to maturity in years
+r = 0.05    # Risk-free rate
+sigma = 0.2 # Volatility
+steps = 64  # Fixings
+asian_call = lambda paths: np.maximum(paths[:, 1:].mean(axis=1) - K, 0)
+discount = np.exp(-r * T)
+
+for sampler in ('pseudo', 'sobol'):
+    start = time.perf_counter()
+    result = rqmc_price(lambda n, seed: gbm_paths(S, T, r, sigma, n, steps, sampler=sampler, seed=seed),
+                        asian_call, 2**12, replications=16, discount=discount)
+    print(f"Asian call ({sampler}, 16 x 4096 paths): {result['price']:.5f} +/- {result['std_error']:.5f} "
+          f"in {time.perf_counter() - start:.2f} seconds")
+
+# The same generator under Heston dynamics
+for sampler in ('pseudo', 'sobol'):
+    result = rqmc_price(lambda n, seed: heston_paths(S, T, r, 0.04, 2.0, 0.04, 0.3, -0.7, n, steps,
+                                                     sampler=sampler, seed=seed),
+                        asian_call, 2**12, replications=16, discount=discount)
+    print(f"Heston Asian call ({sampler}): {result['price']:.5f} +/- {result['std_error']:.5f}")
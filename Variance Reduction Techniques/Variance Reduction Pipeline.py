@@ -0,0 +1,181 @@
+import time
+import numpy as np
+from scipy.special import ndtr, ndtri
+
+class Stratified:
+    """Stratify the projection of the normals on a direction into equal-probability strata."""
+    def __init__(self, strata, direction=None):
+        self.strata = strata
+        self.direction = direction
+
+class Antithetic:
+    """Pair every draw Z with -Z and average the pair."""
+
+class ImportanceShift:
+    """Sample the normals from N(shift, I) and weight by the likelihood ratio."""
+    def __init__(self, shift):
+        self.shift = shift
+
+class ControlVariates:
+    """Regression-adjust with controls g(Z) of known mean under the nominal measure."""
+    def __init__(self, controls, means):
+        self.controls = controls
+        self.means = means
+
+def draw_normals(rng, n_units, dim, stratified):
+    """
+    Draw the shared stream of normals, n_units x dim, with the stratum of every row.
+
+    With stratification, each stratum gets n_units / strata rows, and the projection on
+    the unit direction v is replaced by a draw from its stratum:
+    Z = Z' + v (xi - v.Z').
+    """
+    Z = rng.standard_normal((n_units, dim))
+    if stratified is None:
+        return Z, np.zeros(n_units, dtype=int)
+    v = np.zeros(dim) if stratified.direction is None else np.asarray(stratified.direction, dtype=float)
+    if stratified.direction is None:
+        v[0] = 1.0
+    v = v / np.linalg.norm(v)
+    strata = np.repeat(np.arange(stratified.strata), n_units // stratified.strata)
+    xi = ndtri((strata + rng.random(n_units)) / stratified.strata)
+    Z += np.outer(xi - Z @ v, v)
+    return Z, strata
+
+def run_pipeline(payoff, dim, n, stages=(), seed=0, chunk_size=100000, baseline=True):
+    """
+    Estimate E[payoff(Z)], Z ~ N(0, I_dim), through a stack of variance-reduction stages.
+
+    All stages share one stream of normals and are applied in a fixed order whatever
+    order they are listed in: stratification of the base draws, antithetic pairing,
+    the importance-sampling shift and its likelihood-ratio weights, the payoff, and
+    finally the regression adjustment with any control variates. Within-stratum sums
+    of the unit values, controls and their products are streamed over chunks. The
+    control coefficients come from the pooled within-stratum covariance, and the
+    variance is the stratified sum_h p_h^2 Var_h(Y - b X) / n_h.
+
+    Parameters:
+    payoff (callable): Maps an (n x dim) array of normals to discounted payoffs
+    dim (int): Number of normals per path
+    n (int): Budget of payoff evaluations
+    stages (sequence): Any of Stratified, Antithetic, ImportanceShift, ControlVariates
+    seed (int): Seed for the random number generator
+    chunk_size (int): Number of payoff evaluations per chunk
+    baseline (bool): Also run plain Monte Carlo with the same budget for comparison
+
+    Returns:
+    dict: 'estimate', 'std_error', 'variance', 'seconds', 'efficiency' (variance x seconds),
+          and with baseline=True 'vrf' (variance-reduction factor) and 'efficiency_gain'
+    """
+    stage = {type(s).__name__: s for s in stages}
+    stratified = stage.get('Stratified')
+    antithetic = 'Antithetic' in stage
+    shift = None if 'ImportanceShift' not in stage else np.asarray(stage['ImportanceShift'].shift, dtype=float)
+    cv = stage.get('ControlVariates')
+    k = 0 if cv is None else len(cv.controls)
+    H = 1 if stratified is None else stratified.strata
+    per_unit = 2 if antithetic else 1
+
+    # Each chunk holds the same whole number of units in every stratum
+    chunk_units = max(chunk_size // per_unit // H, 1) * H
+    n_units = max(n // per_unit // H, 1) * H
+    rng = np.random.default_rng(seed)
+
+    # Per-stratum sums of [Y, X_1..X_k] and of their outer products
+    count = np.zeros(H)
+    total = np.zeros((H, k + 1))
+    outer = np.zeros((H, k + 1, k + 1))
+
+    start = time.perf_counter()
+    for first in range(0, n_units, chunk_units):
+        size = min(chunk_units, n_units - first)
+        Z, strata = draw_normals(rng, size, dim, stratified)
+        draws = np.concatenate([Z, -Z]) if antithetic else Z
+        weights = np.ones(len(draws))
+        if shift is not None:
+            draws = draws + shift
+            weights = np.exp(-draws @ shift + 0.5 * shift @ shift)
+        columns = [payoff(draws)] + ([] if cv is None else [control(draws) for control in cv.controls])
+        values = np.stack(columns, axis=1) * weights[:, None]
+        if antithetic:
+            values = 0.5 * (values[:size] + values[size:])
+        np.add.at(count, strata, 1)
+        np.add.at(total, strata, values)
+        np.add.at(outer, strata, values[:, :, None] * values[:, None, :])
+    seconds = time.perf_counter() - start
+
+    # Within-stratum means and covariances of the unit values
+    means = total / count[:, None]
+    covariances = outer / count[:, None, None] - means[:, :, None] * means[:, None, :]
+    covariances *= (count / np.maximum(count - 1, 1))[:, None, None]
+    p = np.full(H, 1.0 / H)
+
+    estimate = p @ means[:, 0]
+    coefficients = np.zeros(k)
+    if k:
+        pooled = np.einsum('h,hij->ij', count - 1, covariances)
+        coefficients = np.linalg.solve(pooled[1:, 1:], pooled[1:, 0])
+        estimate -= coefficients @ (p @ means[:, 1:] - np.asarray(cv.means, dtype=float))
+    direction = np.concatenate([[1.0], -coefficients])
+    stratum_variance = np.einsum('i,hij,j->h', direction, covariances, direction)
+    variance = float(np.sum(p**2 * stratum_variance / count))
+
+    result = {'estimate': float(estimate), 'std_error': np.sqrt(variance), 'variance': variance,
+              'seconds': seconds, 'efficiency': variance * seconds}
+    if k:
+        result['coefficients'] = coefficients
+    if baseline:
+        plain = run_pipeline(payoff, dim, n, seed=seed + 1, chunk_size=chunk_size, baseline=False)
+        result['vrf'] = plain['variance'] / variance
+        result['efficiency_gain'] = plain['efficiency'] / result['efficiency']
+    return result
+
+def gbm_paths(Z, S, T, r, sigma, q=0.0):
+    """GBM prices at the dim equally spaced dates driven by the columns of Z."""
+    dt = T / Z.shape[1]
+    return S * np.exp(np.cumsum((r - q - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z, axis=1))
+
+# Example usage
+S = 100     # Initial stock price
+K = 100     # Strike price
+T = 1       # Time to expiration in years
+r = 0.05    # Risk-free rate
+sigma = 0.2 # Volatility
+n = 200000  # Payoff evaluations per run
+discount = np.exp(-r * T)
+
+# European call: one normal per path, with the discounted terminal price as control (mean S)
+european = lambda Z: discount * np.maximum(gbm_paths(Z, S, T, r, sigma)[:, -1] - K, 0)
+terminal = lambda Z: discount * gbm_paths(Z, S, T, r, sigma)[:, -1]
+d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+print(f"Black-Scholes reference: {S * ndtr(d1) - K * discount * ndtr(d1 - sigma * np.sqrt(T)):.5f}")
+
+combinations = {
+    'Plain': [],
+    'Antithetic': [Antithetic()],
+    'Stratified': [Stratified(100)],
+    'Control variate': [ControlVariates([terminal], [S])],
+    'Stratified + antithetic + control': [Stratified(100), Antithetic(), ControlVariates([terminal], [S])],
+}
+for name, stages in combinations.items():
+    result = run_pipeline(european, 1, n, stages)
+    print(f"{name:>34}: {result['estimate']:.5f} +/- {result['std_error']:.5f}, VRF {result['vrf']:7.1f}, "
+          f"efficiency gain {result['efficiency_gain']:7.1f}")
+
+# Deep out-of-the-money call: importance sampling shifts the normal towards the strike
+K_otm = 180
+otm = lambda Z: discount * np.maximum(gbm_paths(Z, S, T, r, sigma)[:, -1] - K_otm, 0)
+shift = (np.log(K_otm / S) - (r - 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+for name, stages in {'Plain': [], 'Shifted': [ImportanceShift([shift])],
+                     'Shifted + stratified': [ImportanceShift([shift]), Stratified(50)]}.items():
+    result = run_pipeline(otm, 1, n, stages)
+    print(f"OTM call, {name:>20}: {result['estimate']:.6f} +/- {result['std_error']:.6f}, VRF {result['vrf']:.1f}")
+
+# Monthly Asian call: stratify along the direction driving the average
+months = 12
+asian = lambda Z: discount * np.maximum(gbm_paths(Z, S, T, r, sigma).mean(axis=1) - K, 0)
+average_direction = np.arange(months, 0, -1)
+stages = [Stratified(64, average_direction), Antithetic(), ControlVariates([terminal], [S])]
+result = run_pipeline(asian, months, n, stages)
+print(f"Asian call: {result['estimate']:.5f} +/- {result['std_error']:.5f}, VRF {result['vrf']:.1f}, "
+      f"variance x seconds {result['efficiency']:.2e}")